@@ -1,9 +1,15 @@
 # Character class
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import ClassVar, Dict
 
-@dataclass
-class Character:
+from Characters.combatant import Combatant
+from Characters.curve import XPCurve, DEFAULT_CURVE
+
+# Longest name the prompts accept
+MAX_NAME_LENGTH = 24
+
+@dataclass(slots=True)
+class Character(Combatant):
     name: str
     hp: int = 30
     max_hp: int = 30
@@ -13,58 +19,57 @@ class Character:
     exp: int = 0
     inventory: Dict[str, int] = field(default_factory=dict)
 
-    # Check if character is alive
-    def is_alive(self) -> bool:
-        return self.hp > 0
-    
-    # Calculate damage taken after defense
-    def take_damage(self, damage: int) -> int:
-        final_damage = max(0, damage - self.defense)
-        self.hp = max(0, self.hp - final_damage)
-        return final_damage
-    
+    # XP curve and stat growth per level
+    curve: ClassVar[XPCurve] = DEFAULT_CURVE
+    HP_PER_LEVEL: ClassVar[int] = 5
+    ATTACK_PER_LEVEL: ClassVar[int] = 2
+    DEFENSE_PER_LEVEL: ClassVar[int] = 1
+
     # Heal the character
     def heal(self, amount: int) -> int:
-        heal_amount = min(amount, self.max_hp - self.hp)
-        self.hp = min(self.max_hp, self.hp + amount)
+        max_hp = self.effective_max_hp
+        heal_amount = min(amount, max_hp - self.hp)
+        self.hp = min(max_hp, self.hp + amount)
         return heal_amount
 
     # Show inventory
     def show_inventory(self):
         return self.inventory
 
-    # Use an item from inventory
-    def use_item(self, item: str) -> bool:
+    # Use an item from inventory through its registered effect
+    def use_item(self, item: str) -> str:
+        from Characters.items import get_items
         if self.inventory.get(item, 0) <= 0:
             return f"No {item} left!"
-        if item == "Potion":
-            self.heal(15)
-            self.inventory[item] -= 1
-            return f"{self.name} used a Potion and healed 15 HP!"
-        return f"{item} cannot be used!"
+        message = get_items().apply(self, item)
+        if message is None:
+            return f"{item} cannot be used!"
+        self.inventory[item] -= 1
+        return message
 
     # Add item to inventory
     def add_item(self, item: str, quantity: int = 1):
         self.inventory[item] = self.inventory.get(item, 0) + quantity
 
-    # Gain experience and level up if applicable
-    def gain_exp(self, amount: int):
-        self.exp += amount
-        leveled = False
-        while self.exp >= self.exp_to_next_level():
-            self.exp -= self.exp_to_next_level()
-            self.level += 1
-            self.max_hp += 5
-            self.hp = self.max_hp
-            self.attack += 2
-            self.defense += 1
+    # Gain experience and level up if applicable, returning every level reached
+    def gain_exp(self, amount: int) -> range:
+        total = self.curve.total_for(self.level) + self.exp + amount
+        new_level = self.curve.level_for(total)
+        self.exp = total - self.curve.total_for(new_level)
+        levels = range(self.level + 1, new_level + 1)
+        if levels:
+            # Apply all stat growth in one step
+            gained = len(levels)
+            self.level = new_level
+            self.max_hp += self.HP_PER_LEVEL * gained
+            self.attack += self.ATTACK_PER_LEVEL * gained
+            self.defense += self.DEFENSE_PER_LEVEL * gained
             self.hp = self.max_hp
-            leveled = True
-        return leveled
+        return levels
 
     # Experience required for next level
     def exp_to_next_level(self) -> int:
-        return 20 + (self.level - 1) * 15
+        return self.curve.to_next(self.level)
 
     # String representation of the character
     def __str__(self):
@@ -0,0 +1,66 @@
+# Shared combatant base
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from Characters.status import Status, StatusDef, StatusEffects, get_statuses
+
+@dataclass(slots=True)
+class Combatant:
+    name: str
+    hp: int
+    max_hp: int
+    attack: int
+    defense: int
+    # Active status effects; None until the first one is applied
+    statuses: Optional[StatusEffects] = field(default=None, kw_only=True, repr=False, compare=False)
+
+    # Attack, defense and max HP after status modifiers
+    @property
+    def effective_attack(self) -> int:
+        return self.attack if self.statuses is None else self.statuses.value("attack", self.attack)
+
+    @property
+    def effective_defense(self) -> int:
+        return self.defense if self.statuses is None else self.statuses.value("defense", self.defense)
+
+    @property
+    def effective_max_hp(self) -> int:
+        return self.max_hp if self.statuses is None else max(1, self.statuses.value("max_hp", self.max_hp))
+
+    # Check if combatant is alive
+    def is_alive(self) -> bool:
+        return self.hp > 0
+
+    # Calculate damage taken after defense
+    def take_damage(self, damage: int) -> int:
+        final_damage = max(0, damage - self.effective_defense)
+        self.hp = max(0, self.hp - final_damage)
+        return final_damage
+
+    # Apply a status by id or definition
+    def add_status(self, status) -> Status:
+        if not isinstance(status, StatusDef):
+            status = get_statuses().get(status)
+        if self.statuses is None:
+            self.statuses = StatusEffects()
+        return self.statuses.apply(status)
+
+    def remove_status(self, status_id: str) -> Optional[Status]:
+        if self.statuses is None:
+            return None
+        status = self.statuses.remove(status_id)
+        self.hp = min(self.hp, self.effective_max_hp)
+        return status
+
+    # Start-of-turn status effects; returns (status, actual HP change, expired)
+    def tick_statuses(self) -> List[Tuple[Status, int, bool]]:
+        if not self.statuses:
+            return []
+        changes = []
+        for status, amount, expired in self.statuses.tick():
+            before = self.hp
+            self.hp = max(0, min(self.effective_max_hp, self.hp + amount))
+            changes.append((status, self.hp - before, expired))
+        # A lost max HP bonus takes its HP with it
+        self.hp = min(self.hp, self.effective_max_hp)
+        return changes
@@ -0,0 +1,109 @@
+# Experience curves
+import math
+from bisect import bisect_right
+from typing import List, Sequence
+
+# Curve defined by the XP needed at each level, with a cumulative lookup table
+class XPCurve:
+    def __init__(self, max_level: int = 1000):
+        self.max_level = max_level
+        self._table: List[int] = []
+
+    # XP needed to go from level to level + 1
+    def to_next(self, level: int) -> int:
+        raise NotImplementedError
+
+    # Cumulative XP needed to reach each level, index 0 = level 1
+    @property
+    def table(self) -> List[int]:
+        if not self._table:
+            total, table = 0, [0]
+            for level in range(1, self.max_level):
+                total += self.to_next(level)
+                table.append(total)
+            self._table = table
+        return self._table
+
+    # Total XP needed to reach a level from level 1
+    def total_for(self, level: int) -> int:
+        return self.table[level - 1]
+
+    # Highest level reachable with a total amount of XP
+    def level_for(self, total_xp: int) -> int:
+        return bisect_right(self.table, total_xp)
+
+    # Vectorized level_for over a NumPy array of totals
+    def level_for_array(self, total_xp):
+        import numpy as np
+        return np.searchsorted(np.asarray(self.table), total_xp, side="right")
+
+# to_next(level) = base + (level - 1) * step, solved in closed form
+class LinearCurve(XPCurve):
+    def __init__(self, base: int = 20, step: int = 15, max_level: int = 1000):
+        super().__init__(max_level)
+        self.base = base
+        self.step = step
+
+    def to_next(self, level: int) -> int:
+        return self.base + (level - 1) * self.step
+
+    def total_for(self, level: int) -> int:
+        n = level - 1
+        return n * self.base + self.step * n * (n - 1) // 2
+
+    def level_for(self, total_xp: int) -> int:
+        if total_xp <= 0:
+            return 1
+        if self.step == 0:
+            return total_xp // self.base + 1
+        # Positive root of step/2 n^2 + (base - step/2) n - total = 0
+        b = self.base - self.step / 2
+        n = int((-b + math.sqrt(b * b + 2 * self.step * total_xp)) / self.step)
+        # Correct float rounding
+        while self.total_for(n + 2) <= total_xp:
+            n += 1
+        while n > 0 and self.total_for(n + 1) > total_xp:
+            n -= 1
+        return n + 1
+
+    def level_for_array(self, total_xp):
+        import numpy as np
+        total = np.asarray(total_xp, dtype=np.int64)
+        if self.step == 0:
+            return np.maximum(total, 0) // self.base + 1
+        b = self.base - self.step / 2
+        n = np.floor((-b + np.sqrt(b * b + 2.0 * self.step * np.maximum(total, 0))) / self.step).astype(np.int64)
+        n = np.maximum(n, 0)
+        totals = lambda k: k * self.base + self.step * k * (k - 1) // 2
+        n += totals(n + 1) <= total
+        n -= (n > 0) & (totals(n) > total)
+        return n + 1
+
+# Curve from an explicit list of per-level requirements
+class TableCurve(XPCurve):
+    def __init__(self, requirements: Sequence[int]):
+        super().__init__(len(requirements) + 1)
+        self.requirements = list(requirements)
+
+    def to_next(self, level: int) -> int:
+        return self.requirements[min(level, len(self.requirements)) - 1]
+
+DEFAULT_CURVE = LinearCurve()
+
+# Apply XP to arrays of characters at once; returns new levels, exp and levels gained
+def gain_exp_batch(levels, exps, amounts, curve: XPCurve = DEFAULT_CURVE):
+    import numpy as np
+    levels = np.asarray(levels, dtype=np.int64)
+    if isinstance(curve, LinearCurve):
+        n = levels - 1
+        start = n * curve.base + curve.step * n * (n - 1) // 2
+    else:
+        start = np.asarray(curve.table)[levels - 1]
+    total = start + np.asarray(exps, dtype=np.int64) + np.asarray(amounts, dtype=np.int64)
+    new_levels = curve.level_for_array(total)
+    if isinstance(curve, LinearCurve):
+        n = new_levels - 1
+        new_start = n * curve.base + curve.step * n * (n - 1) // 2
+    else:
+        new_start = np.asarray(curve.table)[new_levels - 1]
+    return new_levels, total - new_start, new_levels - levels
@@ -1,25 +1,17 @@
 # Enemy class
-import json, os, random
+import os
 from dataclasses import dataclass
+from typing import Optional
 
-@dataclass
-class Enemy():
-    name: str
-    hp: int
-    max_hp: int
-    attack: int
-    defense: int
-    xp_reward: int
-
-    # Check if enemy is alive
-    def is_alive(self) -> bool:
-        return self.hp > 0
+from Characters.combatant import Combatant
+from Characters.status import Status
 
-    # Calculate damage taken after defense
-    def take_damage(self, damage: int) -> int:
-        final_damage = max(0, damage - self.defense)
-        self.hp = max(0, self.hp - final_damage)
-        return final_damage
+@dataclass(slots=True)
+class Enemy(Combatant):
+    xp_reward: int
+    # Status this enemy's hits may apply, and the chance per damaging hit
+    inflicts: str = ""
+    inflict_chance: float = 0.0
 
     # String representation of the enemy
     def __str__(self):
@@ -29,30 +21,23 @@ class Enemy():
                 f"Defense: {self.defense}\n"
                 f"XP Reward: {self.xp_reward}")
 
+    # Roll this enemy's on-hit status against a target after a damaging hit
+    def inflict(self, target: Combatant, damage: int, rng) -> Optional[Status]:
+        if not self.inflicts or damage <= 0 or rng.random() >= self.inflict_chance:
+            return None
+        return target.add_status(self.inflicts)
+
     # Load enemy data from JSON file
     @staticmethod
     def load_enemies_from_file(enemy_id: str, jsonpath: str = "enemies.json") -> 'Enemy':
+        from Characters.registry import get_registry
         base_dir = os.path.dirname(os.path.abspath(__file__))
-        full_path = os.path.join(base_dir, jsonpath)
-        with open(full_path, 'r') as file:
-            enemies_data = json.load(file)
-        if enemy_id not in enemies_data:
-            raise ValueError(f"Enemy '{enemy_id}' not found in {full_path}.")
-        return Enemy(enemies_data[enemy_id])
+        return get_registry(os.path.join(base_dir, jsonpath)).get(enemy_id).spawn()
 
-    # Select a random enemy from the JSON file
+    # Select a random enemy from the cached registry
     @staticmethod
-    def random_enemy(jsonpath: str = "enemies.json") -> 'Enemy':
+    def random_enemy(jsonpath: str = "enemies.json", level: int = None, tier: int = None, rng=None) -> 'Enemy':
+        import random
+        from Characters.registry import get_registry
         base_dir = os.path.dirname(os.path.abspath(__file__))
-        full_path = os.path.join(base_dir, jsonpath)
-        with open(full_path, 'r') as file:
-            enemies_data = json.load(file)
-        enemy_id = random.choice(list(enemies_data.keys()))
-        return Enemy(
-            name=enemies_data[enemy_id]["name"],
-            hp=enemies_data[enemy_id]["hp"],
-            max_hp=enemies_data[enemy_id]["hp"],
-            attack=enemies_data[enemy_id]["attack"],
-            defense=enemies_data[enemy_id]["defense"],
-            xp_reward=enemies_data[enemy_id]["xp_reward"]
-        )
\ No newline at end of file
+        return get_registry(os.path.join(base_dir, jsonpath)).random_enemy(level, tier, rng or random)
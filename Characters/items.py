@@ -0,0 +1,112 @@
+# Item registry with effect handlers
+import json, os
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from Characters.pack import open_pack, pack_path, write_pack
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "items.json")
+
+@dataclass(frozen=True)
+class ItemDef:
+    id: str
+    effect: str
+    amount: int = 0
+    description: str = ""
+    # Status applied or cured by status effects
+    status: str = ""
+
+# Effect name -> handler(player, item) returning the log message
+EFFECTS: Dict[str, Callable] = {}
+
+# Register an effect handler under a name
+def effect(name: str):
+    def register(handler: Callable) -> Callable:
+        EFFECTS[name] = handler
+        return handler
+    return register
+
+@effect("heal")
+def heal_effect(player, item: ItemDef) -> str:
+    player.heal(item.amount)
+    return f"{player.name} used a {item.id} and healed {item.amount} HP!"
+
+@effect("full_heal")
+def full_heal_effect(player, item: ItemDef) -> str:
+    healed = player.heal(player.effective_max_hp)
+    return f"{player.name} used a {item.id} and healed {healed} HP!"
+
+@effect("gain_exp")
+def gain_exp_effect(player, item: ItemDef) -> str:
+    levels = player.gain_exp(item.amount)
+    message = f"{player.name} read the {item.id} and gained {item.amount} XP!"
+    if levels:
+        message += f" Level UP! -> level {player.level}"
+    return message
+
+@effect("status")
+def status_effect(player, item: ItemDef) -> str:
+    status = player.add_status(item.status)
+    return f"{player.name} used a {item.id}! {status.id} for {status.remaining} turns."
+
+@effect("cure")
+def cure_effect(player, item: ItemDef) -> str:
+    if player.remove_status(item.status) is None:
+        return f"{player.name} used a {item.id}, but had no {item.status}."
+    return f"{player.name} used a {item.id} and cured {item.status}!"
+
+# Pack schema for item definitions, in ItemDef field order
+ITEM_SCHEMA = (("id", "s"), ("effect", "s"), ("amount", "i"), ("description", "s"), ("status", "s"))
+
+# Validate parsed JSON and build item definitions by id
+def parse_items(data: dict, path: str) -> Dict[str, ItemDef]:
+    items = {}
+    for item_id, entry in data.items():
+        if entry.get("effect") not in EFFECTS:
+            raise ValueError(f"Item '{item_id}' in {path} has unknown effect '{entry.get('effect')}'.")
+        if entry.get("effect") in ("status", "cure") and not entry.get("status"):
+            raise ValueError(f"Item '{item_id}' in {path} needs a status.")
+        items[item_id] = ItemDef(id=item_id, **entry)
+    return items
+
+# Compile an item JSON file into a pack next to it, returning the record count
+def compile_items(source: str = DEFAULT_PATH, path: str = None) -> int:
+    with open(source, 'r') as file:
+        items = parse_items(json.load(file), source)
+    rows = (tuple(getattr(item, name) for name, _ in ITEM_SCHEMA) for item in items.values())
+    return write_pack(path or pack_path(source), ITEM_SCHEMA, rows, source)
+
+# Item definitions from a compiled pack when one is up to date, else parsed once from JSON
+class ItemRegistry:
+    def __init__(self, path: str = DEFAULT_PATH, use_pack: bool = True):
+        self.path = path
+        self.pack = open_pack(path, ITEM_SCHEMA) if use_pack else None
+        self.items: Dict[str, ItemDef] = {}
+        if self.pack is None:
+            with open(path, 'r') as file:
+                self.items = parse_items(json.load(file), path)
+
+    # Definition for an item id, decoded from the pack on first use
+    def get(self, item_id: str) -> Optional[ItemDef]:
+        item = self.items.get(item_id)
+        if item is None and self.pack is not None:
+            index = self.pack.find(item_id)
+            if index >= 0:
+                item = self.items[item_id] = ItemDef(*self.pack.values(index))
+        return item
+
+    # Apply an item's effect to a character
+    def apply(self, player, item_id: str) -> Optional[str]:
+        item = self.get(item_id)
+        if item is None or item.effect not in EFFECTS:
+            return None
+        return EFFECTS[item.effect](player, item)
+
+_registry: Optional[ItemRegistry] = None
+
+# Shared item registry
+def get_items() -> ItemRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ItemRegistry()
+    return _registry
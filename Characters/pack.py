@@ -0,0 +1,237 @@
+# Compiled content packs: fixed-width records plus a string table, read through mmap
+import mmap, os, struct, sys, zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+MAGIC = b"TRPK"
+VERSION = 1
+
+# Pack layout: header, records in source order, an id index, then the string table
+# Header: magic, version, schema crc, record count, record size, index offset, strings offset, source size and mtime
+HEADER = struct.Struct("<4sHxxIIIIIxxxxqq")
+
+# Index entries are record numbers sorted by id bytes
+INDEX = struct.Struct("<I")
+
+# Field codes: "s" string reference (offset, length), "i" int32, "d" float64
+FIELD_SIZES = {"s": 8, "i": 4, "d": 8}
+FIELD_FORMATS = {"s": "II", "i": "i", "d": "d"}
+
+# Stored in "i" fields for None
+INT_NONE = -2 ** 31
+
+# Schema is a sequence of (field name, code); the first field must be the string id
+Schema = Sequence[Tuple[str, str]]
+
+class PackError(ValueError):
+    pass
+
+# Record layout with every field aligned to its size, so numeric columns can be read as strided views
+class Layout:
+    def __init__(self, schema: Schema):
+        if not schema or schema[0][1] != "s":
+            raise PackError("A pack schema must start with a string id field.")
+        self.schema = tuple(schema)
+        self.offsets: Dict[str, int] = {}
+        fmt = "<"
+        offset = 0
+        for name, code in self.schema:
+            size = 4 if code == "s" else FIELD_SIZES[code]
+            pad = -offset % size
+            fmt += "x" * pad + FIELD_FORMATS[code]
+            offset += pad
+            self.offsets[name] = offset
+            offset += FIELD_SIZES[code]
+        fmt += "x" * (-offset % 8)
+        self.record = struct.Struct(fmt)
+        self.crc = zlib.crc32(",".join(f"{n}:{c}" for n, c in self.schema).encode())
+
+# Default pack path next to a JSON source
+def pack_path(source: str) -> str:
+    return os.path.splitext(source)[0] + ".pack"
+
+# Source size and mtime recorded in the header to detect stale packs
+def source_stamp(source: str) -> Tuple[int, int]:
+    try:
+        st = os.stat(source)
+    except FileNotFoundError:
+        return 0, 0
+    return st.st_size, st.st_mtime_ns
+
+# Write rows (tuples in schema order) as a pack, returning the record count
+def write_pack(path: str, schema: Schema, rows: Iterable[Sequence], source: str = None) -> int:
+    layout = Layout(schema)
+    rows = list(rows)
+    strings = bytearray()
+    string_refs: Dict[str, Tuple[int, int]] = {}
+
+    def ref(value: str) -> Tuple[int, int]:
+        if value not in string_refs:
+            data = value.encode("utf-8")
+            string_refs[value] = (len(strings), len(data))
+            strings.extend(data)
+        return string_refs[value]
+
+    records = bytearray()
+    for row in rows:
+        values = []
+        for (name, code), value in zip(layout.schema, row):
+            if code == "s":
+                values.extend(ref(value))
+            elif code == "i":
+                values.append(INT_NONE if value is None else value)
+            else:
+                values.append(value)
+        records.extend(layout.record.pack(*values))
+
+    # Keep source order for records so weighted draws match the JSON path; search through the index
+    order = sorted(range(len(rows)), key=lambda i: rows[i][0].encode("utf-8"))
+    for a, b in zip(order, order[1:]):
+        if rows[a][0] == rows[b][0]:
+            raise PackError(f"Duplicate id '{rows[a][0]}' in {source or path}.")
+    index = b"".join(INDEX.pack(i) for i in order)
+
+    size, mtime = source_stamp(source) if source else (0, 0)
+    index_offset = HEADER.size + len(records)
+    strings_offset = index_offset + len(index)
+    header = HEADER.pack(MAGIC, VERSION, layout.crc, len(rows), layout.record.size, index_offset, strings_offset, size, mtime)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(header)
+        file.write(records)
+        file.write(index)
+        file.write(strings)
+    os.replace(tmp, path)
+    return len(rows)
+
+# Read-only pack mapped into memory; records are decoded only when asked for
+class ContentPack:
+    def __init__(self, path: str, schema: Schema):
+        self.path = path
+        self.layout = Layout(schema)
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise PackError(f"{path} is not a content pack.")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, crc, count, record_size, index_offset, strings_offset, size, mtime = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise PackError(f"{path} is not a content pack.")
+        if version != VERSION or crc != self.layout.crc or record_size != self.layout.record.size:
+            self.close()
+            raise PackError(f"{path} was built for a different pack format; recompile it.")
+        self.count = count
+        self.index_offset = index_offset
+        self.strings_offset = strings_offset
+        self.source_stamp = (size, mtime)
+        self._view = memoryview(self._map)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        view = getattr(self, "_view", None)
+        if view is not None:
+            try:
+                view.release()
+            except BufferError:
+                # A column view is still alive; the mapping goes when it does
+                return
+        self._map.close()
+
+    def _offset(self, index: int) -> int:
+        return HEADER.size + index * self.layout.record.size
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self.strings_offset + offset
+        return str(self._view[start:start + length], "utf-8")
+
+    # Raw id bytes of a record, for binary search without decoding
+    def _id_bytes(self, index: int) -> bytes:
+        offset, length = struct.unpack_from("<II", self._map, self._offset(index))
+        start = self.strings_offset + offset
+        return self._map[start:start + length]
+
+    # Record number at a position of the sorted id index
+    def _sorted(self, position: int) -> int:
+        return INDEX.unpack_from(self._map, self.index_offset + position * INDEX.size)[0]
+
+    # Record index for an id, or -1
+    def find(self, key: str) -> int:
+        target = key.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_bytes(self._sorted(mid)) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            index = self._sorted(lo)
+            if self._id_bytes(index) == target:
+                return index
+        return -1
+
+    # Decoded field values of one record, in schema order
+    def values(self, index: int) -> tuple:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        raw = self.layout.record.unpack_from(self._map, self._offset(index))
+        values = []
+        k = 0
+        for name, code in self.layout.schema:
+            if code == "s":
+                values.append(self._string(raw[k], raw[k + 1]))
+                k += 2
+            else:
+                value = raw[k]
+                values.append(None if code == "i" and value == INT_NONE else value)
+                k += 1
+        return tuple(values)
+
+    def ids(self) -> List[str]:
+        return [self._id_bytes(i).decode("utf-8") for i in range(self.count)]
+
+    # One numeric field across all records, as a strided view into the mapping
+    def column(self, name: str):
+        code = dict(self.layout.schema)[name]
+        if code == "s":
+            raise PackError(f"Field '{name}' is a string and has no numeric column.")
+        size = FIELD_SIZES[code]
+        record_size = self.layout.record.size
+        start = HEADER.size
+        end = start + self.count * record_size
+        if sys.byteorder == "little" and start % size == 0 and record_size % size == 0:
+            return self._view[start:end].cast(code)[self.layout.offsets[name] // size::record_size // size]
+        fmt = "<" + code
+        return [struct.unpack_from(fmt, self._map, self._offset(i) + self.layout.offsets[name])[0] for i in range(self.count)]
+
+# Open the pack for a JSON source if it exists and was built from the current source
+def open_pack(source: str, schema: Schema) -> Optional[ContentPack]:
+    path = pack_path(source)
+    if not os.path.exists(path):
+        return None
+    try:
+        pack = ContentPack(path, schema)
+    except PackError:
+        return None
+    if os.path.exists(source) and pack.source_stamp != source_stamp(source):
+        pack.close()
+        return None
+    return pack
+
+def main(argv=None):
+    import argparse, time
+    from Characters.registry import DEFAULT_PATH as ENEMIES_PATH, compile_enemies
+    from Characters.items import DEFAULT_PATH as ITEMS_PATH, compile_items
+    parser = argparse.ArgumentParser(description="Compile JSON content into memory-mapped binary packs")
+    parser.add_argument("--enemies", default=ENEMIES_PATH, help="Enemy JSON source")
+    parser.add_argument("--items", default=ITEMS_PATH, help="Item JSON source")
+    args = parser.parse_args(argv)
+
+    for source, compile_source in ((args.enemies, compile_enemies), (args.items, compile_items)):
+        start = time.perf_counter()
+        count = compile_source(source)
+        print(f"{pack_path(source)}: {count} records in {time.perf_counter() - start:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# Array-backed storage for large numbers of combatants
+import sys, tracemalloc
+from typing import Dict, List
+
+import numpy as np
+
+STAT_FIELDS = ("hp", "max_hp", "attack", "defense", "xp_reward")
+
+# Lightweight view of one pool slot
+class CombatantHandle:
+    __slots__ = ("pool", "index")
+
+    def __init__(self, pool: "CombatantPool", index: int):
+        self.pool = pool
+        self.index = index
+
+    @property
+    def name(self) -> str:
+        return self.pool.names[self.pool.name_ids[self.index]]
+
+    @property
+    def hp(self) -> int:
+        return int(self.pool.hp[self.index])
+
+    @hp.setter
+    def hp(self, value: int):
+        self.pool.hp[self.index] = value
+
+    @property
+    def max_hp(self) -> int:
+        return int(self.pool.max_hp[self.index])
+
+    @property
+    def attack(self) -> int:
+        return int(self.pool.attack[self.index])
+
+    @property
+    def defense(self) -> int:
+        return int(self.pool.defense[self.index])
+
+    @property
+    def xp_reward(self) -> int:
+        return int(self.pool.xp_reward[self.index])
+
+    # Pooled combatants carry no status effects
+    statuses = None
+
+    @property
+    def effective_attack(self) -> int:
+        return self.attack
+
+    @property
+    def effective_defense(self) -> int:
+        return self.defense
+
+    @property
+    def effective_max_hp(self) -> int:
+        return self.max_hp
+
+    def tick_statuses(self) -> list:
+        return []
+
+    # Check if combatant is alive
+    def is_alive(self) -> bool:
+        return self.pool.hp[self.index] > 0
+
+    # Calculate damage taken after defense
+    def take_damage(self, damage: int) -> int:
+        final_damage = max(0, damage - self.defense)
+        self.hp = max(0, self.hp - final_damage)
+        return final_damage
+
+    def __repr__(self):
+        return f"CombatantHandle({self.name!r}, hp={self.hp}/{self.max_hp})"
+
+# Struct-of-arrays storage: one int32 array per stat
+class CombatantPool:
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.names: List[str] = []
+        self._name_index: Dict[str, int] = {}
+        self.name_ids = np.zeros(capacity, dtype=np.int32)
+        for stat in STAT_FIELDS:
+            setattr(self, "_" + stat, np.zeros(capacity, dtype=np.int32))
+
+    def __len__(self):
+        return self.size
+
+    # Live views of the stat arrays, trimmed to the pool size
+    @property
+    def hp(self):
+        return self._hp[:self.size]
+
+    @property
+    def max_hp(self):
+        return self._max_hp[:self.size]
+
+    @property
+    def attack(self):
+        return self._attack[:self.size]
+
+    @property
+    def defense(self):
+        return self._defense[:self.size]
+
+    @property
+    def xp_reward(self):
+        return self._xp_reward[:self.size]
+
+    # Grow all arrays to fit at least `needed` entries
+    def _reserve(self, needed: int):
+        capacity = len(self.name_ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.name_ids = np.resize(self.name_ids, capacity)
+        for stat in STAT_FIELDS:
+            setattr(self, "_" + stat, np.resize(getattr(self, "_" + stat), capacity))
+
+    def _name_id(self, name: str) -> int:
+        if name not in self._name_index:
+            self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return self._name_index[name]
+
+    # Add one combatant and return a handle to it
+    def add(self, name: str, hp: int, attack: int, defense: int, xp_reward: int = 0, max_hp: int = None) -> CombatantHandle:
+        index = self.add_many(name, hp, attack, defense, xp_reward, 1, max_hp)[0]
+        return CombatantHandle(self, int(index))
+
+    # Add `count` copies of the same stats, returning their indices
+    def add_many(self, name: str, hp: int, attack: int, defense: int, xp_reward: int = 0, count: int = 1, max_hp: int = None):
+        start, end = self.size, self.size + count
+        self._reserve(end)
+        self.name_ids[start:end] = self._name_id(name)
+        self._hp[start:end] = hp
+        self._max_hp[start:end] = hp if max_hp is None else max_hp
+        self._attack[start:end] = attack
+        self._defense[start:end] = defense
+        self._xp_reward[start:end] = xp_reward
+        self.size = end
+        return np.arange(start, end)
+
+    # Add enemies spawned from a registry template
+    def add_template(self, template, count: int = 1):
+        return self.add_many(template.name, template.hp, template.attack, template.defense, template.xp_reward, count)
+
+    def handle(self, index: int) -> CombatantHandle:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return CombatantHandle(self, index)
+
+    def __iter__(self):
+        return (CombatantHandle(self, i) for i in range(self.size))
+
+    # Alive mask for the whole pool
+    def is_alive(self):
+        return self.hp > 0
+
+    # Apply damage to every combatant (or the given indices); returns final damage dealt
+    def take_damage(self, damage, indices=None):
+        if indices is None:
+            indices = slice(0, self.size)
+        final_damage = np.maximum(0, np.asarray(damage, dtype=np.int32) - self._defense[indices])
+        self._hp[indices] = np.maximum(0, self._hp[indices] - final_damage)
+        return final_damage
+
+    # Bytes used by the stat arrays
+    def nbytes(self) -> int:
+        return self.name_ids.nbytes + sum(getattr(self, "_" + s).nbytes for s in STAT_FIELDS)
+
+# Measure traced memory per entity for objects vs the pool
+def measure(count: int) -> Dict[str, float]:
+    from Characters.enemy import Enemy
+    results = {}
+
+    tracemalloc.start()
+    enemies = [Enemy("Slime", 20, 20, 5, 2, 10 + (i & 1)) for i in range(count)]
+    results["Enemy objects"] = tracemalloc.get_traced_memory()[0] / count
+    tracemalloc.stop()
+    del enemies
+
+    tracemalloc.start()
+    pool = CombatantPool(capacity=count)
+    pool.add_many("Slime", 20, 5, 2, 10, count)
+    results["CombatantPool"] = tracemalloc.get_traced_memory()[0] / count
+    tracemalloc.stop()
+    return results
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 1_000_000]
+    for count in sizes:
+        for label, per in measure(count).items():
+            print(f"{count:>10,} {label:<16} {per:8.1f} bytes/entity")
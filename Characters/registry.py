@@ -0,0 +1,256 @@
+# Enemy template registry
+import bisect, json, os, random, time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Characters.enemy import Enemy
+from Characters.pack import INT_NONE, open_pack, pack_path, write_pack
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "enemies.json")
+
+REQUIRED_FIELDS = ("name", "hp", "attack", "defense", "xp_reward")
+
+@dataclass(frozen=True)
+class EnemyTemplate:
+    id: str
+    name: str
+    hp: int
+    attack: int
+    defense: int
+    xp_reward: int
+    tier: int = 1
+    min_level: int = 1
+    max_level: Optional[int] = None
+    weight: float = 1.0
+    # On-hit status and its chance, copied onto spawned enemies
+    inflicts: str = ""
+    inflict_chance: float = 0.0
+
+    # Check if this template may appear at a player level
+    def fits_level(self, level: int) -> bool:
+        return self.min_level <= level and (self.max_level is None or level <= self.max_level)
+
+    # Create a fresh enemy from this template
+    def spawn(self) -> Enemy:
+        return Enemy(
+            name=self.name,
+            hp=self.hp,
+            max_hp=self.hp,
+            attack=self.attack,
+            defense=self.defense,
+            xp_reward=self.xp_reward,
+            inflicts=self.inflicts,
+            inflict_chance=self.inflict_chance
+        )
+
+# Walker/Vose alias table for constant-time weighted sampling
+class AliasTable:
+    def __init__(self, items: Sequence, weights: Sequence[float]):
+        if not items:
+            raise ValueError("Cannot build a spawn table with no entries.")
+        n = len(items)
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("Spawn weights must add up to more than zero.")
+        self.items = list(items)
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    # Draw one item with a single random number
+    def sample(self, rng=random):
+        u = rng.random() * len(self.items)
+        i = int(u)
+        return self.items[i] if u - i < self.prob[i] else self.items[self.alias[i]]
+
+# Pack schema for enemy templates, in EnemyTemplate field order
+ENEMY_SCHEMA = (("id", "s"), ("name", "s"), ("hp", "i"), ("attack", "i"), ("defense", "i"), ("xp_reward", "i"),
+                ("tier", "i"), ("min_level", "i"), ("max_level", "i"), ("weight", "d"), ("inflicts", "s"),
+                ("inflict_chance", "d"))
+
+# Validate parsed JSON and build templates by id
+def parse_templates(data: dict, path: str) -> Dict[str, EnemyTemplate]:
+    templates = {}
+    for enemy_id, entry in data.items():
+        missing = [f for f in REQUIRED_FIELDS if f not in entry]
+        if missing:
+            raise ValueError(f"Enemy '{enemy_id}' in {path} is missing {', '.join(missing)}.")
+        template = EnemyTemplate(id=enemy_id, **{k: v for k, v in entry.items() if k in EnemyTemplate.__dataclass_fields__})
+        if template.hp <= 0 or template.weight < 0 or not 0 <= template.inflict_chance <= 1:
+            raise ValueError(f"Enemy '{enemy_id}' in {path} has invalid stats.")
+        templates[enemy_id] = template
+    return templates
+
+# Compile an enemy JSON file into a pack next to it, returning the record count
+def compile_enemies(source: str = DEFAULT_PATH, path: str = None) -> int:
+    with open(source, 'r') as file:
+        templates = parse_templates(json.load(file), source)
+    rows = (tuple(getattr(t, name) for name, _ in ENEMY_SCHEMA) for t in templates.values())
+    return write_pack(path or pack_path(source), ENEMY_SCHEMA, rows, source)
+
+# Enemy templates from a compiled pack when one is up to date, else parsed from JSON
+class EnemyRegistry:
+    def __init__(self, path: str = DEFAULT_PATH, check_interval: float = 1.0, use_pack: bool = True):
+        self.path = path
+        self.check_interval = check_interval
+        self.use_pack = use_pack
+        self.pack = None
+        self._list: List[EnemyTemplate] = []
+        self._index: Dict[str, int] = {}
+        self._cache: Dict[int, EnemyTemplate] = {}
+        # Record indices per tier, each record's (min_level, max_level), and indices sorted by min_level;
+        # built on the first pool query after a load so opening a pack stays cheap
+        self._by_tier: Dict[int, List[int]] = {}
+        self._levels: Optional[List[Tuple[int, Optional[int]]]] = None
+        self._by_min: List[int] = []
+        self._mins: List[int] = []
+        self._tables: Dict[Tuple[Optional[int], Optional[int]], AliasTable] = {}
+        self._stamp = None
+        self._checked = 0.0
+        self.reload()
+
+    # Files whose change triggers a reload
+    def _current_stamp(self):
+        stamps = []
+        for path in (self.path, pack_path(self.path) if self.use_pack else None):
+            try:
+                stamps.append(os.stat(path).st_mtime_ns if path else None)
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    # Map the pack, or parse and validate the JSON file
+    def reload(self):
+        pack = open_pack(self.path, ENEMY_SCHEMA) if self.use_pack else None
+        if pack is None:
+            with open(self.path, 'r') as file:
+                templates = parse_templates(json.load(file), self.path)
+        if self.pack is not None:
+            self.pack.close()
+        self.pack = pack
+        self._list = [] if pack is not None else list(templates.values())
+        self._index = {} if pack is not None else {t.id: i for i, t in enumerate(self._list)}
+        self._cache = {}
+        self._levels = None
+        self._tables = {}
+        self._stamp = self._current_stamp()
+        self._checked = time.monotonic()
+
+    # Reload if a source changed on disk, at most once per check interval
+    def refresh(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        if self._current_stamp() != self._stamp:
+            self.reload()
+
+    def __len__(self):
+        return len(self.pack) if self.pack is not None else len(self._list)
+
+    # Template at a record index, decoded from the pack on first use
+    def _template(self, index: int) -> EnemyTemplate:
+        if self.pack is None:
+            return self._list[index]
+        template = self._cache.get(index)
+        if template is None:
+            template = self._cache[index] = EnemyTemplate(*self.pack.values(index))
+        return template
+
+    # Index records by tier and by level range, once per load
+    def _index_records(self):
+        if self._levels is not None:
+            return
+        if self.pack is not None:
+            tiers, mins = self.pack.column("tier"), self.pack.column("min_level")
+            maxes = [None if m == INT_NONE else m for m in self.pack.column("max_level")]
+        else:
+            tiers, mins, maxes = ([getattr(t, name) for t in self._list] for name in ("tier", "min_level", "max_level"))
+        self._by_tier = {}
+        for i, tier in enumerate(tiers):
+            self._by_tier.setdefault(tier, []).append(i)
+        self._levels = list(zip(mins, maxes))
+        self._by_min = sorted(range(len(mins)), key=mins.__getitem__)
+        self._mins = [mins[i] for i in self._by_min]
+
+    # Check if a record may appear at a player level
+    def _fits(self, index: int, level: int) -> bool:
+        low, high = self._levels[index]
+        return low <= level and (high is None or level <= high)
+
+    # Record indices matching a tier and/or player level in record order, without building templates
+    def _matching(self, level: int = None, tier: int = None) -> List[int]:
+        self._index_records()
+        if tier is not None:
+            pool = self._by_tier.get(tier, [])
+            return list(pool) if level is None else [i for i in pool if self._fits(i, level)]
+        if level is None:
+            return list(range(len(self)))
+        # Records with min_level <= level are a prefix of the sorted index
+        return sorted(i for i in self._by_min[:bisect.bisect_right(self._mins, level)] if self._fits(i, level))
+
+    # Look up a template by id
+    def get(self, enemy_id: str) -> EnemyTemplate:
+        self.refresh()
+        index = self.pack.find(enemy_id) if self.pack is not None else self._index.get(enemy_id, -1)
+        if index < 0:
+            raise ValueError(f"Enemy '{enemy_id}' not found in {self.path}.")
+        return self._template(index)
+
+    # All enemy ids
+    def ids(self) -> List[str]:
+        self.refresh()
+        return self.pack.ids() if self.pack is not None else [t.id for t in self._list]
+
+    # Distinct tiers, ascending
+    def tiers(self) -> List[int]:
+        self.refresh()
+        self._index_records()
+        return sorted(self._by_tier)
+
+    # Templates matching a tier and/or player level
+    def select(self, level: int = None, tier: int = None) -> List[EnemyTemplate]:
+        self.refresh()
+        return [self._template(i) for i in self._matching(level, tier)]
+
+    # Cached alias table over record indices for a (level, tier) spawn pool
+    def spawn_table(self, level: int = None, tier: int = None) -> AliasTable:
+        self.refresh()
+        key = (level, tier)
+        table = self._tables.get(key)
+        if table is None:
+            pool = self._matching(level, tier)
+            if not pool:
+                raise ValueError(f"No enemies in {self.path} for level {level}, tier {tier}.")
+            if self.pack is not None:
+                weights = self.pack.column("weight")
+                table = AliasTable(pool, [weights[i] for i in pool])
+            else:
+                table = AliasTable(pool, [self._list[i].weight for i in pool])
+            self._tables[key] = table
+        return table
+
+    # Spawn a weighted random enemy
+    def random_enemy(self, level: int = None, tier: int = None, rng=random) -> Enemy:
+        return self._template(self.spawn_table(level, tier).sample(rng)).spawn()
+
+_registries: Dict[str, EnemyRegistry] = {}
+
+# Shared registry per file path
+def get_registry(path: str = DEFAULT_PATH) -> EnemyRegistry:
+    path = os.path.abspath(path)
+    registry = _registries.get(path)
+    if registry is None:
+        registry = _registries[path] = EnemyRegistry(path)
+    return registry
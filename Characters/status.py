@@ -0,0 +1,138 @@
+# Status effects: timed stat modifiers and per-turn HP changes
+import json, os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "statuses.json")
+
+# What reapplying an active status does
+REFRESH = "refresh"  # reset the duration
+STACK = "stack"      # add a stack up to max_stacks and reset the duration
+EXTEND = "extend"    # add the duration to what is left
+IGNORE = "ignore"    # keep the active one unchanged
+STACKING = (REFRESH, STACK, EXTEND, IGNORE)
+
+# Stats that statuses may modify
+STATS = ("attack", "defense", "max_hp")
+
+@dataclass(frozen=True)
+class StatusDef:
+    id: str
+    # Turns the status lasts; 0 lasts until removed, as for equipment
+    duration: int = 0
+    stacking: str = REFRESH
+    max_stacks: int = 1
+    # HP change per stack at the start of each turn; negative for damage over time
+    tick: int = 0
+    # Flat stat modifiers per stack
+    attack: int = 0
+    defense: int = 0
+    max_hp: int = 0
+    description: str = ""
+
+# An active status on one combatant
+@dataclass(slots=True)
+class Status:
+    defn: StatusDef
+    remaining: int
+    stacks: int = 1
+
+    @property
+    def id(self) -> str:
+        return self.defn.id
+
+# Active statuses of one combatant, with modifier totals cached until a status changes
+class StatusEffects:
+    def __init__(self):
+        self.active: Dict[str, Status] = {}
+        self.dirty = False
+        self._totals = dict.fromkeys(STATS, 0)
+
+    def __len__(self):
+        return len(self.active)
+
+    def __contains__(self, status_id: str) -> bool:
+        return status_id in self.active
+
+    def __iter__(self) -> Iterator[Status]:
+        return iter(self.active.values())
+
+    # Add a status following its stacking rule
+    def apply(self, defn: StatusDef) -> Status:
+        status = self.active.get(defn.id)
+        if status is None:
+            status = self.active[defn.id] = Status(defn, defn.duration)
+            self.dirty = True
+        elif defn.stacking == STACK:
+            if status.stacks < defn.max_stacks:
+                status.stacks += 1
+                self.dirty = True
+            status.remaining = defn.duration
+        elif defn.stacking == EXTEND:
+            status.remaining += defn.duration
+        elif defn.stacking == REFRESH:
+            status.remaining = defn.duration
+        return status
+
+    def remove(self, status_id: str) -> Optional[Status]:
+        status = self.active.pop(status_id, None)
+        if status is not None:
+            self.dirty = True
+        return status
+
+    # Base stat plus modifiers; O(1) unless a status changed since the last call
+    def value(self, stat: str, base: int) -> int:
+        if self.dirty:
+            totals = dict.fromkeys(STATS, 0)
+            for status in self.active.values():
+                for name in STATS:
+                    totals[name] += getattr(status.defn, name) * status.stacks
+            self._totals = totals
+            self.dirty = False
+        return max(0, base + self._totals[stat])
+
+    # HP change from every status this turn, then count down durations
+    # Returns (status, hp change, expired) for each status that did something
+    def tick(self) -> List[Tuple[Status, int, bool]]:
+        changes = []
+        expired = []
+        for status in self.active.values():
+            amount = status.defn.tick * status.stacks
+            done = False
+            if status.remaining > 0:
+                status.remaining -= 1
+                done = status.remaining == 0
+                if done:
+                    expired.append(status.id)
+            if amount or done:
+                changes.append((status, amount, done))
+        for status_id in expired:
+            self.remove(status_id)
+        return changes
+
+# Status definitions by id, parsed once from JSON
+class StatusRegistry:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        with open(path, 'r') as file:
+            data = json.load(file)
+        self.statuses: Dict[str, StatusDef] = {}
+        for status_id, entry in data.items():
+            if entry.get("stacking", REFRESH) not in STACKING:
+                raise ValueError(f"Status '{status_id}' in {path} has unknown stacking '{entry['stacking']}'.")
+            self.statuses[status_id] = StatusDef(id=status_id, **entry)
+
+    def get(self, status_id: str) -> StatusDef:
+        status = self.statuses.get(status_id)
+        if status is None:
+            raise KeyError(f"Unknown status '{status_id}'.")
+        return status
+
+_registry: Optional[StatusRegistry] = None
+
+# Shared status registry
+def get_statuses() -> StatusRegistry:
+    global _registry
+    if _registry is None:
+        _registry = StatusRegistry()
+    return _registry
@@ -0,0 +1,39 @@
+# Command line entry point: python -m Game <command> [options]
+import importlib, sys
+
+# Command -> (module, arguments prepended, description)
+# Each module is imported only when its command runs, so headless commands never load rich or pynput
+COMMANDS = {
+    "play": ("main", [], "Play in this terminal"),
+    "simulate": ("Game.simulate", [], "Monte Carlo balance simulator"),
+    "sweep": ("Game.sweep", [], "Parallel balance sweep"),
+    "serve": ("Game.server", ["serve"], "Host game sessions over telnet"),
+    "load": ("Game.server", ["load"], "Load generator for the server"),
+    "horde": ("Game.encounter", [], "Headless party-vs-horde battles"),
+    "agent": ("Game.agent", [], "Headless games played by a policy"),
+    "bench": ("Game.bench", [], "Performance benchmarks"),
+    "stats": ("Game.stats", [], "Leaderboard and lifetime battle stats"),
+    "replay": ("Game.session", [], "Verify recorded sessions headlessly"),
+    "pack": ("Characters.pack", [], "Compile JSON content into binary packs"),
+}
+
+def usage() -> str:
+    lines = ["usage: python -m Game <command> [options]", "", "commands:"]
+    for name, (_, _, description) in COMMANDS.items():
+        lines.append(f"  {name:<10}{description}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(usage(), file=sys.stderr if argv and argv[0] not in ("-h", "--help") else sys.stdout)
+        return 0 if argv and argv[0] in ("-h", "--help") else 2
+    module, prefix, _ = COMMANDS[argv[0]]
+    # Name the command in argparse usage messages
+    sys.argv[0] = f"python -m Game {argv[0]}"
+    entry = importlib.import_module(module)
+    run = entry.cli if module == "main" else entry.main
+    return run(prefix + argv[1:])
+
+if __name__ == "__main__":
+    sys.exit(main())
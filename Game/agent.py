@@ -0,0 +1,254 @@
+# Policy API for automated play: observations in, actions out, one game or a lockstep batch at a time
+import argparse, importlib, random, statistics, time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional, Sequence, Union
+
+from Characters.character import Character
+from Characters.registry import get_registry
+from Game.engine import BattleEngine, Action, ATTACK, USE_ITEM, RUN, VICTORY, DEFEAT, ESCAPED
+from Game.session import Session
+
+# Game outcomes
+SURVIVED = "survived"
+DEFEATED = "defeated"
+TIMEOUT = "timeout"
+
+# What a policy sees before each decision
+@dataclass
+class Observation:
+    game: int
+    battle: int
+    turn: int
+    hp: int
+    max_hp: int
+    attack: int
+    defense: int
+    level: int
+    exp: int
+    # Read-only view of the live inventory
+    inventory: Mapping[str, int]
+    enemy: str
+    enemy_hp: int
+    enemy_max_hp: int
+    enemy_attack: int
+    enemy_defense: int
+    enemy_xp_reward: int
+
+# Observation of a battle in progress
+def observe(engine: BattleEngine, game: int = 0, battle: int = 0) -> Observation:
+    player, enemy = engine.player, engine.enemy
+    return Observation(game, battle, engine.turn, player.hp, player.effective_max_hp, player.effective_attack,
+                       player.effective_defense, player.level, player.exp, MappingProxyType(player.inventory),
+                       enemy.name, enemy.hp, enemy.effective_max_hp, enemy.effective_attack, enemy.effective_defense,
+                       enemy.xp_reward)
+
+# Base class for agents; override act, and act_batch to decide a whole batch at once
+class Policy:
+    def act(self, obs: Observation) -> Union[Action, str]:
+        raise NotImplementedError
+
+    def act_batch(self, observations: Sequence[Observation]) -> List[Union[Action, str]]:
+        return [self.act(obs) for obs in observations]
+
+# Policy from a plain function of one observation
+class FunctionPolicy(Policy):
+    def __init__(self, fn: Callable[[Observation], Union[Action, str]]):
+        self.fn = fn
+
+    def act(self, obs: Observation) -> Union[Action, str]:
+        return self.fn(obs)
+
+# === Heuristics === #
+def attack_only(obs: Observation) -> Action:
+    return Action(ATTACK)
+
+# Drink a potion below half HP
+def potion_at_half(obs: Observation) -> Action:
+    if obs.hp * 2 < obs.max_hp and obs.inventory.get("Potion", 0) > 0:
+        return Action(USE_ITEM, "Potion")
+    return Action(ATTACK)
+
+# Potion below half HP, run below a quarter when out of potions
+def cautious(obs: Observation) -> Action:
+    if obs.hp * 2 < obs.max_hp and obs.inventory.get("Potion", 0) > 0:
+        return Action(USE_ITEM, "Potion")
+    if obs.hp * 4 < obs.max_hp:
+        return Action(RUN)
+    return Action(ATTACK)
+
+# Uniformly random legal action
+class RandomPolicy(Policy):
+    def __init__(self, seed: int = None):
+        self.rng = random.Random(seed)
+
+    def act(self, obs: Observation) -> Action:
+        items = [item for item, qty in obs.inventory.items() if qty > 0]
+        kind = self.rng.choice((ATTACK, RUN, USE_ITEM) if items else (ATTACK, RUN))
+        return Action(kind, self.rng.choice(items) if kind == USE_ITEM else None)
+
+POLICIES = {"attack": attack_only, "potion": potion_at_half, "cautious": cautious}
+# ================== #
+
+# Wrap a function, or load "module:attr" for agents that live outside the repo
+def as_policy(policy) -> Policy:
+    if isinstance(policy, str):
+        if policy == "random":
+            return RandomPolicy()
+        if policy in POLICIES:
+            return FunctionPolicy(POLICIES[policy])
+        module, _, attr = policy.partition(":")
+        policy = getattr(importlib.import_module(module), attr)
+        if isinstance(policy, type):
+            policy = policy()
+    return policy if isinstance(policy, Policy) else FunctionPolicy(policy)
+
+@dataclass
+class GameConfig:
+    battles: int = 10
+    potions: int = 2
+    level: int = 1
+    # Fully heal between battles, like resting in town
+    rest: bool = False
+    # Turns before a battle is called a stalemate and the game ends
+    max_turns: int = 500
+
+@dataclass
+class GameResult:
+    seed: int
+    outcome: str
+    battles_won: int
+    escapes: int
+    level: int
+    turns: int
+    potions_left: int
+
+# One game: a run of battles against registry enemies until defeat or the battle limit
+class AgentGame:
+    def __init__(self, seed: int, config: GameConfig = None, index: int = 0):
+        self.seed = seed
+        self.index = index
+        self.config = config or GameConfig()
+        # Same named streams as an interactive session with this seed
+        self.session = Session(seed)
+        self.player = Character(name="agent", inventory={"Potion": self.config.potions})
+        self.player.gain_exp(self.player.curve.total_for(self.config.level))
+        self.battle = 0
+        self.won = 0
+        self.escapes = 0
+        self.turns = 0
+        self.outcome: Optional[str] = None
+        self.engine = self._next_battle()
+
+    @property
+    def done(self) -> bool:
+        return self.outcome is not None
+
+    def _next_battle(self) -> BattleEngine:
+        registry = get_registry()
+        rng = self.session.rng("encounter")
+        try:
+            enemy = registry.random_enemy(self.player.level, rng=rng)
+        except ValueError:
+            enemy = registry.random_enemy(rng=rng)
+        return BattleEngine(self.player, enemy, rng=self.session.rng("combat"))
+
+    def observation(self) -> Observation:
+        return observe(self.engine, self.index, self.battle)
+
+    # Apply one action; starts the next battle when this one ends
+    def step(self, action: Union[Action, str]):
+        engine = self.engine
+        engine.step(action)
+        self.turns += 1
+        if not engine.is_over():
+            if engine.turn >= self.config.max_turns:
+                self.outcome = TIMEOUT
+            return
+        outcome = engine.result.outcome
+        if outcome == DEFEAT:
+            self.outcome = DEFEATED
+            return
+        if outcome == VICTORY:
+            self.won += 1
+        elif outcome == ESCAPED:
+            self.escapes += 1
+        self.battle += 1
+        if self.battle >= self.config.battles:
+            self.outcome = SURVIVED
+            return
+        if self.config.rest:
+            self.player.heal(self.player.max_hp)
+        self.engine = self._next_battle()
+
+    def result(self) -> GameResult:
+        return GameResult(self.seed, self.outcome, self.won, self.escapes, self.player.level, self.turns,
+                          self.player.inventory.get("Potion", 0))
+
+# Play one game to the end
+def play_game(policy: Policy, seed: int, config: GameConfig = None) -> GameResult:
+    game = AgentGame(seed, config)
+    while not game.done:
+        game.step(policy.act(game.observation()))
+    return game.result()
+
+# Step independent games in lockstep, asking the policy for every live game's action at once
+def play_batch(policy: Policy, seeds: Sequence[int], config: GameConfig = None) -> List[GameResult]:
+    games = [AgentGame(seed, config, index) for index, seed in enumerate(seeds)]
+    live = games
+    while live:
+        actions = policy.act_batch([game.observation() for game in live])
+        if len(actions) != len(live):
+            raise ValueError(f"Policy returned {len(actions)} actions for {len(live)} games.")
+        for game, action in zip(live, actions):
+            game.step(action)
+        live = [game for game in live if not game.done]
+    return [game.result() for game in games]
+
+# Play `games` games, one at a time or in lockstep batches
+def run_games(policy, games: int, seed: int = 0, config: GameConfig = None, batch: int = 0) -> dict:
+    policy = as_policy(policy)
+    seeds = range(seed, seed + games)
+    start = time.perf_counter()
+    if batch > 0:
+        results = []
+        for i in range(0, games, batch):
+            results.extend(play_batch(policy, seeds[i:i + batch], config))
+    else:
+        results = [play_game(policy, s, config) for s in seeds]
+    elapsed = time.perf_counter() - start
+    return {"results": results, "seconds": elapsed}
+
+# Aggregate results into a summary
+def summarize(results: List[GameResult], seconds: float) -> dict:
+    decisions = sum(r.turns for r in results)
+    return {
+        "games": len(results),
+        "survival_rate": sum(r.outcome == SURVIVED for r in results) / len(results),
+        "mean_battles_won": statistics.fmean(r.battles_won for r in results),
+        "mean_level": statistics.fmean(r.level for r in results),
+        "mean_turns": decisions / len(results),
+        "games_per_s": len(results) / seconds if seconds else 0.0,
+        "decisions_per_s": decisions / seconds if seconds else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many headless games with a policy")
+    parser.add_argument("--policy", default="potion", help=f"{', '.join(POLICIES)}, random, or module:attr")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=0, help="Games stepped in lockstep per policy call (0 = one game at a time)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--battles", type=int, default=10, help="Battles per game")
+    parser.add_argument("--potions", type=int, default=2)
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--rest", action="store_true", help="Fully heal between battles")
+    args = parser.parse_args(argv)
+
+    config = GameConfig(args.battles, args.potions, args.level, args.rest)
+    run = run_games(args.policy, args.games, args.seed, config, args.batch)
+    summary = summarize(run["results"], run["seconds"])
+    for key, value in summary.items():
+        print(f"{key:<20}{value:>14,.3f}")
+
+if __name__ == "__main__":
+    main()
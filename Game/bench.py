@@ -0,0 +1,409 @@
+# Headless benchmark suite
+import argparse, io, json, os, platform, random, statistics, threading, time, tracemalloc
+from typing import Callable, Dict
+
+# Run fn repeatedly for about `seconds` and return calls per second
+def rate(fn: Callable[[], object], seconds: float = 1.0) -> float:
+    count = 0
+    start = time.perf_counter()
+    end = start + seconds
+    while True:
+        for _ in range(100):
+            fn()
+        count += 100
+        now = time.perf_counter()
+        if now >= end:
+            return count / (now - start)
+
+# Percentiles of a list of seconds, reported in milliseconds
+def percentiles(samples) -> Dict[str, float]:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99), "max_ms": ordered[-1] * 1000}
+
+# Console that renders into memory and counts bytes written
+def recording_console():
+    from rich.console import Console
+    return Console(file=io.StringIO(), width=80, height=40, force_terminal=True, color_system="truecolor", record=False)
+
+# Render frames of a screen into a recording console
+def bench_frames(build: Callable[[], object], console, change: Callable[[int], None], frames: int) -> Dict[str, float]:
+    out = console.file
+    out.seek(0)
+    out.truncate()
+    start = time.perf_counter()
+    for i in range(frames):
+        change(i)
+        console.print(build())
+    elapsed = time.perf_counter() - start
+    return {"fps": frames / elapsed, "bytes_per_frame": len(out.getvalue().encode()) / frames}
+
+def bench_battle_render(seconds: float) -> Dict[str, float]:
+    import main
+    from Characters.character import Character
+    from Characters.enemy import Enemy
+    console = recording_console()
+    battle = main.Battle(Character("Hero", inventory={"Potion": 2}), Enemy("Goblin", 30, 30, 8, 3, 20), console)
+    frames = max(50, int(200 * seconds))
+
+    def change(i):
+        battle.selected_index = i % len(battle.options)
+    result = bench_frames(battle.make_battle_display, console, change, frames)
+    build_rate = rate(battle.make_battle_display, seconds / 4)
+    result["steady_builds_per_s"] = build_rate
+    result["steady_frame_blocks"] = battle.view.frame_blocks
+    # Bytes a cached frame allocates, including temporaries it frees again
+    tracemalloc.start()
+    try:
+        battle.make_battle_display()
+    finally:
+        tracemalloc.stop()
+    result["steady_frame_alloc_bytes"] = battle.view.frame_alloc_bytes
+    return result
+
+def bench_inventory_render(seconds: float) -> Dict[str, float]:
+    import main
+    from Characters.character import Character
+    console = recording_console()
+    # A large bag: frame cost should depend on the page size, not the item count
+    bag = {f"Item {k}": 1 for k in range(2000)}
+    bag["Potion"] = 2
+    inventory = main.Inventory(Character("Hero", inventory=bag), console)
+    frames = max(50, int(200 * seconds))
+
+    def change(i):
+        inventory.selected_index = i % inventory.option_count()
+    result = bench_frames(inventory.inventory_display, console, change, frames)
+    result["steady_builds_per_s"] = rate(inventory.inventory_display, seconds / 4)
+    return result
+
+def bench_battles(seconds: float) -> Dict[str, float]:
+    from Characters.character import Character
+    from Characters.enemy import Enemy
+    from Game.engine import run_battle
+    rng = random.Random(1)
+    return {"battles_per_s": rate(lambda: run_battle(Character("Hero"), Enemy("Goblin", 30, 30, 8, 3, 20), rng=rng), seconds)}
+
+def bench_spawns(seconds: float) -> Dict[str, float]:
+    from Characters.enemy import Enemy
+    return {"spawns_per_s": rate(Enemy.random_enemy, seconds)}
+
+def bench_gain_exp(seconds: float) -> Dict[str, float]:
+    from Characters.character import Character
+    player = Character("Hero")
+    return {"gain_exp_per_s": rate(lambda: player.gain_exp(37), seconds)}
+
+# Keypress-to-frame latency through the menu and battle input paths
+def bench_input_latency(samples: int) -> Dict[str, Dict[str, float]]:
+    import main
+    from rich.live import Live
+    from Characters.character import Character
+    from Characters.enemy import Enemy
+    from Game.input import InputService, ScriptedBackend, UP, DOWN, ENTER
+    from Game.screen import Screen
+
+    backend = ScriptedBackend()
+    main.input_service = InputService(backend)
+    main.input_service.start()
+    rendered = threading.Event()
+
+    # Press keys once the first frame is up, timing each press until the next frame; Enter ends the loop
+    def typist(latencies):
+        rendered.wait()
+        for i in range(samples):
+            rendered.clear()
+            start = time.perf_counter()
+            backend.press(DOWN if i % 2 == 0 else UP)
+            rendered.wait()
+            latencies.append(time.perf_counter() - start)
+        backend.press(ENTER)
+
+    results = {}
+    try:
+        # Menu path: key on the input thread, frame from the scheduler's drive loop
+        menu = main.Menu({"Explore": "1", "Rest in Town": "2", "Quit Game": "Q"}, recording_console())
+        menu.begin_choice()
+
+        class TimedScreen(Screen):
+            def update(self, renderable, refresh=True):
+                super().update(renderable, refresh=refresh)
+                rendered.set()
+
+        screen = TimedScreen(menu.make_panel(), console=menu.console)
+        screen.start()
+        rendered.clear()
+        latencies = []
+        thread = threading.Thread(target=typist, args=(latencies,))
+        with main.input_service.subscribed(menu.on_press):
+            thread.start()
+            menu.scheduler.drive(screen, menu.build, menu.done)
+        thread.join()
+        screen.stop()
+        results["menu"] = percentiles(latencies)
+
+        # Battle path: key on the input thread, frame on the render thread
+        console = recording_console()
+        battle = main.Battle(Character("Hero"), Enemy("Goblin", 30, 30, 8, 3, 20), console)
+        rendered.clear()
+
+        class TimedLive(Live):
+            def update(self, renderable, refresh=False):
+                super().update(renderable, refresh=refresh)
+                rendered.set()
+
+        live = TimedLive(battle.make_battle_display(), console=console, auto_refresh=False)
+        latencies = []
+        thread = threading.Thread(target=typist, args=(latencies,))
+        live.start()
+        thread.start()
+        terminal = main.Terminal(console)
+        terminal.live, terminal.screen = live, battle
+        terminal.read(battle)
+        thread.join()
+        live.stop()
+        results["battle"] = percentiles(latencies)
+    finally:
+        main.input_service.stop()
+        main.input_service = None
+    return results
+
+# Bytes per frame for full repaints vs the diffing screen, per screen type
+def bench_screen_diff(seconds: float) -> Dict[str, float]:
+    import main
+    from Characters.character import Character
+    from Characters.enemy import Enemy
+    from Game.screen import Screen
+    from Game.world import World
+    player = Character("Hero", inventory={"Potion": 2})
+    world = World(1, prefetch=False)
+    rng = random.Random(1)
+    battle = main.Battle(player, Enemy("Goblin", 30, 30, 8, 3, 20), recording_console())
+    explore = main.Explore(player, world, recording_console())
+    moves = ["up", "right", "down", "left"]
+
+    def select(i):
+        battle.selected_index = i % len(battle.options)
+
+    def walk(i):
+        world.walk(player, moves[(i // 3) % 4], rng)
+    result = {}
+    frames = max(50, int(100 * seconds))
+    for label, build, change in (("battle", battle.make_battle_display, select), ("explore", explore.make_explore_display, walk)):
+        console = recording_console()
+        result[f"{label}_full_bytes_per_frame"] = bench_frames(build, console, change, frames)["bytes_per_frame"]
+        screen = Screen(build(), console=recording_console())
+        screen.start()
+        start = screen.bytes_written
+        for i in range(frames):
+            change(i)
+            screen.update(build())
+        result[f"{label}_diff_bytes_per_frame"] = (screen.bytes_written - start) / frames
+    return result
+
+# Largest simulate/play startup ratio that counts as "a small fraction" of interactive startup
+SIMULATE_TARGET = 0.5
+
+# Cold start of each entry point command, measured in fresh interpreters
+def bench_startup(seconds: float) -> Dict[str, float]:
+    import subprocess, sys
+    from Game.__main__ import COMMANDS
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = max(5, int(5 * seconds))
+
+    def median_ms(args):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable] + args, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
+
+    # --help imports the command's module and parses arguments, then exits
+    result = {"python_ms": median_ms(["-c", "pass"])}
+    for name in COMMANDS:
+        result[f"{name}_ms"] = median_ms(["-m", "Game", name, "--help"])
+    # Interactive start also creates the keyboard backend, which loads pynput on desktops
+    result["play_ready_ms"] = median_ms(["-c", "import main; from Game.input import make_backend; make_backend('auto')"])
+    # A real run also needs numpy, which --help no longer loads
+    result["simulate_ready_ms"] = median_ms(["-c", "import numpy, Game.simulate"])
+    result["simulate_vs_play"] = result["simulate_ms"] / result["play_ready_ms"]
+    result["simulate_ready_vs_play"] = result["simulate_ready_ms"] / result["play_ready_ms"]
+    # 1 only when both the command line and a ready-to-run simulator beat the target fraction
+    result["simulate_target_met"] = float(max(result["simulate_vs_play"], result["simulate_ready_vs_play"]) <= SIMULATE_TARGET)
+    return result
+
+# Large synthetic enemy set: JSON parse vs memory-mapped pack load and lookups
+def bench_content(seconds: float, count: int = 50_000) -> Dict[str, float]:
+    import itertools, tempfile
+    from Characters.registry import EnemyRegistry, compile_enemies
+    rng = random.Random(1)
+    data = {f"enemy_{k:06d}": {"name": f"Enemy {k}", "hp": rng.randint(10, 500), "attack": rng.randint(1, 80),
+                               "defense": rng.randint(0, 40), "xp_reward": rng.randint(1, 900), "tier": rng.randint(1, 5),
+                               "min_level": rng.randint(1, 40), "weight": rng.random() + 0.1}
+            for k in range(count)}
+    ids = list(data)
+    result = {"records": count}
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "enemies.json")
+        with open(source, "w") as file:
+            json.dump(data, file)
+        start = time.perf_counter()
+        compile_enemies(source)
+        result["compile_s"] = time.perf_counter() - start
+
+        for label, use_pack in (("json", False), ("pack", True)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            registry = EnemyRegistry(source, check_interval=3600, use_pack=use_pack)
+            result[f"{label}_load_ms"] = (time.perf_counter() - start) * 1000
+            result[f"{label}_load_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+            keys = itertools.cycle(ids)
+            result[f"{label}_lookups_per_s"] = rate(lambda: registry.get(next(keys)), seconds / 4)
+            if registry.pack is not None:
+                registry.pack.close()
+    return result
+
+# Headless games played by a policy, one at a time and in lockstep batches
+def bench_agents(seconds: float) -> Dict[str, float]:
+    from Game.agent import run_games
+    result = {}
+    for label, batch in (("single", 0), ("batch256", 256)):
+        games = 256
+        run = run_games("potion", games, config=None, batch=batch)
+        while run["seconds"] < seconds / 2:
+            games *= 2
+            run = run_games("potion", games, config=None, batch=batch)
+        result[f"{label}_games_per_s"] = games / run["seconds"]
+    return result
+
+# Hits resolved per second with no statuses vs many, and when every hit follows a status change
+def bench_statuses(seconds: float, count: int = 50) -> Dict[str, float]:
+    from Characters.enemy import Enemy
+    from Characters.status import StatusDef
+    result = {}
+    defs = [StatusDef(id=f"buff{i}", defense=1, attack=1) for i in range(count)]
+    for label in ("none", f"active{count}"):
+        unit = Enemy("dummy", 10 ** 9, 10 ** 9, 5, 3, 0)
+        for defn in defs if label != "none" else ():
+            unit.add_status(defn)
+        result[f"{label}_hits_per_s"] = rate(lambda: unit.take_damage(100), seconds / 3)
+    # Removing and reapplying a status every hit forces a recompute over all of them
+    result[f"changing{count}_hits_per_s"] = rate(
+        lambda: (unit.remove_status(defs[0].id), unit.add_status(defs[0]), unit.take_damage(100)), seconds / 3)
+    return result
+
+# Stats database: time to queue a record on the game thread, background commit rate, and report queries
+def bench_stats(seconds: float, count: int = 50_000) -> Dict[str, float]:
+    import tempfile
+    from Game.stats import BattleRecord, StatsStore, StatsWriter
+    rng = random.Random(1)
+    outcomes = ["victory"] * 8 + ["defeat", "escaped"]
+    records = [BattleRecord(f"player{rng.randrange(1000)}", f"Enemy {rng.randrange(50)}", rng.choice(outcomes),
+                            rng.randint(1, 20), rng.randint(0, 100), rng.randint(0, 80), rng.randint(0, 2),
+                            level=rng.randint(1, 30), ended=time.time())
+               for _ in range(count)]
+    result = {"records": count}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.db")
+        writer = StatsWriter(path)
+        start = time.perf_counter()
+        for record in records:
+            writer.record(record)
+        queued = time.perf_counter() - start
+        writer.close()
+        elapsed = time.perf_counter() - start
+        result["queue_us"] = queued / count * 1e6
+        result["commits_per_s"] = count / elapsed
+        store = StatsStore(path)
+        result["leaderboard_per_s"] = rate(lambda: store.leaderboard("kills", 10), seconds / 3)
+        result["player_report_per_s"] = rate(lambda: (store.player("player7"), store.matchups("player7"),
+                                                      store.recent("player7")), seconds / 3)
+        result["enemies_per_s"] = rate(store.enemies, seconds / 3)
+        store.close()
+    return result
+
+# Turns per second as the encounter grows; heap scheduling should keep this roughly flat
+def bench_encounter(seconds: float) -> Dict[str, float]:
+    from Game.encounter import make_encounter
+    result = {}
+    for size in (10, 100, 1000):
+        turns = 0
+        elapsed = 0.0
+        seed = 0
+        while elapsed < seconds / 3:
+            encounter = make_encounter(max(1, size // 10), size, level=20, seed=seed)
+            start = time.perf_counter()
+            encounter.resolve(20 * size)
+            elapsed += time.perf_counter() - start
+            turns += encounter.turn
+            seed += 1
+        result[f"size{size}_turns_per_s"] = turns / elapsed
+    return result
+
+BENCHMARKS = {
+    "battle_render": bench_battle_render,
+    "inventory_render": bench_inventory_render,
+    "battles": bench_battles,
+    "spawns": bench_spawns,
+    "gain_exp": bench_gain_exp,
+    "screen_diff": bench_screen_diff,
+    "startup": bench_startup,
+    "content": bench_content,
+    "agents": bench_agents,
+    "statuses": bench_statuses,
+    "stats": bench_stats,
+    "encounter": bench_encounter,
+}
+
+# Run every benchmark and return a JSON-ready report
+def run_all(seconds: float = 1.0, samples: int = 200, only=None) -> dict:
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": {}}
+    for name, fn in BENCHMARKS.items():
+        if only is None or name in only:
+            report["results"][name] = fn(seconds)
+    if only is None or "input_latency" in only:
+        report["results"]["input_latency"] = bench_input_latency(samples)
+    return report
+
+# Flatten nested results into "group.metric" keys
+def flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+# Print results, with change vs a baseline if given
+def print_report(report: dict, baseline: dict = None):
+    current = flatten(report["results"])
+    previous = flatten(baseline["results"]) if baseline else {}
+    for key, value in current.items():
+        line = f"{key:<40}{value:>16,.3f}"
+        if key in previous and previous[key]:
+            line += f"  ({(value - previous[key]) / previous[key] * 100:+.1f}%)"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless performance benchmarks")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per throughput benchmark")
+    parser.add_argument("--samples", type=int, default=200, help="Keypresses per latency benchmark")
+    parser.add_argument("--only", nargs="*", default=None, help="Run only these benchmarks")
+    parser.add_argument("--save", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Compare against a saved JSON baseline")
+    args = parser.parse_args(argv)
+
+    report = run_all(args.seconds, args.samples, args.only)
+    baseline = None
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
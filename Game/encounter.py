@@ -0,0 +1,368 @@
+# Multi-combatant battles: a party against a horde, turns taken in initiative order
+import argparse, heapq, itertools, random, time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
+from Characters.character import Character
+from Characters.enemy import Enemy
+from Characters.registry import get_registry
+from Game.engine import Action, BattleEvent, BattleResult, ATTACK, USE_ITEM, RUN, VICTORY, DEFEAT, ESCAPED
+
+# Sides
+PARTY = 0
+HORDE = 1
+
+# Ticks between turns for a combatant of speed 1; faster combatants act proportionally more often
+INITIATIVE = 1200
+DEFAULT_SPEED = 10
+
+# Target selection
+WEAKEST = "weakest"
+RANDOM = "random"
+
+# Initiative timeline: O(log n) next actor, joins, removals and delays
+# Removed entries are left in the heap and skipped, and the heap is rebuilt once they outnumber live ones
+class TurnQueue:
+    def __init__(self):
+        self.heap: List[list] = []
+        self.entries: Dict[int, list] = {}
+        self.now = 0
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, slot: int) -> bool:
+        return slot in self.entries
+
+    # Schedule a slot `ticks` from now, replacing any earlier entry
+    def schedule(self, slot: int, ticks: int):
+        self.schedule_at(slot, self.now + ticks)
+
+    def schedule_at(self, slot: int, tick: int):
+        self.remove(slot)
+        # Ties go to whoever was scheduled first
+        entry = [tick, next(self._order), slot]
+        self.entries[slot] = entry
+        heapq.heappush(self.heap, entry)
+
+    def remove(self, slot: int):
+        entry = self.entries.pop(slot, None)
+        if entry is not None:
+            entry[-1] = None
+            if len(self.heap) > 2 * len(self.entries) + 32:
+                self.heap = [e for e in self.heap if e[-1] is not None]
+                heapq.heapify(self.heap)
+
+    # Push a slot's next turn back
+    def delay(self, slot: int, ticks: int):
+        self.schedule_at(slot, self.entries[slot][0] + ticks)
+
+    def when(self, slot: int) -> int:
+        return self.entries[slot][0]
+
+    def peek(self) -> int:
+        heap = self.heap
+        while heap and heap[0][-1] is None:
+            heapq.heappop(heap)
+        if not heap:
+            raise IndexError("No combatant is scheduled.")
+        return heap[0][-1]
+
+    # Advance the clock to the next turn and return whose it is
+    def pop(self) -> int:
+        slot = self.peek()
+        tick, _, _ = heapq.heappop(self.heap)
+        del self.entries[slot]
+        self.now = tick
+        return slot
+
+# Living members of one side, indexed for targeting
+# A swap-remove list gives O(1) random picks; a lazy (hp, slot) heap gives the weakest in O(log n)
+class Roster:
+    def __init__(self):
+        self.members: List[int] = []
+        self.position: Dict[int, int] = {}
+        self.hp: Dict[int, int] = {}
+        self._by_hp: List[tuple] = []
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, slot: int) -> bool:
+        return slot in self.position
+
+    def add(self, slot: int, hp: int):
+        self.position[slot] = len(self.members)
+        self.members.append(slot)
+        self.update(slot, hp)
+
+    def remove(self, slot: int):
+        index = self.position.pop(slot)
+        last = self.members.pop()
+        if last != slot:
+            self.members[index] = last
+            self.position[last] = index
+        del self.hp[slot]
+
+    # Record a member's new hp; the old heap entry goes stale
+    def update(self, slot: int, hp: int):
+        self.hp[slot] = hp
+        heapq.heappush(self._by_hp, (hp, slot))
+        if len(self._by_hp) > 2 * len(self.members) + 32:
+            self._by_hp = [(h, s) for s, h in self.hp.items()]
+            heapq.heapify(self._by_hp)
+
+    def random(self, rng: random.Random) -> int:
+        return self.members[rng.randrange(len(self.members))]
+
+    # Living member with the least hp, lowest slot first on ties
+    def weakest(self) -> int:
+        heap = self._by_hp
+        while heap:
+            hp, slot = heap[0]
+            if self.hp.get(slot) == hp:
+                return slot
+            heapq.heappop(heap)
+        raise IndexError("Roster is empty.")
+
+# One combatant in an encounter
+@dataclass(slots=True)
+class Fighter:
+    slot: int
+    unit: object
+    side: int
+    speed: int
+    # Unique display name, e.g. "Slime #3"
+    label: str
+
+    def is_alive(self) -> bool:
+        return self.unit.is_alive()
+
+# Decides a party member's action; horde members always attack
+Chooser = Callable[["Encounter", Fighter], Union[Action, str]]
+
+def attack_choice(encounter: "Encounter", fighter: Fighter) -> Action:
+    return Action(ATTACK)
+
+# Party-vs-horde battle rules, headless like BattleEngine
+class Encounter:
+    def __init__(self, rng: random.Random = None, log=None, choose: Chooser = attack_choice,
+                 targeting: str = WEAKEST):
+        if targeting not in (WEAKEST, RANDOM):
+            raise ValueError(f"Unknown targeting '{targeting}'.")
+        self.rng = rng or random.Random()
+        self.log = log
+        self.choose = choose
+        self.targeting = targeting
+        self.fighters: Dict[int, Fighter] = {}
+        self.rosters = (Roster(), Roster())
+        self.queue = TurnQueue()
+        self.turn = 0
+        self.result: Optional[BattleResult] = None
+        # XP from every horde member defeated so far
+        self.xp_pool = 0
+        # Events produced by the most recent step
+        self.events: List[BattleEvent] = []
+        self._slots = itertools.count()
+        self._names: Dict[str, int] = {}
+
+    def is_over(self) -> bool:
+        return self.result is not None
+
+    def living(self, side: int) -> List[Fighter]:
+        return [self.fighters[slot] for slot in self.rosters[side].members]
+
+    # Add a combatant; allowed mid-fight, its first turn comes one interval after joining
+    def join(self, unit, side: int, speed: int = DEFAULT_SPEED) -> Fighter:
+        if speed <= 0:
+            raise ValueError("Speed must be positive.")
+        seen = self._names.get(unit.name, 0) + 1
+        self._names[unit.name] = seen
+        label = unit.name if seen == 1 else f"{unit.name} #{seen}"
+        fighter = Fighter(next(self._slots), unit, side, speed, label)
+        self.fighters[fighter.slot] = fighter
+        if unit.is_alive():
+            self.rosters[side].add(fighter.slot, unit.hp)
+            self.queue.schedule(fighter.slot, self.interval(fighter))
+        return fighter
+
+    def interval(self, fighter: Fighter) -> int:
+        return max(1, INITIATIVE // fighter.speed)
+
+    # Push a combatant's next turn back
+    def delay(self, fighter: Fighter, ticks: int):
+        if fighter.slot in self.queue:
+            self.queue.delay(fighter.slot, ticks)
+
+    # Take a combatant out of the fight without a death
+    def leave(self, fighter: Fighter):
+        self._drop(fighter)
+        self._check_over()
+
+    # Whose turn is next
+    def next_actor(self) -> Fighter:
+        return self.fighters[self.queue.peek()]
+
+    def target_for(self, fighter: Fighter) -> Fighter:
+        roster = self.rosters[HORDE if fighter.side == PARTY else PARTY]
+        slot = roster.weakest() if self.targeting == WEAKEST else roster.random(self.rng)
+        return self.fighters[slot]
+
+    def emit(self, kind: str, actor: str, message: str, target: str = None, amount: int = 0, hp_after: int = None) -> BattleEvent:
+        event = BattleEvent(self.turn, kind, actor, message, target, amount, hp_after)
+        self.events.append(event)
+        if self.log is not None:
+            self.log.append(event)
+        return event
+
+    # Resolve the next combatant's turn
+    def step(self, action: Union[Action, str] = None) -> List[BattleEvent]:
+        if self.is_over():
+            raise RuntimeError("Battle is already over.")
+        self.turn += 1
+        self.events = []
+        fighter = self.fighters[self.queue.pop()]
+        if not self._tick_statuses(fighter):
+            self._check_over()
+            return self.events
+        if fighter.side == PARTY:
+            if action is None:
+                action = self.choose(self, fighter)
+            if isinstance(action, str):
+                action = Action(action)
+        else:
+            action = Action(ATTACK)
+
+        if action.kind == ATTACK:
+            self._attack(fighter, self.target_for(fighter))
+        elif action.kind == USE_ITEM:
+            unit = fighter.unit
+            before = unit.hp
+            msg = unit.use_item(action.item) if action.item is not None else "Nothing used."
+            self.rosters[fighter.side].update(fighter.slot, unit.hp)
+            self.emit("item", fighter.label, msg, action.item, unit.hp - before, unit.hp)
+        elif action.kind == RUN:
+            # Same roll as a one-on-one battle; the whole party flees together
+            if self.rng.randint(0, 10) > 5:
+                self.emit("run", fighter.label, "The party ran away!")
+                self.result = BattleResult(ESCAPED, self.turn)
+                return self.events
+            self.emit("run_failed", fighter.label, "Failed to run away!")
+        else:
+            raise ValueError(f"Unknown action '{action.kind}'.")
+
+        if fighter.slot in self.rosters[fighter.side]:
+            self.queue.schedule(fighter.slot, self.interval(fighter))
+        self._check_over()
+        return self.events
+
+    # Start-of-turn status effects; returns whether the fighter is still standing
+    def _tick_statuses(self, fighter: Fighter) -> bool:
+        unit = fighter.unit
+        if not unit.statuses:
+            return True
+        changes = unit.tick_statuses()
+        for status, amount, expired in changes:
+            if amount < 0:
+                self.emit("status", fighter.label, f"{status.id} dealt {-amount} damage to {fighter.label}!",
+                          fighter.label, amount, unit.hp)
+            elif amount > 0:
+                self.emit("status", fighter.label, f"{status.id} restored {amount} HP to {fighter.label}!",
+                          fighter.label, amount, unit.hp)
+            if expired:
+                self.emit("status_end", fighter.label, f"{fighter.label}'s {status.id} wore off.", fighter.label)
+        return self._wounded(fighter)
+
+    def _attack(self, fighter: Fighter, target: Fighter):
+        unit = target.unit
+        damage = unit.take_damage(fighter.unit.effective_attack)
+        self.emit("attack", fighter.label, f"{fighter.label} dealt {damage} damage to {target.label}!",
+                  target.label, damage, unit.hp)
+        status = fighter.unit.inflict(unit, damage, self.rng) if isinstance(fighter.unit, Enemy) else None
+        if status is not None:
+            self.emit("status_start", fighter.label, f"{fighter.label} inflicted {status.id} on {target.label}!", target.label)
+        self._wounded(target)
+
+    # Update the target index after an hp change, dropping the fighter if it died
+    def _wounded(self, fighter: Fighter) -> bool:
+        unit = fighter.unit
+        if unit.is_alive():
+            self.rosters[fighter.side].update(fighter.slot, unit.hp)
+            return True
+        self._drop(fighter)
+        if fighter.side == HORDE:
+            self.xp_pool += unit.xp_reward
+        self.emit("defeated", fighter.label, f"{fighter.label} was defeated!", amount=getattr(unit, "xp_reward", 0))
+        return False
+
+    def _drop(self, fighter: Fighter):
+        if fighter.slot in self.rosters[fighter.side]:
+            self.rosters[fighter.side].remove(fighter.slot)
+        self.queue.remove(fighter.slot)
+
+    # End the battle once either side is empty; surviving characters split the horde's XP evenly,
+    # the first ones taking the remainder
+    def _check_over(self):
+        if self.result is not None:
+            return
+        if not self.rosters[PARTY]:
+            self.emit("defeat", "party", "The party has been defeated...")
+            self.result = BattleResult(DEFEAT, self.turn)
+        elif not self.rosters[HORDE]:
+            self.emit("victory", "party", f"The horde is defeated! Gained {self.xp_pool} XP.", amount=self.xp_pool)
+            survivors = [f.unit for f in self.living(PARTY) if isinstance(f.unit, Character)]
+            share, extra = divmod(self.xp_pool, len(survivors)) if survivors else (0, 0)
+            levels = 0
+            for k, unit in enumerate(survivors):
+                levels += len(unit.gain_exp(share + (k < extra)))
+            self.result = BattleResult(VICTORY, self.turn, self.xp_pool, levels)
+
+    # Play to the end, or until max_turns turns have passed
+    def resolve(self, max_turns: int = None) -> Optional[BattleResult]:
+        while not self.is_over() and (max_turns is None or self.turn < max_turns):
+            self.step()
+        return self.result
+
+# Party of leveled heroes against a horde drawn from the registry
+def make_encounter(party: int, horde: int, level: int = 1, seed: int = None, targeting: str = WEAKEST,
+                   log=None) -> Encounter:
+    rng = random.Random(seed)
+    encounter = Encounter(rng, log=log, targeting=targeting)
+    registry = get_registry()
+    for i in range(party):
+        hero = Character(name=f"Hero {i + 1}")
+        hero.gain_exp(hero.curve.total_for(level))
+        encounter.join(hero, PARTY, speed=12)
+    for _ in range(horde):
+        encounter.join(registry.random_enemy(rng=rng), HORDE, speed=rng.randint(6, 14))
+    return encounter
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless party-vs-horde battles")
+    parser.add_argument("--party", type=int, default=4)
+    parser.add_argument("--horde", type=int, default=40)
+    parser.add_argument("--level", type=int, default=5, help="Party level")
+    parser.add_argument("--battles", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--targeting", choices=(WEAKEST, RANDOM), default=WEAKEST)
+    parser.add_argument("--max-turns", type=int, default=100_000, help="Turns before a battle is abandoned")
+    args = parser.parse_args(argv)
+
+    outcomes: Dict[str, int] = {}
+    turns = 0
+    start = time.perf_counter()
+    for i in range(args.battles):
+        encounter = make_encounter(args.party, args.horde, args.level, args.seed + i, args.targeting)
+        result = encounter.resolve(args.max_turns)
+        outcome = result.outcome if result else "timeout"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        turns += encounter.turn
+    elapsed = time.perf_counter() - start
+    for outcome, count in sorted(outcomes.items()):
+        print(f"{outcome:<20}{count:>14,}")
+    print(f"{'mean_turns':<20}{turns / args.battles:>14,.1f}")
+    print(f"{'turns_per_s':<20}{turns / elapsed:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Headless battle engine
+import random
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Union
+
+from Characters.character import Character
+from Characters.enemy import Enemy
+
+# Player actions
+ATTACK = "attack"
+USE_ITEM = "use item"
+RUN = "run"
+
+# Battle outcomes
+VICTORY = "victory"
+DEFEAT = "defeat"
+ESCAPED = "escaped"
+
+@dataclass
+class Action:
+    kind: str
+    item: Optional[str] = None
+
+@dataclass
+class BattleEvent:
+    turn: int
+    kind: str
+    actor: str
+    message: str
+    target: Optional[str] = None
+    amount: int = 0
+    hp_after: Optional[int] = None
+
+@dataclass
+class BattleResult:
+    outcome: str
+    turns: int
+    xp_gained: int = 0
+    levels_gained: int = 0
+
+# Pure battle rules, no terminal or timing involved
+class BattleEngine:
+    def __init__(self, player: Character, enemy: Enemy, rng: random.Random = None, log=None):
+        self.player = player
+        self.enemy = enemy
+        self.rng = rng or random.Random()
+        self.turn = 0
+        self.result: Optional[BattleResult] = None
+        # Events produced by the most recent step
+        self.events: List[BattleEvent] = []
+        # Optional CombatLog that receives every event
+        self.log = log
+
+    # Check if the battle has finished
+    def is_over(self) -> bool:
+        return self.result is not None
+
+    # Record an event for the current turn
+    def emit(self, kind: str, actor: str, message: str, target: str = None, amount: int = 0, hp_after: int = None) -> BattleEvent:
+        event = BattleEvent(self.turn, kind, actor, message, target, amount, hp_after)
+        self.events.append(event)
+        if self.log is not None:
+            self.log.append(event)
+        return event
+
+    # Resolve one full turn (player action followed by enemy reply)
+    def step(self, action: Union[Action, str]) -> List[BattleEvent]:
+        if self.is_over():
+            raise RuntimeError("Battle is already over.")
+        if isinstance(action, str):
+            action = Action(action)
+
+        self.turn += 1
+        self.events = []
+        player, enemy = self.player, self.enemy
+        self.emit("player_turn", player.name, "Player's Turn:")
+        if player.statuses and not self.tick_statuses(player):
+            return self._defeat()
+
+        # Player's turn
+        if action.kind == ATTACK:
+            damage = enemy.take_damage(player.effective_attack)
+            self.emit("attack", player.name, f"You dealt {damage} damage to {enemy.name}!", enemy.name, damage, enemy.hp)
+        elif action.kind == USE_ITEM:
+            self.emit("use_item", player.name, "Using Item")
+            if action.item is not None:
+                before = player.hp
+                msg = player.use_item(action.item)
+                self.emit("item", player.name, msg, action.item, player.hp - before, player.hp)
+        elif action.kind == RUN:
+            if self.rng.randint(0, 10) > 5:
+                self.emit("run", player.name, "You successfully ran away!")
+                self.result = BattleResult(ESCAPED, self.turn)
+                return self.events
+            self.emit("run_failed", player.name, "Failed to run away!")
+        else:
+            raise ValueError(f"Unknown action '{action.kind}'.")
+
+        # Check if enemy is defeated
+        if not enemy.is_alive():
+            return self._victory()
+
+        # Enemy's turn
+        self.emit("enemy_turn", enemy.name, "Enemy's Turn:")
+        if enemy.statuses and not self.tick_statuses(enemy):
+            return self._victory()
+        damage = player.take_damage(enemy.effective_attack)
+        self.emit("enemy_attack", enemy.name, f"{enemy.name} dealt {damage} damage to you!", player.name, damage, player.hp)
+        status = enemy.inflict(player, damage, self.rng)
+        if status is not None:
+            self.emit("status_start", enemy.name, f"{enemy.name} inflicted {status.id} on you!", player.name)
+
+        # Check if player is defeated
+        if not player.is_alive():
+            return self._defeat()
+        return self.events
+
+    # Start-of-turn status effects; returns whether the combatant is still alive
+    def tick_statuses(self, unit) -> bool:
+        for status, amount, expired in unit.tick_statuses():
+            if amount < 0:
+                self.emit("status", unit.name, f"{status.id} dealt {-amount} damage to {unit.name}!", unit.name, amount, unit.hp)
+            elif amount > 0:
+                self.emit("status", unit.name, f"{status.id} restored {amount} HP to {unit.name}!", unit.name, amount, unit.hp)
+            if expired:
+                self.emit("status_end", unit.name, f"{unit.name}'s {status.id} wore off.", unit.name)
+        return unit.is_alive()
+
+    def _victory(self) -> List[BattleEvent]:
+        player, enemy = self.player, self.enemy
+        self.emit("victory", player.name, f"You defeated the {enemy.name}! Gained {enemy.xp_reward} XP.", enemy.name, enemy.xp_reward)
+        old_level = player.level
+        player.gain_exp(enemy.xp_reward)
+        if player.level > old_level:
+            self.emit("level_up", player.name, f"Level UP! {old_level} -> level {player.level}", amount=player.level - old_level)
+        self.result = BattleResult(VICTORY, self.turn, enemy.xp_reward, player.level - old_level)
+        return self.events
+
+    def _defeat(self) -> List[BattleEvent]:
+        self.emit("defeat", self.player.name, "You have been defeated...")
+        self.result = BattleResult(DEFEAT, self.turn)
+        return self.events
+
+    # Play the battle to the end using a decision function
+    def resolve(self, choose: Callable[["BattleEngine"], Union[Action, str]]) -> BattleResult:
+        while not self.is_over():
+            self.step(choose(self))
+        return self.result
+
+# Always attack
+def attack_policy(engine: BattleEngine) -> Action:
+    return Action(ATTACK)
+
+# Run a full battle without any UI
+def run_battle(player: Character, enemy: Enemy, choose=attack_policy, rng: random.Random = None) -> BattleResult:
+    return BattleEngine(player, enemy, rng).resolve(choose)
@@ -0,0 +1,283 @@
+# Persistent keyboard input service
+import os, queue, sys, threading
+from contextlib import contextmanager
+from typing import Callable, List
+
+# Normalized key names
+UP = "up"
+DOWN = "down"
+LEFT = "left"
+RIGHT = "right"
+ENTER = "enter"
+ESC = "esc"
+# Sent once when the input stream closes
+EOF = "eof"
+
+# Raised by readers that were waiting for a key when the input stream closed
+class InputClosed(Exception):
+    pass
+
+# Escape sequences sent by terminals for special keys
+ESCAPE_KEYS = {"[A": UP, "[B": DOWN, "[C": RIGHT, "[D": LEFT, "OA": UP, "OB": DOWN, "OC": RIGHT, "OD": LEFT}
+
+# Incremental parser turning raw terminal input into key names
+class KeyParser:
+    def __init__(self):
+        self.pending = ""
+        self.last_cr = False
+
+    # Feed decoded text, returning the complete keys it contained
+    def feed(self, data: str) -> List[str]:
+        keys = []
+        text = self.pending + data
+        self.pending = ""
+        i = 0
+        while i < len(text):
+            ch = text[i]
+            if ch == "\x1b":
+                if i + 2 >= len(text):
+                    # Wait for the rest of the escape sequence
+                    self.pending = text[i:]
+                    break
+                keys.append(ESCAPE_KEYS.get(text[i + 1:i + 3], ESC))
+                i += 3
+                self.last_cr = False
+                continue
+            if ch == "\r" or (ch == "\n" and not self.last_cr):
+                keys.append(ENTER)
+            elif ch not in ("\n", "\x00"):
+                keys.append(ch)
+            self.last_cr = ch == "\r"
+            i += 1
+        return keys
+
+# Global keyboard hook through pynput (needs X/uinput or a desktop session)
+class PynputBackend:
+    def __init__(self):
+        self.listener = None
+
+    # Map a pynput key to a key name
+    @staticmethod
+    def normalize(key):
+        from pynput import keyboard
+        names = {keyboard.Key.up: UP, keyboard.Key.down: DOWN, keyboard.Key.left: LEFT,
+                 keyboard.Key.right: RIGHT, keyboard.Key.enter: ENTER, keyboard.Key.esc: ESC}
+        if key in names:
+            return names[key]
+        return getattr(key, "char", None) or str(key)
+
+    def start(self, emit: Callable[[str], None]):
+        from pynput import keyboard
+        self.listener = keyboard.Listener(on_press=lambda key: emit(self.normalize(key)))
+        self.listener.start()
+
+    def stop(self):
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+
+    # Drop keystrokes the terminal buffered while pynput was listening
+    def flush(self):
+        flush_terminal()
+
+# Reads raw keystrokes from stdin, works over SSH and in containers
+class StdinBackend:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self.thread = None
+        self.running = False
+        self._saved = None
+
+    def start(self, emit: Callable[[str], None]):
+        self.running = True
+        if sys.platform != "win32" and self.stream.isatty():
+            import termios, tty
+            fd = self.stream.fileno()
+            self._saved = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+        self.thread = threading.Thread(target=self._read_loop, args=(emit,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._saved is not None:
+            import termios
+            termios.tcsetattr(self.stream.fileno(), termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    # The reader thread consumes everything, so there is nothing left to flush
+    def flush(self):
+        pass
+
+    def _read_char(self) -> str:
+        if sys.platform == "win32":
+            import msvcrt
+            return msvcrt.getwch()
+        data = os.read(self.stream.fileno(), 1)
+        return data.decode(errors="ignore") if data else ""
+
+    def _pending(self, timeout: float) -> bool:
+        if sys.platform == "win32":
+            import msvcrt
+            return msvcrt.kbhit()
+        import select
+        return bool(select.select([self.stream], [], [], timeout)[0])
+
+    def _read_loop(self, emit: Callable[[str], None]):
+        parser = KeyParser()
+        while self.running:
+            ch = self._read_char()
+            if not ch:
+                emit(EOF)
+                break
+            if sys.platform == "win32" and ch in ("\x00", "\xe0"):
+                emit({"H": UP, "P": DOWN, "K": LEFT, "M": RIGHT}.get(self._read_char(), ESC))
+                continue
+            for key in parser.feed(ch):
+                emit(key)
+            # A lone Esc is not followed by the rest of a sequence
+            if parser.pending and not self._pending(0.05):
+                parser.pending = ""
+                emit(ESC)
+
+# Keys pushed by code instead of a keyboard (tests, benchmarks, bots)
+class ScriptedBackend:
+    def __init__(self):
+        self.emit = None
+
+    def start(self, emit: Callable[[str], None]):
+        self.emit = emit
+
+    def stop(self):
+        self.emit = None
+
+    def flush(self):
+        pass
+
+    # Deliver a key as if it had been typed
+    def press(self, key: str):
+        if self.emit is not None:
+            self.emit(key)
+
+# One listener for the whole session; screens subscribe instead of spawning threads
+class InputService:
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend()
+        self.events: "queue.Queue[str]" = queue.Queue()
+        self._handlers: List[Callable[[str], None]] = []
+        self._lock = threading.RLock()
+        self.running = False
+        self.closed = False
+
+    def start(self):
+        if not self.running:
+            self.backend.start(self.dispatch)
+            self.running = True
+
+    def stop(self):
+        if self.running:
+            self.backend.stop()
+            self.running = False
+
+    # Send a key to the newest subscriber, or queue it if nobody takes it.
+    # A handler that returns False is finished and leaves the key queued.
+    # EOF is never queued: it sets `closed` and is sent to the waiting subscriber, and to every later one
+    def dispatch(self, key: str):
+        with self._lock:
+            handler = self._handlers[-1] if self._handlers else None
+            if key == EOF:
+                self.closed = True
+                if handler is not None:
+                    handler(EOF)
+            elif handler is None or handler(key) is False:
+                self.events.put_nowait(key)
+
+    # Subscribe a handler and hand it any keys typed ahead
+    def subscribe(self, handler: Callable[[str], None]):
+        with self._lock:
+            self._handlers.append(handler)
+            pending = []
+            while True:
+                try:
+                    pending.append(self.events.get_nowait())
+                except queue.Empty:
+                    break
+            for i, key in enumerate(pending):
+                if handler(key) is False:
+                    for rest in pending[i:]:
+                        self.events.put_nowait(rest)
+                    break
+            if self.closed:
+                handler(EOF)
+
+    def unsubscribe(self, handler: Callable[[str], None]):
+        with self._lock:
+            if handler in self._handlers:
+                self._handlers.remove(handler)
+
+    @contextmanager
+    def subscribed(self, handler: Callable[[str], None]):
+        self.subscribe(handler)
+        try:
+            yield
+        finally:
+            self.unsubscribe(handler)
+
+    # Non-blocking read of a queued key (None if empty)
+    def get_nowait(self):
+        try:
+            return self.events.get_nowait()
+        except queue.Empty:
+            return None
+
+    # Blocking read of the next queued key
+    def get(self, timeout: float = None):
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    # Block until a specific key is pressed; raises InputClosed if input ends first
+    def wait_for(self, key: str = ENTER):
+        pressed = threading.Event()
+
+        def handler(k):
+            if pressed.is_set():
+                return False
+            if k == key or k == EOF:
+                pressed.set()
+
+        with self.subscribed(handler):
+            pressed.wait()
+        if self.closed:
+            raise InputClosed("Input stream closed.")
+
+    # Discard queued and buffered keystrokes
+    def flush(self):
+        while self.get_nowait() is not None:
+            pass
+        self.backend.flush()
+
+# Drop pending terminal input without sleeping
+def flush_terminal():
+    if sys.platform == "win32":
+        import msvcrt
+        while msvcrt.kbhit():
+            msvcrt.getch()
+    elif sys.stdin.isatty():
+        import termios
+        termios.tcflush(sys.stdin, termios.TCIFLUSH)
+
+# pynput when a display is available, raw stdin otherwise
+def default_backend():
+    if sys.platform == "win32" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        return PynputBackend()
+    return StdinBackend()
+
+# Create a backend by name
+def make_backend(name: str = "auto"):
+    if name == "pynput":
+        return PynputBackend()
+    if name == "stdin":
+        return StdinBackend()
+    return default_backend()
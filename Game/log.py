@@ -0,0 +1,77 @@
+# Bounded combat log with optional JSONL streaming
+import json, queue, threading
+from collections import deque
+from dataclasses import asdict
+from typing import List
+
+# Keeps only the most recent events in memory
+class CombatLog:
+    def __init__(self, maxlen: int = 64, writer: "JsonlWriter" = None):
+        self.events = deque(maxlen=maxlen)
+        self.writer = writer
+        self.version = 0
+
+    def append(self, event):
+        self.events.append(event)
+        self.version += 1
+        if self.writer is not None:
+            self.writer.write(event)
+
+    # Last n events, oldest first
+    def recent(self, n: int) -> List:
+        if n >= len(self.events):
+            return list(self.events)
+        return list(self.events)[-n:]
+
+    def __len__(self):
+        return len(self.events)
+
+    def __bool__(self):
+        return bool(self.events)
+
+# Streams events to a JSONL file from a background thread in batches
+class JsonlWriter:
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._queue = queue.SimpleQueue()
+        self._stop = object()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Queue an event without touching the disk
+    def write(self, event):
+        self._queue.put(event)
+
+    # Flush the remaining events and stop the writer thread
+    def close(self):
+        self._queue.put(self._stop)
+        self._thread.join()
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as file:
+            running = True
+            while running:
+                batch = []
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                    while True:
+                        if item is self._stop:
+                            running = False
+                            break
+                        batch.append(item)
+                        if len(batch) >= self.batch_size:
+                            break
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                if batch:
+                    file.write("".join(json.dumps(to_record(e)) + "\n" for e in batch))
+                    file.flush()
+                    self.written += len(batch)
+
+# Convert a log event to a JSON-ready dict
+def to_record(event) -> dict:
+    return asdict(event) if hasattr(event, "__dataclass_fields__") else {"message": str(event)}
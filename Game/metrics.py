@@ -0,0 +1,138 @@
+# Runtime instrumentation: timers, counters and a frame overlay
+import functools, json, time
+from collections import deque
+from typing import Dict, List, Tuple
+
+# Key that toggles the on-screen overlay
+OVERLAY_KEY = "p"
+
+# Rolling samples for one timer
+class Timer:
+    def __init__(self, window: int = 1024):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    # Percentile of the recent window, in milliseconds
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+        }
+
+# Hooks are only wrapped while enabled, so disabled metrics cost nothing
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.overlay = False
+        self.timers: Dict[str, Timer] = {}
+        self.counters: Dict[str, int] = {}
+        self._hooks: List[Tuple[object, str, str, str]] = []
+        self._originals: Dict[Tuple[int, str], object] = {}
+        self._frames = deque(maxlen=120)
+        self._key_time = None
+
+    # Declare a function to instrument: kind is "timer", "frame" or "input"
+    def register(self, owner, attr: str, name: str, kind: str = "timer"):
+        self._hooks.append((owner, attr, name, kind))
+        if self.enabled:
+            self._wrap(owner, attr, name, kind)
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            for hook in self._hooks:
+                self._wrap(*hook)
+
+    # Restore every original function
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            for owner, attr, _, _ in self._hooks:
+                original = self._originals.pop((id(owner), attr), None)
+                if original is not None:
+                    setattr(owner, attr, original)
+
+    def timer(self, name: str) -> Timer:
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Timer()
+        return timer
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _wrap(self, owner, attr: str, name: str, kind: str):
+        key = (id(owner), attr)
+        if key in self._originals:
+            return
+        original = owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr)
+        self._originals[key] = original
+        fn = original.__func__ if isinstance(original, staticmethod) else original
+        timer = self.timer(name)
+        metrics = self
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if kind == "input":
+                metrics._key_time = time.perf_counter()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                timer.observe(end - start)
+                if kind == "frame":
+                    metrics._frames.append(end)
+                    if metrics._key_time is not None:
+                        metrics.timer("input.latency").observe(end - metrics._key_time)
+                        metrics._key_time = None
+
+        setattr(owner, attr, staticmethod(wrapper) if isinstance(original, staticmethod) else wrapper)
+
+    # Frames per second over the recent window
+    def fps(self) -> float:
+        if len(self._frames) < 2:
+            return 0.0
+        span = self._frames[-1] - self._frames[0]
+        return (len(self._frames) - 1) / span if span > 0 else 0.0
+
+    # One-line overlay text
+    def overlay_text(self) -> str:
+        frame = self.timer("live.update")
+        latency = self.timer("input.latency")
+        text = (f"frame p50 {frame.percentile(0.5):.2f}ms p99 {frame.percentile(0.99):.2f}ms | "
+                f"input p50 {latency.percentile(0.5):.2f}ms p99 {latency.percentile(0.99):.2f}ms | "
+                f"{self.fps():.1f} fps")
+        frames = self.counters.get("screen.frames")
+        if frames:
+            text += f" | {self.counters.get('screen.bytes', 0) / frames:.0f} B/frame"
+        return text
+
+    def summary(self) -> dict:
+        return {
+            "timers": {name: timer.summary() for name, timer in self.timers.items()},
+            "counters": dict(self.counters),
+            "fps": self.fps(),
+        }
+
+    # Write a JSON summary of everything collected
+    def export(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+# Process-wide metrics
+metrics = Metrics()
@@ -0,0 +1,35 @@
+# Central pacing policy for delays and pauses
+import time
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class Pacing:
+    name: str
+    # Seconds to hold the screen after each battle action
+    action_delay: float
+    # Skip "Press Enter to continue" pauses
+    auto_continue: bool = False
+    # Answer prompts with their defaults instead of asking
+    interactive: bool = True
+
+PRESETS = {
+    "normal": Pacing("normal", 0.1),
+    "fast": Pacing("fast", 0.03),
+    "turbo": Pacing("turbo", 0.0, auto_continue=True),
+    "auto": Pacing("auto", 0.0, auto_continue=True, interactive=False),
+}
+
+current = PRESETS["normal"]
+
+# Select a preset by name
+def set_pacing(name: str) -> Pacing:
+    global current
+    if name not in PRESETS:
+        raise ValueError(f"Unknown pacing '{name}', expected one of {', '.join(PRESETS)}.")
+    current = PRESETS[name]
+    return current
+
+# Hold the screen after an action for the configured time
+def action_delay():
+    if current.action_delay > 0:
+        time.sleep(current.action_delay)
@@ -0,0 +1,32 @@
+# Event-driven render scheduling
+import threading
+from typing import Callable
+
+# Wakes the renderer only when the view has changed
+class RenderScheduler:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._dirty = True
+
+    # Flag the view as changed and wake the renderer
+    def mark_dirty(self):
+        with self._cond:
+            self._dirty = True
+            self._cond.notify_all()
+
+    # Block until the view is dirty, then clear the flag
+    def wait(self, timeout: float = None) -> bool:
+        with self._cond:
+            while not self._dirty:
+                if not self._cond.wait(timeout):
+                    return False
+            self._dirty = False
+            return True
+
+    # Redraw on every change until done() is true
+    def drive(self, live, build: Callable, done: Callable[[], bool]):
+        while True:
+            self.wait()
+            live.update(build(), refresh=True)
+            if done():
+                break
@@ -0,0 +1,252 @@
+# Save/load with compact snapshots and an append-only autosave journal
+import json, os, struct
+from typing import Optional, Tuple
+
+from Characters.character import Character
+
+MAGIC = b"TRPG"
+VERSION = 3
+
+# Snapshot layout: magic, version, generation (version 3+), then the character
+HEADER = struct.Struct("<4sH")
+GENERATION = struct.Struct("<I")
+STATS = struct.Struct("<6i")
+COUNT = struct.Struct("<H")
+QTY = struct.Struct("<i")
+# String length prefix by save version; version 1 used a single byte
+STR_LEN = {1: struct.Struct("<B"), 2: struct.Struct("<H"), 3: struct.Struct("<H")}
+
+# Journal layout (version 3+): magic and the generation of the snapshot it extends, then records
+JOURNAL_MAGIC = b"TRPJ"
+JOURNAL_HEADER = struct.Struct("<4sI")
+
+# Journal record opcodes
+OP_HP = 1
+OP_XP = 2
+OP_ITEM = 3
+OP_STATS = 4
+
+# Pack a length-prefixed utf-8 string
+def pack_str(value: str) -> bytes:
+    data = value.encode("utf-8")
+    if len(data) > 0xFFFF:
+        raise ValueError(f"String of {len(data)} bytes is too long to save.")
+    return STR_LEN[VERSION].pack(len(data)) + data
+
+# Unpack a length-prefixed string, returning it and the next offset
+def unpack_str(buf: bytes, offset: int, version: int = VERSION) -> Tuple[str, int]:
+    length = STR_LEN[version]
+    (size,) = length.unpack_from(buf, offset)
+    start = offset + length.size
+    return buf[start:start + size].decode("utf-8"), start + size
+
+# Plain dict of everything worth saving
+def character_state(player: Character) -> dict:
+    return {
+        "name": player.name,
+        "hp": player.hp,
+        "max_hp": player.max_hp,
+        "attack": player.attack,
+        "defense": player.defense,
+        "level": player.level,
+        "exp": player.exp,
+        "inventory": dict(player.inventory),
+    }
+
+# Encode a character as a binary snapshot
+def dump_binary(player: Character, generation: int = 0) -> bytes:
+    parts = [HEADER.pack(MAGIC, VERSION), GENERATION.pack(generation), pack_str(player.name),
+             STATS.pack(player.hp, player.max_hp, player.attack, player.defense, player.level, player.exp),
+             COUNT.pack(len(player.inventory))]
+    for item, qty in player.inventory.items():
+        parts.append(pack_str(item))
+        parts.append(QTY.pack(qty))
+    return b"".join(parts)
+
+# Decode a binary snapshot
+def load_binary(buf: bytes) -> Character:
+    magic, version = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a save file.")
+    if version > VERSION:
+        raise ValueError(f"Save version {version} is newer than supported version {VERSION}.")
+    offset = HEADER.size + (GENERATION.size if version >= 3 else 0)
+    name, offset = unpack_str(buf, offset, version)
+    hp, max_hp, attack, defense, level, exp = STATS.unpack_from(buf, offset)
+    offset += STATS.size
+    (count,) = COUNT.unpack_from(buf, offset)
+    offset += COUNT.size
+    inventory = {}
+    for _ in range(count):
+        item, offset = unpack_str(buf, offset, version)
+        (inventory[item],) = QTY.unpack_from(buf, offset)
+        offset += QTY.size
+    return Character(name=name, hp=hp, max_hp=max_hp, attack=attack, defense=defense,
+                     level=level, exp=exp, inventory=inventory)
+
+# Encode a character as JSON (fallback / human-readable format)
+def dump_json(player: Character, generation: int = 0) -> bytes:
+    return json.dumps({"version": VERSION, "generation": generation, "character": character_state(player)}).encode("utf-8")
+
+# Decode a JSON snapshot
+def load_json(buf: bytes) -> Character:
+    data = json.loads(buf.decode("utf-8"))
+    return Character(**data["character"])
+
+# Decode a snapshot in either format
+def load_snapshot(buf: bytes) -> Character:
+    if buf.startswith(MAGIC):
+        return load_binary(buf)
+    return load_json(buf)
+
+# Format version and generation of a snapshot in either format; its journal was written with the same version
+def snapshot_info(buf: bytes) -> Tuple[int, int]:
+    if buf.startswith(MAGIC):
+        version = HEADER.unpack_from(buf, 0)[1]
+        return version, GENERATION.unpack_from(buf, HEADER.size)[0] if version >= 3 else 0
+    data = json.loads(buf.decode("utf-8"))
+    return data.get("version", 1), data.get("generation", 0)
+
+# Journal records that extend a snapshot; empty when the journal belongs to another generation,
+# as after a crash between swapping in a new snapshot and starting its journal
+def journal_records(buf: bytes, version: int, generation: int) -> bytes:
+    if version < 3:
+        return buf
+    if len(buf) < JOURNAL_HEADER.size:
+        return b""
+    magic, journal_generation = JOURNAL_HEADER.unpack_from(buf, 0)
+    if magic != JOURNAL_MAGIC or journal_generation != generation:
+        return b""
+    return buf[JOURNAL_HEADER.size:]
+
+# Apply journal records to a character, ignoring a truncated tail
+def replay_journal(player: Character, buf: bytes, version: int = VERSION) -> int:
+    offset = 0
+    applied = 0
+    try:
+        while offset < len(buf):
+            op = buf[offset]
+            offset += 1
+            if op == OP_HP:
+                (delta,) = QTY.unpack_from(buf, offset)
+                offset += QTY.size
+                player.hp += delta
+            elif op == OP_XP:
+                (delta,) = QTY.unpack_from(buf, offset)
+                offset += QTY.size
+                player.exp += delta
+            elif op == OP_ITEM:
+                item, offset = unpack_str(buf, offset, version)
+                (delta,) = QTY.unpack_from(buf, offset)
+                offset += QTY.size
+                player.inventory[item] = player.inventory.get(item, 0) + delta
+            elif op == OP_STATS:
+                (player.level, player.exp, player.hp, player.max_hp,
+                 player.attack, player.defense) = STATS.unpack_from(buf, offset)
+                offset += STATS.size
+            else:
+                break
+            applied += 1
+    except (struct.error, IndexError, UnicodeDecodeError):
+        pass
+    return applied
+
+# One save slot: snapshot file plus journal of deltas since the snapshot
+class SaveGame:
+    def __init__(self, path: str, binary: bool = True, compact_every: int = 256):
+        self.snapshot_path = path
+        self.journal_path = path + ".journal"
+        self.binary = binary
+        self.compact_every = compact_every
+        self.records = 0
+        # Generation of the snapshot on disk; None until read or written
+        self.generation: Optional[int] = None
+        self._journal = None
+        self._last: Optional[dict] = None
+
+    # Check if a save exists
+    def exists(self) -> bool:
+        return os.path.exists(self.snapshot_path)
+
+    # Load the snapshot and replay its journal
+    def load(self) -> Character:
+        with open(self.snapshot_path, "rb") as file:
+            snapshot = file.read()
+        player = load_snapshot(snapshot)
+        version, self.generation = snapshot_info(snapshot)
+        self.records = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as file:
+                records = journal_records(file.read(), version, self.generation)
+            self.records = replay_journal(player, records, version)
+        return player
+
+    # Generation of the snapshot on disk, 0 if there is none or it cannot be read
+    def _disk_generation(self) -> int:
+        try:
+            with open(self.snapshot_path, "rb") as file:
+                return snapshot_info(file.read())[1]
+        except (OSError, ValueError, struct.error):
+            return 0
+
+    # Write a full snapshot atomically under a new generation and start an empty journal for it;
+    # until the new journal header is written, the old journal no longer matches and is ignored
+    def compact(self, player: Character):
+        self.close()
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.generation is None:
+            self.generation = self._disk_generation()
+        generation = (self.generation + 1) & 0xFFFFFFFF
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "wb") as file:
+            file.write(dump_binary(player, generation) if self.binary else dump_json(player, generation))
+        os.replace(tmp, self.snapshot_path)
+        self.generation = generation
+        self._journal = open(self.journal_path, "wb")
+        self._journal.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, generation))
+        self._journal.flush()
+        self.records = 0
+        self._last = character_state(player)
+
+    # Begin autosaving a character
+    def start(self, player: Character):
+        self.compact(player)
+
+    # Append the changes since the last record (a few bytes per turn)
+    def record(self, player: Character):
+        if self._journal is None:
+            self.start(player)
+            return
+        last, now = self._last, character_state(player)
+        out = []
+        if (now["level"], now["max_hp"], now["attack"], now["defense"]) != (last["level"], last["max_hp"], last["attack"], last["defense"]):
+            out.append(bytes([OP_STATS]) + STATS.pack(now["level"], now["exp"], now["hp"], now["max_hp"], now["attack"], now["defense"]))
+        else:
+            if now["hp"] != last["hp"]:
+                out.append(bytes([OP_HP]) + QTY.pack(now["hp"] - last["hp"]))
+            if now["exp"] != last["exp"]:
+                out.append(bytes([OP_XP]) + QTY.pack(now["exp"] - last["exp"]))
+        for item in now["inventory"].keys() | last["inventory"].keys():
+            delta = now["inventory"].get(item, 0) - last["inventory"].get(item, 0)
+            if delta:
+                out.append(bytes([OP_ITEM]) + pack_str(item) + QTY.pack(delta))
+        if not out:
+            return
+        self._journal.write(b"".join(out))
+        self._journal.flush()
+        self.records += len(out)
+        self._last = now
+        if self.records >= self.compact_every:
+            self.compact(player)
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+# Save slot path for a character name
+def save_path(directory: str, name: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name) or "player"
+    return os.path.join(directory, safe + ".sav")
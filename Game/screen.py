@@ -0,0 +1,177 @@
+# Diffing terminal output: keeps the last frame as a cell grid and writes only the cells that changed
+from typing import List, Optional, Tuple
+
+from rich.cells import cell_len
+from rich.color import ColorSystem
+from rich.style import Style
+from rich.text import Text
+
+from Game.metrics import metrics
+
+# Console color system name -> Rich enum used to render styles
+COLOR_SYSTEMS = {"standard": ColorSystem.STANDARD, "256": ColorSystem.EIGHT_BIT,
+                 "truecolor": ColorSystem.TRUECOLOR, "windows": ColorSystem.WINDOWS}
+
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+CLEAR_LINE = "\x1b[2K"
+CLEAR_TO_END = "\x1b[K"
+
+# One terminal cell: text and style; the right half of a wide character has empty text
+Cell = Tuple[str, Optional[Style]]
+
+# Drop-in for rich.live.Live (start/update/stop); the cursor moves relative to the frame's top row
+class Screen:
+    def __init__(self, renderable=None, console=None, newline: str = "\n"):
+        self.renderable = renderable
+        self.console = console
+        self.newline = newline
+        self.color_system = COLOR_SYSTEMS.get(console.color_system)
+        self.grid: List[tuple] = []
+        self.started = False
+        # Frames drawn, frames skipped as identical, and bytes written
+        self.frames = 0
+        self.skipped = 0
+        self.bytes_written = 0
+        self.last_frame_bytes = 0
+        self._row = 0
+        self._height = 1
+
+    def bytes_per_frame(self) -> float:
+        drawn = self.frames + self.skipped
+        return self.bytes_written / drawn if drawn else 0.0
+
+    # Begin a new frame region at the cursor and draw the current renderable in full
+    def start(self):
+        self.grid = []
+        self._row = 0
+        self._height = 1
+        self.started = True
+        if self.console.is_terminal:
+            self._write(HIDE_CURSOR)
+        if self.renderable is not None:
+            self.update(self.renderable)
+
+    # Leave the cursor on the line below the frame
+    def stop(self):
+        if not self.started:
+            return
+        self.started = False
+        parts = []
+        self._move(parts, max(len(self.grid), 1) - 1, 0)
+        parts.append(self.newline)
+        if self.console.is_terminal:
+            parts.append(SHOW_CURSOR)
+        self._write("".join(parts))
+
+    # Render a renderable into rows of segments, cropped to the terminal height like Live's "ellipsis" overflow;
+    # cursor-up moves stop at the top row, so a taller frame could not be diffed in place
+    def render(self, renderable) -> List[tuple]:
+        options = self.console.options
+        lines = self.console.render_lines(renderable, options, pad=True)
+        height = self.console.height
+        if len(lines) > height:
+            ellipsis = Text("...", overflow="crop", justify="center", end="", style="live.ellipsis")
+            lines = lines[:height - 1] + self.console.render_lines(ellipsis, options, pad=True)
+        return [tuple(segment for segment in line if not segment.control) for line in lines]
+
+    # Expand a row of segments into cells
+    @staticmethod
+    def cells(row: tuple) -> List[Cell]:
+        cells = []
+        for segment in row:
+            for char in segment.text:
+                cells.append((char, segment.style))
+                if cell_len(char) == 2:
+                    cells.append(("", segment.style))
+        return cells
+
+    # Draw a new frame, writing only the cells that differ from the last one
+    def update(self, renderable, refresh: bool = True):
+        self.renderable = renderable
+        if not self.started:
+            return
+        grid = self.render(renderable)
+        if metrics.enabled:
+            metrics.count("screen.frames")
+        if grid == self.grid:
+            self.skipped += 1
+            self.last_frame_bytes = 0
+            return
+
+        parts = []
+        old = self.grid
+        for y, line in enumerate(grid):
+            if y < len(old) and line == old[y]:
+                continue
+            # Only rows that changed are expanded to cells
+            row = self.cells(line)
+            before = self.cells(old[y]) if y < len(old) else []
+            # First and last differing cells of the row
+            start = 0
+            limit = min(len(row), len(before))
+            while start < limit and row[start] == before[start]:
+                start += 1
+            end = len(row)
+            if len(row) == len(before):
+                while end > start and row[end - 1] == before[end - 1]:
+                    end -= 1
+            # Never start on the right half of a wide character
+            while start > 0 and row[start][0] == "":
+                start -= 1
+            self._move(parts, y, start)
+            self._write_cells(parts, row[start:end])
+            if len(row) < len(before):
+                parts.append(CLEAR_TO_END)
+        # Blank rows left over from a taller frame
+        for y in range(len(grid), len(old)):
+            self._move(parts, y, 0)
+            parts.append(CLEAR_LINE)
+        self.grid = grid
+
+        data = "".join(parts)
+        self._write(data)
+        self.frames += 1
+        self.last_frame_bytes = len(data.encode("utf-8"))
+
+    # Cursor movement relative to the current row; rows below the frame are created with newlines
+    def _move(self, parts: list, row: int, col: int):
+        target = min(row, self._height - 1)
+        if target < self._row:
+            parts.append(f"\x1b[{self._row - target}A")
+        elif target > self._row:
+            parts.append(f"\x1b[{target - self._row}B")
+        if row > target:
+            parts.append(self.newline * (row - target))
+            self._height = row + 1
+        self._row = row
+        parts.append(f"\x1b[{col + 1}G")
+
+    # Styled text for a run of cells, one escape sequence per style change
+    def _write_cells(self, parts: list, cells: List[Cell]):
+        run = []
+        style = None
+        for text, cell_style in cells:
+            if cell_style != style and run:
+                parts.append(self._styled("".join(run), style))
+                run = []
+            style = cell_style
+            run.append(text)
+        if run:
+            parts.append(self._styled("".join(run), style))
+
+    def _styled(self, text: str, style: Optional[Style]) -> str:
+        if style is None or self.color_system is None:
+            return text
+        return style.render(text, color_system=self.color_system)
+
+    def _write(self, data: str):
+        if not data:
+            return
+        file = self.console.file
+        file.write(data)
+        file.flush()
+        size = len(data.encode("utf-8"))
+        self.bytes_written += size
+        if metrics.enabled:
+            metrics.count("screen.bytes", size)
@@ -0,0 +1,338 @@
+# Asyncio telnet-style server hosting many game sessions in one process
+import argparse, asyncio, io, statistics, time
+from typing import List, Optional, Set
+
+from Characters.character import Character, MAX_NAME_LENGTH
+from Game.input import KeyParser, ENTER
+from Game.save import save_path
+from Game.session import Session
+
+# Telnet negotiation bytes
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SUPPRESS_GO_AHEAD = 1, 3
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+# Ends every frame (show cursor); also lets clients find frame boundaries
+FRAME_END = "\x1b[?25h"
+# Last line of a frame that waits for Enter; scripted clients answer it with Enter
+PAUSE_PROMPT = "Press Enter to continue..."
+# Start of the frame asking whether to continue a saved character
+CONTINUE_PROMPT = "Continue saved game"
+
+# Remove telnet commands from raw client bytes
+def strip_telnet(data: bytes) -> bytes:
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        b = data[i]
+        if b != IAC:
+            out.append(b)
+            i += 1
+        elif i + 1 < len(data) and data[i + 1] == SB:
+            end = data.find(bytes([IAC, SE]), i + 2)
+            i = len(data) if end < 0 else end + 2
+        elif i + 1 < len(data) and data[i + 1] in (DO, DONT, WILL, WONT):
+            i += 3
+        else:
+            i += 2
+    return bytes(out)
+
+# Server-wide counters
+class ServerStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.sessions = 0
+        self.total_sessions = 0
+        self.frames = 0
+        self.latencies: List[float] = []
+
+    def observe(self, seconds: float):
+        self.latencies.append(seconds)
+        if len(self.latencies) > 10000:
+            del self.latencies[:5000]
+
+    def report(self) -> str:
+        wall = time.perf_counter() - self.started
+        cpu = time.process_time() - self.cpu_started
+        load = cpu / wall if wall else 0.0
+        p50 = statistics.median(self.latencies) * 1000 if self.latencies else 0.0
+        per_core = self.sessions / load if load else float("inf")
+        return (f"sessions {self.sessions} (total {self.total_sessions}), frames {self.frames}, "
+                f"cpu {load * 100:.1f}% of a core, key-to-frame p50 {p50:.2f}ms, ~{per_core:.0f} sessions/core at this load")
+
+# One connected player: own character, console and key stream
+# Frontend for main.GameLoop, so telnet players get the same game as the local terminal
+class ClientSession:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, stats: ServerStats, seed: int = None,
+                 history=None, save_dir: str = "", slots: Set[str] = None):
+        from rich.console import Console
+        from Game.screen import Screen
+        self.reader = reader
+        self.writer = writer
+        self.stats = stats
+        # Optional StatsWriter shared by every session
+        self.history = history
+        self.session = Session(seed)
+        # Save slots in use by any session of this server; a name already playing is not saved twice
+        self.save_dir = save_dir
+        self.slots = slots if slots is not None else set()
+        self.parser = KeyParser()
+        self.keys: List[str] = []
+        self.key_time: Optional[float] = None
+        self.buffer = io.StringIO()
+        self.console = Console(file=self.buffer, width=80, force_terminal=True, color_system="standard")
+        self.screen = Screen(console=self.console, newline="\r\n")
+        # Game screen shown through the diffing screen, None after a static frame
+        self.view = None
+        self.player: Optional[Character] = None
+
+    # Next key from the socket
+    async def key(self) -> str:
+        while not self.keys:
+            data = await self.reader.read(1024)
+            if not data:
+                raise ConnectionResetError("Client disconnected.")
+            self.keys.extend(self.parser.feed(strip_telnet(data).decode(errors="ignore")))
+            self.key_time = time.perf_counter()
+        return self.keys.pop(0)
+
+    # Render renderables into one frame and send it
+    async def show(self, *renderables, clear: bool = True):
+        self.view = None
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        for renderable in renderables:
+            self.console.print(renderable, justify="center")
+        frame = (CLEAR_SCREEN if clear else "") + self.buffer.getvalue().replace("\n", "\r\n") + FRAME_END
+        self.writer.write(frame.encode())
+        await self.writer.drain()
+        self.stats.frames += 1
+        if self.key_time is not None:
+            self.stats.observe(time.perf_counter() - self.key_time)
+            self.key_time = None
+
+    # Read a line of at most `limit` characters, echoing typed characters
+    async def read_line(self, prompt: str, default: str, limit: int) -> str:
+        if prompt:
+            self.writer.write(f"{prompt} ({default}): ".encode())
+        chars = []
+        while True:
+            key = await self.key()
+            if key == ENTER:
+                break
+            if key in ("\x7f", "\x08"):
+                if chars:
+                    chars.pop()
+                    self.writer.write(b"\b \b")
+            elif len(key) == 1 and key.isprintable() and len(chars) < limit:
+                chars.append(key)
+                self.writer.write(key.encode())
+        self.writer.write(b"\r\n")
+        return "".join(chars).strip() or default
+
+    # Show a frame ending in a prompt and wait for Enter; the prompt is part of the frame, so every key
+    # a client sends is still answered by exactly one frame
+    async def pause(self, *renderables, msg: str = PAUSE_PROMPT):
+        from rich.text import Text
+        # Plain text, so the prompt reaches the client unstyled
+        await self.show(*renderables, Text(msg))
+        while await self.key() != ENTER:
+            pass
+
+    # Send a game screen through the diffing screen; switching screens sends the new one in full
+    async def send_view(self, screen):
+        from rich.align import Align
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        if screen is not self.view:
+            self.buffer.write(CLEAR_SCREEN)
+            self.screen.start()
+            self.view = screen
+        self.screen.update(Align.center(screen.build()))
+        self.writer.write((self.buffer.getvalue() + FRAME_END).encode())
+        await self.writer.drain()
+        self.stats.frames += 1
+        if self.key_time is not None:
+            self.stats.observe(time.perf_counter() - self.key_time)
+            self.key_time = None
+
+    # Feed keys to a screen until the player makes a choice; a key that changes the view is answered
+    # with the changed cells, one that changes nothing gets no frame
+    async def choose(self, screen):
+        screen.begin_choice()
+        await self.send_view(screen)
+        while True:
+            screen.on_press(await self.key())
+            if screen.done():
+                return screen.value()
+            if screen.scheduler.wait(0):
+                await self.send_view(screen)
+
+    # The next choice sends the screen's latest state, so every key still gets exactly one frame
+    async def draw(self, screen):
+        pass
+
+    async def ask_name(self, limit: int) -> str:
+        return await self.read_line("Enter your character's name", "Hero", limit)
+
+    async def confirm(self, question: str) -> bool:
+        from rich.text import Text
+        await self.show(Text(f"{question} [y/n] (y)"))
+        return (await self.read_line("", "y", 1)).lower() == "y"
+
+    async def action_delay(self):
+        pass
+
+    async def run(self):
+        import main
+        await self.show(main.header("Welcome to the RPG Game!"))
+        name = await self.ask_name(MAX_NAME_LENGTH)
+        slot = save_path(self.save_dir, name) if self.save_dir else None
+        if slot in self.slots:
+            slot = None
+        if slot is not None:
+            self.slots.add(slot)
+        try:
+            self.player, world, save_game = await main.load_game(self, name, self.save_dir if slot else "", self.session,
+                                                                 prefetch=False)
+            game = main.GameLoop(self.player, world, self.session, self, save_game, self.history)
+            try:
+                await game.play()
+            finally:
+                game.close()
+        finally:
+            self.slots.discard(slot)
+
+class GameServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 2323, seed: int = None, stats_path: str = "", save_dir: str = ""):
+        self.host = host
+        self.port = port
+        self.seed = seed
+        self.stats = ServerStats()
+        self.stats_path = stats_path
+        self.save_dir = save_dir
+        self.slots: Set[str] = set()
+        self.history = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Character mode: server echoes, no line buffering on the client
+        writer.write(bytes([IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD]))
+        self.stats.sessions += 1
+        self.stats.total_sessions += 1
+        seed = None if self.seed is None else self.seed + self.stats.total_sessions
+        try:
+            await ClientSession(reader, writer, self.stats, seed, self.history, self.save_dir, self.slots).run()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.stats.sessions -= 1
+            writer.close()
+
+    async def report(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.stats.report(), flush=True)
+
+    async def serve(self, report_interval: float = 10.0):
+        import main  # load the renderers before the first client arrives
+        if self.stats_path:
+            from Game.stats import StatsWriter
+            self.history = StatsWriter(self.stats_path)
+        server = await asyncio.start_server(self.handle, self.host, self.port, backlog=1024)
+        print(f"Serving on {self.host}:{self.port}", flush=True)
+        reporter = asyncio.create_task(self.report(report_interval))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reporter.cancel()
+            if self.history is not None:
+                self.history.close()
+
+# === Load generator === #
+# One scripted client: every key it sends produces exactly one frame
+# A frame that does not arrive within `timeout` counts as a stall and the client reconnects
+async def load_client(host: str, port: int, end: float, latencies: List[float], think: float = 0.0,
+                      timeout: float = 5.0, stalls: List[int] = None):
+    marker = FRAME_END.encode()
+    prompt = PAUSE_PROMPT.encode()
+    resume = CONTINUE_PROMPT.encode()
+    while time.perf_counter() < end:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        try:
+            await asyncio.wait_for(reader.readuntil(marker), timeout)
+            keys = [b"bot\r"]
+            while time.perf_counter() < end:
+                # Menu navigation, then Enter to explore, attack and continue
+                for key in keys:
+                    start = time.perf_counter()
+                    writer.write(key)
+                    await writer.drain()
+                    frame = await asyncio.wait_for(reader.readuntil(marker), timeout)
+                    latencies.append(time.perf_counter() - start)
+                    if think:
+                        await asyncio.sleep(think)
+                    # Only Enter leaves a pause prompt
+                    if prompt in frame or resume in frame:
+                        break
+                if resume in frame:
+                    keys = [b"n\r"]
+                else:
+                    keys = [b"\r"] if prompt in frame else [b"\x1b[B", b"\x1b[A", b"\r"]
+        except asyncio.TimeoutError:
+            if stalls is not None:
+                stalls.append(1)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # Game over closes the connection; start a new session
+            pass
+        finally:
+            writer.close()
+
+async def run_load(host: str, port: int, clients: int, duration: float, think: float = 0.0):
+    latencies: List[float] = []
+    stalls: List[int] = []
+    start = time.perf_counter()
+    end = start + duration
+    await asyncio.gather(*(load_client(host, port, end, latencies, think, stalls=stalls) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies) or [0.0]
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    print(f"{clients} clients, {len(latencies)} keypresses in {elapsed:.1f}s ({len(latencies) / elapsed:,.0f}/s)")
+    print(f"key-to-frame round trip p50 {pick(0.5):.2f}ms p90 {pick(0.9):.2f}ms p99 {pick(0.99):.2f}ms")
+    if stalls:
+        print(f"{len(stalls)} sessions stalled waiting for a frame")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-session game server")
+    sub = parser.add_subparsers(dest="command")
+    serve = sub.add_parser("serve", help="Run the server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=2323)
+    serve.add_argument("--seed", type=int, default=None)
+    serve.add_argument("--report", type=float, default=10.0, help="Seconds between stats lines")
+    serve.add_argument("--stats", default="", help="Record every session's battles to this stats database")
+    serve.add_argument("--save-dir", default="", help="Save each player's character and world here (empty to disable saving)")
+    load = sub.add_parser("load", help="Run the load generator against a server")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=2323)
+    load.add_argument("--clients", type=int, default=100)
+    load.add_argument("--duration", type=float, default=10.0)
+    load.add_argument("--think", type=float, default=0.5, help="Seconds each client waits between keys (0 = as fast as possible)")
+    args = parser.parse_args(argv)
+
+    if args.command == "load":
+        asyncio.run(run_load(args.host, args.port, args.clients, args.duration, args.think))
+    else:
+        args = args if args.command == "serve" else serve.parse_args([])
+        try:
+            asyncio.run(GameServer(args.host, args.port, args.seed, args.stats, args.save_dir).serve(args.report))
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
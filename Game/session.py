@@ -0,0 +1,184 @@
+# Seeded RNG streams, session recording and headless replay
+import hashlib, json, random, time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from Characters.character import Character
+from Characters.enemy import Enemy
+from Game.engine import BattleEngine, Action, USE_ITEM
+from Game.input import ENTER, ESC
+from Game.save import character_state
+from Game.world import World
+
+RECORD_VERSION = 1
+
+# Decision kinds, one per kind of menu
+MENU = "menu"
+BATTLE = "battle"
+INVENTORY = "inventory"
+MAP = "map"
+
+# Main menu values
+EXPLORE, REST, SHOW_INVENTORY, SHOW_STATUS, QUIT = "1", "2", "3", "4", "Q"
+
+# Keys that leave the map screen
+LEAVE_MAP = (ENTER, ESC, "q")
+
+class ReplayMismatch(Exception):
+    pass
+
+# Raised when a replay has used every recorded decision
+class ReplayFinished(Exception):
+    pass
+
+# Every random draw of a session goes through named streams derived from one seed
+class Session:
+    def __init__(self, seed: int = None):
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self._streams: Dict[str, random.Random] = {}
+        self.decisions: List[list] = []
+        self.initial: Optional[dict] = None
+        self.world: Optional[dict] = None
+        self._replay: Optional[deque] = None
+
+    # Independent random stream for one purpose (encounters, combat, ...)
+    def rng(self, name: str) -> random.Random:
+        stream = self._streams.get(name)
+        if stream is None:
+            digest = hashlib.sha256(f"{self.seed}:{name}".encode()).digest()
+            stream = self._streams[name] = random.Random(int.from_bytes(digest[:8], "little"))
+        return stream
+
+    @property
+    def replaying(self) -> bool:
+        return self._replay is not None
+
+    # Take a decision from the replay, or ask for it and record it
+    def decide(self, kind: str, ask: Callable[[], str]) -> str:
+        if self._replay is not None:
+            if not self._replay:
+                raise ReplayFinished()
+            recorded_kind, value = self._replay.popleft()
+            if recorded_kind != kind:
+                raise ReplayMismatch(f"Expected a {recorded_kind} decision, game asked for {kind}.")
+            return value
+        value = ask()
+        self.decisions.append([kind, value])
+        return value
+
+    # decide() for the async game loop; ask returns an awaitable
+    async def decide_async(self, kind: str, ask: Callable[[], Awaitable[str]]) -> str:
+        if self._replay is not None:
+            return self.decide(kind, None)
+        value = await ask()
+        self.decisions.append([kind, value])
+        return value
+
+    # Remember the starting character and world
+    def begin(self, player: Character, world: World = None):
+        self.initial = character_state(player)
+        self.world = world.snapshot() if world is not None else None
+
+    # Write the recording with the final character state
+    def save(self, path: str, player: Character):
+        with open(path, "w") as file:
+            json.dump({
+                "version": RECORD_VERSION,
+                "seed": self.seed,
+                "initial": self.initial,
+                "world": self.world,
+                "decisions": self.decisions,
+                "final": character_state(player),
+            }, file)
+
+    # Session set up to replay a recording
+    @staticmethod
+    def from_record(record: dict) -> "Session":
+        session = Session(record["seed"])
+        session.initial = record["initial"]
+        session.world = record.get("world")
+        session._replay = deque(tuple(d) for d in record["decisions"])
+        return session
+
+# Use items picked on the inventory screen until "Cancel"
+def use_items(player: Character, session: Session):
+    while True:
+        choice = session.decide(INVENTORY, None)
+        if choice == "Cancel":
+            return
+        player.use_item(choice)
+
+# Fight one battle with recorded decisions
+def fight_headless(player: Character, enemy: Enemy, session: Session):
+    engine = BattleEngine(player, enemy, rng=session.rng("combat"))
+    while not engine.is_over():
+        action = session.decide(BATTLE, None)
+        if action == USE_ITEM:
+            use_items(player, session)
+        engine.step(Action(action))
+
+# Run the main game loop without any UI, driven by session decisions
+def play_headless(player: Character, session: Session, world: World) -> Character:
+    while player.is_alive():
+        choice = session.decide(MENU, None)
+        if choice == EXPLORE:
+            while player.is_alive():
+                key = session.decide(MAP, None)
+                if key in LEAVE_MAP:
+                    break
+                result = world.walk(player, key, session.rng("encounter"))
+                if result.enemy is not None:
+                    fight_headless(player, result.enemy, session)
+        elif choice == REST:
+            player.heal(player.max_hp)
+        elif choice == SHOW_INVENTORY:
+            use_items(player, session)
+        elif choice.upper() == QUIT:
+            break
+    return player
+
+# Replay a recording headlessly and check the final state matches
+def replay(record: dict) -> bool:
+    if record.get("version", 0) > RECORD_VERSION:
+        raise ValueError(f"Recording version {record['version']} is newer than supported version {RECORD_VERSION}.")
+    session = Session.from_record(record)
+    player = Character(**session.initial)
+    world = World.from_snapshot(session.world, prefetch=False) if session.world else World(session.seed, prefetch=False)
+    try:
+        play_headless(player, session, world)
+    except ReplayFinished:
+        # The recorded session stopped while waiting for a decision
+        pass
+    if session._replay:
+        raise ReplayMismatch(f"{len(session._replay)} recorded decisions were never used.")
+    return character_state(player) == record["final"]
+
+# Replay recording files, returning (passed, failed, seconds)
+def replay_files(paths: List[str]):
+    passed = failed = 0
+    start = time.perf_counter()
+    for path in paths:
+        with open(path) as file:
+            record = json.load(file)
+        try:
+            ok = replay(record)
+        except ReplayMismatch:
+            ok = False
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+            print(f"MISMATCH {path}")
+    return passed, failed, time.perf_counter() - start
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay recorded sessions headlessly and verify their final state")
+    parser.add_argument("paths", nargs="+", help="Session recordings written with --record")
+    args = parser.parse_args(argv)
+    passed, failed, elapsed = replay_files(args.paths)
+    print(f"{passed} passed, {failed} failed in {elapsed:.3f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
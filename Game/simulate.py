@@ -0,0 +1,157 @@
+# Vectorized Monte Carlo balance simulator
+import argparse, json, os, time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Sequence
+
+from Characters.character import Character
+
+# numpy is imported only when a simulation runs, so --help and argument errors start fast
+if TYPE_CHECKING:
+    import numpy as np
+
+ENEMIES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Characters", "enemies.json")
+
+# Fight outcome codes
+ONGOING, WIN, LOSS, ESCAPE, STALEMATE = 0, 1, 2, 3, 4
+
+@dataclass
+class SimRow:
+    enemy: str
+    level: int
+    fights: int
+    win_rate: float
+    loss_rate: float
+    escape_rate: float
+    turns_to_kill: float
+    hp_lost: float
+    xp_per_turn: float
+    fights_per_level: float
+
+# Player stats at each level, taken from Character.gain_exp itself
+def player_stats(levels: Sequence[int]) -> Dict[str, "np.ndarray"]:
+    import numpy as np
+    stats = {"max_hp": [], "attack": [], "defense": [], "exp_to_next": []}
+    for level in levels:
+        player = Character(name="sim")
+        player.gain_exp(player.curve.total_for(level))
+        stats["max_hp"].append(player.max_hp)
+        stats["attack"].append(player.attack)
+        stats["defense"].append(player.defense)
+        stats["exp_to_next"].append(player.exp_to_next_level())
+    return {k: np.array(v, dtype=np.int64) for k, v in stats.items()}
+
+# Load enemy templates from JSON
+def load_templates(path: str = ENEMIES_PATH) -> Dict[str, dict]:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+# Simulate fights for every enemy at every level as one batch of arrays
+def simulate(templates: Dict[str, dict], levels: Sequence[int], fights: int = 10000,
+             run_below: float = 0.0, max_turns: int = 500, seed: int = None) -> List[SimRow]:
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    ids = list(templates)
+    levels = list(levels)
+    shape = (len(ids), len(levels), fights)
+
+    # Enemy stats along axis 0, player stats along axis 1
+    e_hp = np.array([templates[i]["hp"] for i in ids], dtype=np.int64)[:, None, None]
+    e_atk = np.array([templates[i]["attack"] for i in ids], dtype=np.int64)[:, None, None]
+    e_def = np.array([templates[i]["defense"] for i in ids], dtype=np.int64)[:, None, None]
+    e_xp = np.array([templates[i]["xp_reward"] for i in ids], dtype=np.int64)[:, None]
+    p = player_stats(levels)
+    p_max = p["max_hp"][None, :, None]
+
+    # Same formula as take_damage: max(0, atk - def)
+    dmg_to_enemy = np.maximum(0, p["attack"][None, :, None] - e_def)
+    dmg_to_player = np.maximum(0, e_atk - p["defense"][None, :, None])
+    run_threshold = run_below * p_max
+
+    p_hp = np.broadcast_to(p_max, shape).copy()
+    enemy_hp = np.broadcast_to(e_hp, shape).copy()
+    outcome = np.zeros(shape, dtype=np.int8)
+    turns = np.zeros(shape, dtype=np.int32)
+    active = np.ones(shape, dtype=bool)
+
+    for _ in range(max_turns):
+        if not active.any():
+            break
+        turns += active
+
+        # Run attempts use the same roll as the battle loop: randint(0, 10) > 5
+        running = active & (p_hp < run_threshold)
+        if running.any():
+            escaped = running & (rng.integers(0, 11, size=shape) > 5)
+            outcome[escaped] = ESCAPE
+            active &= ~escaped
+
+        attacking = active & ~running
+        enemy_hp = np.where(attacking, np.maximum(0, enemy_hp - dmg_to_enemy), enemy_hp)
+        won = attacking & (enemy_hp <= 0)
+        outcome[won] = WIN
+        active &= ~won
+
+        p_hp = np.where(active, np.maximum(0, p_hp - dmg_to_player), p_hp)
+        lost = active & (p_hp <= 0)
+        outcome[lost] = LOSS
+        active &= ~lost
+    outcome[active] = STALEMATE
+
+    # Aggregate per (enemy, level) cell
+    wins = (outcome == WIN).sum(axis=2)
+    losses = (outcome == LOSS).sum(axis=2)
+    escapes = (outcome == ESCAPE).sum(axis=2)
+    win_turns = np.where(outcome == WIN, turns, 0).sum(axis=2)
+    hp_lost = (p_max - p_hp).sum(axis=2)
+    total_turns = turns.sum(axis=2)
+    xp = wins * e_xp
+
+    rows = []
+    for e, enemy_id in enumerate(ids):
+        for l, level in enumerate(levels):
+            w = int(wins[e, l])
+            xp_per_turn = xp[e, l] / total_turns[e, l] if total_turns[e, l] else 0.0
+            xp_per_fight = xp[e, l] / fights
+            rows.append(SimRow(
+                enemy=templates[enemy_id]["name"],
+                level=level,
+                fights=fights,
+                win_rate=w / fights,
+                loss_rate=int(losses[e, l]) / fights,
+                escape_rate=int(escapes[e, l]) / fights,
+                turns_to_kill=win_turns[e, l] / w if w else float("inf"),
+                hp_lost=hp_lost[e, l] / fights,
+                xp_per_turn=float(xp_per_turn),
+                fights_per_level=float(p["exp_to_next"][l] / xp_per_fight) if xp_per_fight else float("inf"),
+            ))
+    return rows
+
+# Print results as a plain text table
+def print_rows(rows: List[SimRow]):
+    print(f"{'Enemy':<12}{'Lv':>4}{'Win%':>8}{'Loss%':>8}{'Run%':>8}{'TTK':>8}{'HP lost':>9}{'XP/turn':>9}{'Fights/Lv':>11}")
+    for r in rows:
+        print(f"{r.enemy:<12}{r.level:>4}{r.win_rate * 100:>8.1f}{r.loss_rate * 100:>8.1f}{r.escape_rate * 100:>8.1f}"
+              f"{r.turns_to_kill:>8.2f}{r.hp_lost:>9.2f}{r.xp_per_turn:>9.2f}{r.fights_per_level:>11.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo balance simulator for enemies.json")
+    parser.add_argument("--enemies", default=ENEMIES_PATH, help="Path to the enemy JSON file")
+    parser.add_argument("--min-level", type=int, default=1)
+    parser.add_argument("--max-level", type=int, default=50)
+    parser.add_argument("--fights", type=int, default=10000, help="Fights per enemy and level")
+    parser.add_argument("--run-below", type=float, default=0.0, help="Try to run when HP is below this fraction of max HP")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    templates = load_templates(args.enemies)
+    levels = range(args.min_level, args.max_level + 1)
+    rows = simulate(templates, levels, args.fights, args.run_below, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print_rows(rows)
+    total = len(templates) * len(levels) * args.fights
+    print(f"\n{total} fights in {elapsed:.2f}s ({total / elapsed:,.0f} fights/s)")
+
+if __name__ == "__main__":
+    main()
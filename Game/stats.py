@@ -0,0 +1,317 @@
+# Lifetime statistics in a local SQLite database, written in batches from a background thread
+import argparse, operator, os, queue, sqlite3, threading, time
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List
+
+from Game.engine import BattleResult, VICTORY, DEFEAT, ESCAPED
+
+DEFAULT_PATH = os.path.join("saves", "stats.db")
+
+# Item id counted as potions_used
+POTION = "Potion"
+
+# One row per battle, plus running totals per player, per enemy and per matchup kept up to date in the same
+# transaction, so leaderboards and reports read the totals instead of scanning every battle
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS battles (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    enemy TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    turns INTEGER NOT NULL,
+    damage_dealt INTEGER NOT NULL,
+    damage_taken INTEGER NOT NULL,
+    potions_used INTEGER NOT NULL,
+    runs INTEGER NOT NULL,
+    escapes INTEGER NOT NULL,
+    xp INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    ended REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS battles_player ON battles (player, id);
+CREATE TABLE IF NOT EXISTS player_stats (
+    player TEXT PRIMARY KEY,
+    battles INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    deaths INTEGER NOT NULL,
+    runs INTEGER NOT NULL,
+    escapes INTEGER NOT NULL,
+    damage_dealt INTEGER NOT NULL,
+    damage_taken INTEGER NOT NULL,
+    potions_used INTEGER NOT NULL,
+    xp INTEGER NOT NULL,
+    best_level INTEGER NOT NULL,
+    last_seen REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS player_kills ON player_stats (kills);
+CREATE INDEX IF NOT EXISTS player_xp ON player_stats (xp);
+CREATE INDEX IF NOT EXISTS player_level ON player_stats (best_level);
+CREATE TABLE IF NOT EXISTS enemy_stats (
+    enemy TEXT PRIMARY KEY,
+    battles INTEGER NOT NULL,
+    defeated INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    escaped_from INTEGER NOT NULL,
+    damage_dealt INTEGER NOT NULL,
+    damage_taken INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS matchup_stats (
+    player TEXT NOT NULL,
+    enemy TEXT NOT NULL,
+    battles INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    deaths INTEGER NOT NULL,
+    escapes INTEGER NOT NULL,
+    damage_dealt INTEGER NOT NULL,
+    damage_taken INTEGER NOT NULL,
+    PRIMARY KEY (player, enemy)
+) WITHOUT ROWID;
+"""
+
+# Player columns a leaderboard can be ordered by (each has an index)
+RANKINGS = {"kills": "kills", "xp": "xp", "level": "best_level"}
+
+@dataclass
+class BattleRecord:
+    player: str
+    enemy: str
+    outcome: str
+    turns: int
+    damage_dealt: int = 0
+    damage_taken: int = 0
+    potions_used: int = 0
+    runs: int = 0
+    escapes: int = 0
+    xp: int = 0
+    level: int = 1
+    ended: float = 0.0
+
+BATTLE_FIELDS = [f.name for f in fields(BattleRecord)]
+BATTLE_COLUMNS = ", ".join(BATTLE_FIELDS)
+# Record -> row tuple (much cheaper than dataclasses.astuple)
+battle_row = operator.attrgetter(*BATTLE_FIELDS)
+
+# Counts what happened in a battle from its events
+class BattleTally:
+    def __init__(self):
+        self.damage_dealt = 0
+        self.damage_taken = 0
+        self.potions_used = 0
+        self.runs = 0
+        self.escapes = 0
+
+    def add(self, events: Iterable):
+        for event in events:
+            kind = event.kind
+            if kind == "attack":
+                self.damage_dealt += event.amount
+            elif kind == "enemy_attack":
+                self.damage_taken += event.amount
+            elif kind == "item" and event.target == POTION:
+                self.potions_used += 1
+            elif kind == "run":
+                self.runs += 1
+                self.escapes += 1
+            elif kind == "run_failed":
+                self.runs += 1
+
+    # Items consumed outside the engine, e.g. on the inventory screen
+    def add_items(self, items: Iterable[str]):
+        self.potions_used += sum(item == POTION for item in items)
+
+    def record(self, player, enemy, result: BattleResult) -> BattleRecord:
+        return BattleRecord(player.name, enemy.name, result.outcome, result.turns, self.damage_dealt,
+                            self.damage_taken, self.potions_used, self.runs, self.escapes, result.xp_gained,
+                            player.level, time.time())
+
+# Open a database in WAL mode, so readers never block the writer
+def connect(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Running totals are updated at random keys, so keep a good part of the database in cache
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.executescript(SCHEMA)
+    return conn
+
+# Add a batch of battles and fold them into the running totals, all in one transaction
+def write_batch(conn: sqlite3.Connection, records: List[BattleRecord]):
+    players: Dict[str, list] = {}
+    enemies: Dict[str, list] = {}
+    matchups: Dict[tuple, list] = {}
+    for r in records:
+        won, lost, fled = r.outcome == VICTORY, r.outcome == DEFEAT, r.outcome == ESCAPED
+        p = players.setdefault(r.player, [r.player, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.0])
+        for i, value in enumerate((1, won, lost, r.runs, r.escapes, r.damage_dealt, r.damage_taken,
+                                   r.potions_used, r.xp), 1):
+            p[i] += value
+        p[10] = max(p[10], r.level)
+        p[11] = max(p[11], r.ended)
+        e = enemies.setdefault(r.enemy, [r.enemy, 0, 0, 0, 0, 0, 0])
+        for i, value in enumerate((1, won, lost, fled, r.damage_taken, r.damage_dealt), 1):
+            e[i] += value
+        m = matchups.setdefault((r.player, r.enemy), [r.player, r.enemy, 0, 0, 0, 0, 0, 0])
+        for i, value in enumerate((1, won, lost, r.escapes, r.damage_dealt, r.damage_taken), 2):
+            m[i] += value
+    with conn:
+        conn.executemany(f"INSERT INTO battles ({BATTLE_COLUMNS}) VALUES ({', '.join('?' * len(BATTLE_FIELDS))})",
+                         map(battle_row, records))
+        conn.executemany("""
+            INSERT INTO player_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (player) DO UPDATE SET
+                battles = battles + excluded.battles, kills = kills + excluded.kills,
+                deaths = deaths + excluded.deaths, runs = runs + excluded.runs,
+                escapes = escapes + excluded.escapes, damage_dealt = damage_dealt + excluded.damage_dealt,
+                damage_taken = damage_taken + excluded.damage_taken,
+                potions_used = potions_used + excluded.potions_used, xp = xp + excluded.xp,
+                best_level = max(best_level, excluded.best_level), last_seen = max(last_seen, excluded.last_seen)
+        """, players.values())
+        conn.executemany("""
+            INSERT INTO enemy_stats VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (enemy) DO UPDATE SET
+                battles = battles + excluded.battles, defeated = defeated + excluded.defeated,
+                kills = kills + excluded.kills, escaped_from = escaped_from + excluded.escaped_from,
+                damage_dealt = damage_dealt + excluded.damage_dealt,
+                damage_taken = damage_taken + excluded.damage_taken
+        """, enemies.values())
+        conn.executemany("""
+            INSERT INTO matchup_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (player, enemy) DO UPDATE SET
+                battles = battles + excluded.battles, kills = kills + excluded.kills,
+                deaths = deaths + excluded.deaths, escapes = escapes + excluded.escapes,
+                damage_dealt = damage_dealt + excluded.damage_dealt,
+                damage_taken = damage_taken + excluded.damage_taken
+        """, matchups.values())
+
+# Queues battle records and commits them in batches from a background thread
+class StatsWriter:
+    def __init__(self, path: str = DEFAULT_PATH, batch_size: int = 512, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.batches = 0
+        self._queue = queue.SimpleQueue()
+        self._stop = object()
+        # Connect before returning so a bad path fails here rather than in the thread
+        self._conn = connect(path, check_same_thread=False)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Queue a record without touching the disk
+    def record(self, record: BattleRecord):
+        self._queue.put(record)
+
+    # Commit the remaining records and stop the writer thread
+    def close(self):
+        self._queue.put(self._stop)
+        self._thread.join()
+
+    def _run(self):
+        conn = self._conn
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if item is self._stop:
+                        running = False
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                write_batch(conn, batch)
+                self.written += len(batch)
+                self.batches += 1
+        conn.close()
+
+# Read-only queries over a stats database
+class StatsStore:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.conn = connect(path)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    # Top players by kills, xp or best level, read through that column's index
+    def leaderboard(self, by: str = "kills", limit: int = 10) -> List[sqlite3.Row]:
+        column = RANKINGS[by]
+        return self.conn.execute(f"SELECT * FROM player_stats ORDER BY {column} DESC LIMIT ?", (limit,)).fetchall()
+
+    def player(self, name: str):
+        return self.conn.execute("SELECT * FROM player_stats WHERE player = ?", (name,)).fetchone()
+
+    # One player's results against each enemy
+    def matchups(self, name: str) -> List[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM matchup_stats WHERE player = ? ORDER BY battles DESC",
+                                 (name,)).fetchall()
+
+    # A player's most recent battles, newest first
+    def recent(self, name: str, limit: int = 10) -> List[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM battles WHERE player = ? ORDER BY id DESC LIMIT ?",
+                                 (name, limit)).fetchall()
+
+    def enemies(self, limit: int = 20) -> List[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM enemy_stats ORDER BY battles DESC LIMIT ?", (limit,)).fetchall()
+
+    def battle_count(self) -> int:
+        return self.conn.execute("SELECT coalesce(sum(battles), 0) FROM enemy_stats").fetchone()[0]
+
+# Print rows as an aligned table
+def print_rows(rows: List[sqlite3.Row], columns: List[str]):
+    if not rows:
+        print("No battles recorded yet.")
+        return
+    print("".join(f"{c:>14}" if i else f"{c:<20}" for i, c in enumerate(columns)))
+    for row in rows:
+        cells = (row[c] for c in columns)
+        print(f"{next(cells):<20}" + "".join(f"{v:>14,}" if isinstance(v, int) else f"{v:>14}" for v in cells))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lifetime battle statistics")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="Stats database")
+    sub = parser.add_subparsers(dest="command")
+    board = sub.add_parser("leaderboard", help="Top players")
+    board.add_argument("--by", choices=list(RANKINGS), default="kills")
+    board.add_argument("--limit", type=int, default=10)
+    report = sub.add_parser("player", help="One player's totals and results per enemy")
+    report.add_argument("name")
+    sub.add_parser("enemies", help="Totals per enemy")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No stats database at {args.db}.")
+        return 1
+    store = StatsStore(args.db)
+    try:
+        if args.command == "player":
+            totals = store.player(args.name)
+            if totals is None:
+                print(f"No battles recorded for {args.name}.")
+                return 1
+            for key in totals.keys()[1:-1]:
+                print(f"{key:<20}{totals[key]:>14,}")
+            print()
+            print_rows(store.matchups(args.name), ["enemy", "battles", "kills", "deaths", "escapes", "damage_dealt", "damage_taken"])
+            print()
+            print_rows(store.recent(args.name), ["enemy", "outcome", "turns", "damage_dealt", "damage_taken", "xp"])
+        elif args.command == "enemies":
+            print_rows(store.enemies(), ["enemy", "battles", "defeated", "kills", "escaped_from", "damage_dealt", "damage_taken"])
+        else:
+            by = args.by if args.command == "leaderboard" else "kills"
+            limit = args.limit if args.command == "leaderboard" else 10
+            print_rows(store.leaderboard(by, limit), ["player", "battles", "kills", "deaths", "xp", "best_level", "escapes"])
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# Process-pool parameter sweeps for balance tuning
+import argparse, csv, itertools, os, random, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, astuple, fields
+from typing import Dict, Iterable, List, Set
+
+from Characters.character import Character
+from Characters.enemy import Enemy
+from Characters.registry import get_registry
+from Game.agent import POLICIES, observe
+from Game.engine import BattleEngine, VICTORY, DEFEAT, ESCAPED
+
+@dataclass(frozen=True)
+class GridPoint:
+    enemy: str
+    hp_scale: float
+    attack_scale: float
+    defense_scale: float
+    level: int
+    potions: int
+    strategy: str
+
+@dataclass
+class SweepRow:
+    enemy: str
+    hp_scale: float
+    attack_scale: float
+    defense_scale: float
+    level: int
+    potions: int
+    strategy: str
+    fights: int
+    win_rate: float
+    loss_rate: float
+    escape_rate: float
+    potions_used: float
+    mean_turns: float
+    xp_per_turn: float
+
+KEY_FIELDS = [f.name for f in fields(GridPoint)]
+ROW_FIELDS = [f.name for f in fields(SweepRow)]
+
+# Sweep strategies are the agent heuristics
+STRATEGIES = POLICIES
+
+# Player at the start of a sweep fight
+def make_player(level: int, potions: int) -> Character:
+    player = Character(name="sweep", inventory={"Potion": potions})
+    player.gain_exp(player.curve.total_for(level))
+    return player
+
+# Run all fights for one grid point
+def evaluate(point: GridPoint, fights: int, seed: int) -> SweepRow:
+    template = get_registry().get(point.enemy)
+    choose = STRATEGIES[point.strategy]
+    rng = random.Random(f"{seed}:{astuple(point)}")
+    hp = max(1, round(template.hp * point.hp_scale))
+    attack = round(template.attack * point.attack_scale)
+    defense = round(template.defense * point.defense_scale)
+
+    wins = losses = escapes = turns = potions_used = xp = 0
+    for _ in range(fights):
+        player = make_player(point.level, point.potions)
+        enemy = Enemy(template.name, hp, hp, attack, defense, template.xp_reward)
+        result = BattleEngine(player, enemy, rng).resolve(lambda engine: choose(observe(engine)))
+        turns += result.turns
+        potions_used += point.potions - player.inventory.get("Potion", 0)
+        if result.outcome == VICTORY:
+            wins += 1
+            xp += result.xp_gained
+        elif result.outcome == DEFEAT:
+            losses += 1
+        elif result.outcome == ESCAPED:
+            escapes += 1
+    return SweepRow(*astuple(point), fights, wins / fights, losses / fights, escapes / fights,
+                    potions_used / fights, turns / fights, xp / turns if turns else 0.0)
+
+# Worker entry point: evaluate one chunk of grid points
+def evaluate_chunk(points: List[GridPoint], fights: int, seed: int) -> List[SweepRow]:
+    return [evaluate(point, fights, seed) for point in points]
+
+# Every combination of the grid axes
+def build_grid(enemies: Iterable[str], hp_scales, attack_scales, defense_scales, levels, potions, strategies) -> List[GridPoint]:
+    return [GridPoint(*combo) for combo in itertools.product(enemies, hp_scales, attack_scales, defense_scales, levels, potions, strategies)]
+
+# Drop a partly written last line left by an interrupted sweep
+def truncate_partial_line(path: str):
+    with open(path, "rb+") as file:
+        data = file.read()
+        if data and not data.endswith(b"\n"):
+            file.truncate(data.rfind(b"\n") + 1)
+
+# Grid points already present in an output file
+def completed_points(path: str) -> Set[GridPoint]:
+    if not os.path.exists(path):
+        return set()
+    truncate_partial_line(path)
+    done = set()
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            done.add(GridPoint(row["enemy"], float(row["hp_scale"]), float(row["attack_scale"]), float(row["defense_scale"]),
+                               int(row["level"]), int(row["potions"]), row["strategy"]))
+    return done
+
+# Fan chunks out over worker processes, appending rows as chunks finish
+def run_sweep(grid: List[GridPoint], out_path: str, fights: int = 200, seed: int = 0,
+              workers: int = None, chunk_size: int = 16) -> Dict[str, float]:
+    done = completed_points(out_path)
+    todo = [p for p in grid if p not in done]
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+
+    start = time.perf_counter()
+    written = 0
+    with open(out_path, "a", newline="") as file, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(file)
+        if new_file:
+            writer.writerow(ROW_FIELDS)
+        futures = [pool.submit(evaluate_chunk, chunk, fights, seed) for chunk in chunks]
+        for future in as_completed(futures):
+            rows = future.result()
+            writer.writerows(astuple(row) for row in rows)
+            # Each finished chunk is a checkpoint
+            file.flush()
+            written += len(rows)
+    elapsed = time.perf_counter() - start
+    return {"skipped": len(done & set(grid)), "evaluated": written, "seconds": elapsed,
+            "points_per_s": written / elapsed if elapsed else 0.0}
+
+# Parse "1,2,5-8" style lists
+def parse_list(text: str, cast=float) -> list:
+    values = []
+    for part in text.split(","):
+        if "-" in part and cast is int:
+            lo, hi = part.split("-")
+            values.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            values.append(cast(part))
+    return values
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel balance sweep over enemy stats, levels, potions and strategies")
+    parser.add_argument("--out", default="sweep.csv", help="CSV output; existing rows are skipped on resume")
+    parser.add_argument("--enemies", default=None, help="Comma-separated enemy ids (default: all)")
+    parser.add_argument("--hp-scale", default="0.75,1,1.25")
+    parser.add_argument("--attack-scale", default="0.75,1,1.25")
+    parser.add_argument("--defense-scale", default="1")
+    parser.add_argument("--levels", default="1-10")
+    parser.add_argument("--potions", default="0,2,5")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--fights", type=int, default=200, help="Fights per grid point")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    enemies = args.enemies.split(",") if args.enemies else get_registry().ids()
+    grid = build_grid(enemies, parse_list(args.hp_scale), parse_list(args.attack_scale), parse_list(args.defense_scale),
+                      parse_list(args.levels, int), parse_list(args.potions, int), args.strategies.split(","))
+    stats = run_sweep(grid, args.out, args.fights, args.seed, args.workers, args.chunk_size)
+    print(f"{stats['evaluated']} points evaluated ({stats['skipped']} already done) in {stats['seconds']:.1f}s "
+          f"({stats['points_per_s']:.1f} points/s) -> {args.out}")
+
+if __name__ == "__main__":
+    main()
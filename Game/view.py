@@ -0,0 +1,53 @@
+# Memoized view pieces for Rich screens
+import sys, tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+# Caches each named renderable and rebuilds it only when its state key changes
+class ViewCache:
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, Any]] = {}
+        self.builds = 0
+        self.hits = 0
+        self.frames = 0
+        # Net blocks a frame kept, and peak bytes it allocated (only while tracemalloc is tracing)
+        self.frame_blocks = 0
+        self.frame_alloc_bytes = 0
+        self._start_blocks = 0
+        self._start_bytes = 0
+
+    # Return the cached renderable for name, rebuilding if key differs
+    def get(self, name: str, key, build: Callable[[], Any]):
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.builds += 1
+        value = build()
+        self._entries[name] = (key, value)
+        return value
+
+    # Drop one cached piece, or everything
+    def invalidate(self, name: str = None):
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    # Mark the start of a frame for allocation counting
+    def begin_frame(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._start_bytes = tracemalloc.get_traced_memory()[0]
+        self._start_blocks = sys.getallocatedblocks()
+
+    # Mark the end of a frame; blocks freed before the end only show up in frame_alloc_bytes
+    def end_frame(self):
+        self.frames += 1
+        self.frame_blocks = sys.getallocatedblocks() - self._start_blocks
+        if tracemalloc.is_tracing():
+            self.frame_alloc_bytes = tracemalloc.get_traced_memory()[1] - self._start_bytes
+
+# State key for a character sheet
+def stats_key(entity) -> tuple:
+    statuses = tuple((s.id, s.stacks) for s in entity.statuses) if entity.statuses else ()
+    return (entity.name, entity.hp, entity.effective_max_hp, entity.effective_attack, entity.effective_defense, statuses)
@@ -0,0 +1,297 @@
+# Lazily generated, chunked overworld
+import hashlib, json, math, os, random, threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from Characters.character import Character
+from Characters.enemy import Enemy
+from Characters.registry import get_registry
+from Game.input import UP, DOWN, LEFT, RIGHT
+
+CHUNK_SIZE = 16
+
+# Tiles
+GRASS = "."
+TREE = "t"
+MOUNTAIN = "^"
+WATER = "~"
+CHEST = "$"
+BLOCKING = {MOUNTAIN, WATER}
+
+MOVES = {UP: (0, -1), DOWN: (0, 1), LEFT: (-1, 0), RIGHT: (1, 0)}
+
+# Biome name -> (tile weights, encounter chance per step)
+BIOMES = {
+    "plains": ({GRASS: 90, TREE: 6, MOUNTAIN: 2, WATER: 2}, 0.06),
+    "forest": ({GRASS: 45, TREE: 50, MOUNTAIN: 3, WATER: 2}, 0.12),
+    "hills": ({GRASS: 55, TREE: 10, MOUNTAIN: 30, WATER: 5}, 0.10),
+    "lakes": ({GRASS: 55, TREE: 10, MOUNTAIN: 2, WATER: 33}, 0.08),
+}
+CHEST_CHANCE = 0.004
+# Chest contents, drawn uniformly; potions twice as likely as the rest
+CHEST_LOOT = ("Potion", "Potion", "Antidote", "Strength Tonic", "Guard Charm")
+
+@dataclass(frozen=True)
+class Zone:
+    biome: str
+    tier: int
+    encounter_rate: float
+
+@dataclass
+class WalkResult:
+    moved: bool
+    item: Optional[str] = None
+    enemy: Optional[Enemy] = None
+
+class Chunk:
+    __slots__ = ("cx", "cy", "zone", "tiles", "changes")
+
+    def __init__(self, cx: int, cy: int, zone: Zone, tiles: List[bytearray]):
+        self.cx = cx
+        self.cy = cy
+        self.zone = zone
+        self.tiles = tiles
+        # Tiles changed since generation, {(lx, ly): tile}
+        self.changes: Dict[Tuple[int, int], str] = {}
+
+    def get(self, lx: int, ly: int) -> str:
+        return chr(self.tiles[ly][lx])
+
+    def set(self, lx: int, ly: int, tile: str):
+        self.tiles[ly][lx] = ord(tile)
+        self.changes[(lx, ly)] = tile
+
+# Deterministic RNG for one chunk of one world
+def chunk_rng(seed: int, cx: int, cy: int, salt: str = "") -> random.Random:
+    digest = hashlib.sha256(f"{seed}:{cx}:{cy}:{salt}".encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "little"))
+
+# Zone of a chunk, computed without generating its tiles
+def make_zone(seed: int, cx: int, cy: int) -> Zone:
+    rng = chunk_rng(seed, cx, cy, "zone")
+    biome = rng.choice(list(BIOMES))
+    tier = 1 + int(math.hypot(cx, cy) // 4)
+    return Zone(biome, tier, BIOMES[biome][1])
+
+# Generate the tiles of one chunk
+def generate_chunk(seed: int, cx: int, cy: int) -> Chunk:
+    zone = make_zone(seed, cx, cy)
+    rng = chunk_rng(seed, cx, cy)
+    weights = BIOMES[zone.biome][0]
+    tiles, counts = list(weights), list(weights.values())
+    rows = []
+    for _ in range(CHUNK_SIZE):
+        row = bytearray(ord(t) for t in rng.choices(tiles, counts, k=CHUNK_SIZE))
+        for lx in range(CHUNK_SIZE):
+            if rng.random() < CHEST_CHANCE:
+                row[lx] = ord(CHEST)
+        rows.append(row)
+    if cx == 0 and cy == 0:
+        # Keep the starting tile walkable
+        rows[0][0] = ord(GRASS)
+    return Chunk(cx, cy, zone, rows)
+
+class World:
+    def __init__(self, seed: int, directory: str = None, cache_size: int = 64, prefetch: bool = True):
+        self.seed = seed
+        self.directory = directory
+        self.cache_size = cache_size
+        self.x = 0
+        self.y = 0
+        self._chunks: "OrderedDict[Tuple[int, int], Chunk]" = OrderedDict()
+        self._zones: "OrderedDict[Tuple[int, int], Zone]" = OrderedDict()
+        # Changes of evicted chunks when there is no directory to write them to
+        self._evicted: Dict[Tuple[int, int], Dict[Tuple[int, int], str]] = {}
+        self._pending: Dict[Tuple[int, int], "Future"] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        if prefetch:
+            # Imported here so headless replays skip concurrent.futures
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # === Persistence === #
+    def _chunk_path(self, cx: int, cy: int) -> str:
+        return os.path.join(self.directory, f"chunk_{cx}_{cy}.json")
+
+    def _load_changes(self, cx: int, cy: int) -> Dict[Tuple[int, int], str]:
+        if (cx, cy) in self._evicted:
+            return self._evicted[(cx, cy)]
+        if self.directory and os.path.exists(self._chunk_path(cx, cy)):
+            with open(self._chunk_path(cx, cy)) as file:
+                return {tuple(map(int, k.split(","))): v for k, v in json.load(file).items()}
+        return {}
+
+    def _store_changes(self, chunk: Chunk):
+        if not chunk.changes:
+            return
+        if self.directory:
+            with open(self._chunk_path(chunk.cx, chunk.cy), "w") as file:
+                json.dump({f"{x},{y}": t for (x, y), t in chunk.changes.items()}, file)
+        else:
+            self._evicted[(chunk.cx, chunk.cy)] = dict(chunk.changes)
+
+    # Write every cached change and the player position
+    def save(self):
+        with self._lock:
+            for chunk in self._chunks.values():
+                self._store_changes(chunk)
+        if self.directory:
+            with open(os.path.join(self.directory, "world.json"), "w") as file:
+                json.dump({"seed": self.seed, "x": self.x, "y": self.y}, file)
+
+    # Reopen a saved world, or None if there is none
+    @staticmethod
+    def load(directory: str, **kwargs) -> Optional["World"]:
+        path = os.path.join(directory, "world.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            meta = json.load(file)
+        world = World(meta["seed"], directory, **kwargs)
+        world.x, world.y = meta["x"], meta["y"]
+        return world
+
+    # Start a fresh world in a directory, discarding old chunk files
+    @staticmethod
+    def create(seed: int, directory: str = None, **kwargs) -> "World":
+        if directory and os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.startswith("chunk_") or name == "world.json":
+                    os.remove(os.path.join(directory, name))
+        return World(seed, directory, **kwargs)
+
+    # Position and every changed tile, for session recordings
+    def snapshot(self) -> dict:
+        self.save()
+        changes = dict(self._evicted)
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.startswith("chunk_"):
+                    cx, cy = map(int, name[len("chunk_"):-len(".json")].split("_"))
+                    changes[(cx, cy)] = self._load_changes(cx, cy)
+        return {
+            "seed": self.seed,
+            "x": self.x,
+            "y": self.y,
+            "changes": {f"{cx},{cy}": {f"{x},{y}": t for (x, y), t in c.items()} for (cx, cy), c in changes.items()},
+        }
+
+    # In-memory world rebuilt from a snapshot
+    @staticmethod
+    def from_snapshot(data: dict, **kwargs) -> "World":
+        world = World(data["seed"], None, **kwargs)
+        world.x, world.y = data["x"], data["y"]
+        for key, changes in data["changes"].items():
+            cx, cy = map(int, key.split(","))
+            world._evicted[(cx, cy)] = {tuple(map(int, k.split(","))): v for k, v in changes.items()}
+        return world
+    # ================= #
+
+    # === Chunk cache === #
+    def _build(self, cx: int, cy: int) -> Chunk:
+        chunk = generate_chunk(self.seed, cx, cy)
+        for (lx, ly), tile in self._load_changes(cx, cy).items():
+            chunk.set(lx, ly, tile)
+        return chunk
+
+    def _insert(self, chunk: Chunk):
+        self._chunks[(chunk.cx, chunk.cy)] = chunk
+        self._evicted.pop((chunk.cx, chunk.cy), None)
+        while len(self._chunks) > self.cache_size:
+            _, old = self._chunks.popitem(last=False)
+            self._store_changes(old)
+
+    # Chunk at chunk coordinates, generated on first use
+    def chunk(self, cx: int, cy: int) -> Chunk:
+        key = (cx, cy)
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                self._chunks.move_to_end(key)
+                return chunk
+            future = self._pending.pop(key, None)
+        chunk = future.result() if future is not None else self._build(cx, cy)
+        with self._lock:
+            existing = self._chunks.get(key)
+            if existing is not None:
+                return existing
+            self._insert(chunk)
+        return chunk
+
+    # Generate the chunks around a chunk in the background
+    # Pending chunks outside the new ring are dropped, so prefetching never holds more than 9 extra chunks
+    def prefetch(self, cx: int, cy: int):
+        if self._executor is None:
+            return
+        ring = [(cx + dx, cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+        with self._lock:
+            for key in [key for key in self._pending if key not in ring]:
+                # Unused prefetched chunks hold no changes, so they can be thrown away
+                self._pending.pop(key).cancel()
+            for key in ring:
+                if key not in self._chunks and key not in self._pending:
+                    self._pending[key] = self._executor.submit(self._build, *key)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+    # =================== #
+
+    # Zone covering a world position (spatial index over chunk coordinates)
+    def zone_at(self, x: int, y: int) -> Zone:
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        zone = self._zones.get(key)
+        if zone is None:
+            zone = self._zones[key] = make_zone(self.seed, *key)
+            if len(self._zones) > self.cache_size * 16:
+                self._zones.popitem(last=False)
+        return zone
+
+    def tile(self, x: int, y: int) -> str:
+        return self.chunk(x // CHUNK_SIZE, y // CHUNK_SIZE).get(x % CHUNK_SIZE, y % CHUNK_SIZE)
+
+    def set_tile(self, x: int, y: int, tile: str):
+        self.chunk(x // CHUNK_SIZE, y // CHUNK_SIZE).set(x % CHUNK_SIZE, y % CHUNK_SIZE, tile)
+
+    # Enemy for a zone tier, falling back to the highest tier available
+    def spawn_enemy(self, zone: Zone, rng) -> Enemy:
+        registry = get_registry()
+        tiers = [t for t in registry.tiers() if t <= zone.tier] or registry.tiers()[:1]
+        return registry.random_enemy(tier=tiers[-1], rng=rng)
+
+    # Move the player one step, picking up chests and rolling for encounters
+    def walk(self, player: Character, key: str, rng) -> WalkResult:
+        if key not in MOVES:
+            return WalkResult(False)
+        dx, dy = MOVES[key]
+        nx, ny = self.x + dx, self.y + dy
+        tile = self.tile(nx, ny)
+        if tile in BLOCKING:
+            return WalkResult(False)
+        old_chunk = (self.x // CHUNK_SIZE, self.y // CHUNK_SIZE)
+        self.x, self.y = nx, ny
+        new_chunk = (nx // CHUNK_SIZE, ny // CHUNK_SIZE)
+        if new_chunk != old_chunk:
+            self.prefetch(*new_chunk)
+
+        result = WalkResult(True)
+        if tile == CHEST:
+            self.set_tile(nx, ny, GRASS)
+            result.item = rng.choice(CHEST_LOOT)
+            player.add_item(result.item)
+        zone = self.zone_at(nx, ny)
+        if rng.random() < zone.encounter_rate:
+            result.enemy = self.spawn_enemy(zone, rng)
+        return result
+
+    # Rows of tiles centered on the player
+    def viewport(self, width: int, height: int) -> List[str]:
+        left, top = self.x - width // 2, self.y - height // 2
+        rows = []
+        for y in range(top, top + height):
+            rows.append("".join("@" if (x, y) == (self.x, self.y) else self.tile(x, y) for x in range(left, left + width)))
+        return rows
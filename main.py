@@ -1,10 +1,20 @@
 import os, sys, random
-import time
 
-sys.path.append("Characters")
-
-from Characters.character import Character
+from Characters.character import Character, MAX_NAME_LENGTH
 from Characters.enemy import Enemy
+from Game.engine import BattleEngine, BattleEvent, Action, USE_ITEM
+from Game.log import CombatLog, JsonlWriter
+from Game.save import SaveGame, save_path
+from Game.stats import BattleTally, StatsWriter
+from Game.render import RenderScheduler
+from Game.screen import Screen
+from Game.view import ViewCache, stats_key
+from Game.input import InputService, InputClosed, make_backend, flush_terminal, UP, DOWN, LEFT, RIGHT, ENTER, EOF
+from Game.metrics import metrics, OVERLAY_KEY
+from Game import pacing
+from Game.session import (Session, replay_files, MENU, BATTLE, INVENTORY, MAP, LEAVE_MAP,
+                          EXPLORE, REST, SHOW_INVENTORY, SHOW_STATUS, QUIT)
+from Game.world import World, TREE, MOUNTAIN, WATER, CHEST
 
 from rich.console import Console, Group
 from rich.panel import Panel
@@ -14,91 +24,151 @@ from rich.box import HEAVY
 from rich.text import Text
 from rich.align import Align
 from rich.live import Live
-from rich.align import Align
-
-from pynput import keyboard
 
 console = Console()
 
+# Shared keyboard input, started once the game begins
+input_service = None
+
+# Optional JSONL writer that receives every combat event
+event_writer = None
+
+# Background writer for the lifetime stats database
+stats_writer = None
+
+# Seeded RNG streams and decision recorder for this run
+session = Session()
+
+# "diff" sends only changed cells, "full" repaints every frame through rich.live.Live
+output_mode = "diff"
+
+# Live display for a screen in the current output mode
+def live_screen(renderable, console: Console):
+    if output_mode == "diff":
+        return Screen(renderable, console=console)
+    return Live(renderable, console=console, auto_refresh=False)
+
 # Menu class
 class Menu:
     def __init__(self, options: dict, console: Console):
         self.options = options
         self.selected_index = 0
         self.console = console
+        self.choice_made = False
+        self.scheduler = RenderScheduler()
 
-    # Display the menu
-    def display(self):
+    # Menu panel
+    def make_panel(self):
         lines = []
         for k, option in enumerate(self.options):
             if k == self.selected_index:
                 lines.append(f"> [bold yellow]{option}[/bold yellow] <")
             else:
                 lines.append(f"  {option}")
-        self.console.print(Panel("\n".join(lines), title="Menu", border_style="blue", box=HEAVY, width=64), justify="center")
+        return Align.center(Panel("\n".join(lines), title="Menu", border_style="blue", box=HEAVY, width=64))
+
+    # Current frame of this screen
+    def build(self):
+        return self.make_panel()
 
     # Handle menu navigation
     def on_press(self, key):
-        if key == keyboard.Key.up:
+        if self.choice_made:
+            return False
+        if key == UP:
             if self.selected_index > 0:
                 self.selected_index -= 1
-            self.console.clear()
-            self.display()
-        elif key == keyboard.Key.down:
-            if self.selected_index < len(self.options) - 1:
+                self.scheduler.mark_dirty()
+        elif key == DOWN:
+            if self.selected_index < self.option_count() - 1:
                 self.selected_index += 1
-            self.console.clear()
-            self.display()
-        elif key == keyboard.Key.enter:
-            return False
-        else:
-            self.console.clear()
-            self.display()
-
-    # Choose an option
-    def choose(self):
-        self.display()
-        with keyboard.Listener(on_press=self.on_press) as listener:
-            listener.join()
+                self.scheduler.mark_dirty()
+        elif key == ENTER:
+            self.choice_made = True
+            self.scheduler.mark_dirty()
 
-        # Clear any remaining key presses
-        clear_input_buffer()
+    # Start waiting for a new choice; frontends feed keys to on_press until done()
+    def begin_choice(self):
+        self.choice_made = False
 
-        return list(self.options.values())[self.selected_index]
+    def done(self) -> bool:
+        return self.choice_made
+
+    # The choice once done() is true
+    def value(self):
+        return self.option_value(self.selected_index)
+
+    # Number of selectable options
+    def option_count(self) -> int:
+        return len(self.options)
+
+    # Value returned for the option at an index
+    def option_value(self, index: int):
+        return list(self.options.values())[index]
+
+# Log styles for battle engine events
+EVENT_STYLES = {
+    "player_turn": "bold green",
+    "attack": "green",
+    "use_item": "bold magenta",
+    "item": "green",
+    "run": "yellow",
+    "run_failed": "bold red",
+    "victory": "green",
+    "level_up": "bold",
+    "enemy_turn": "bold red",
+    "enemy_attack": "red",
+    "defeat": "red",
+    "using": "magenta",
+    "status": "magenta",
+    "status_start": "magenta",
+    "status_end": "dim",
+}
+
+# Render a log event as Rich markup
+def format_event(event: BattleEvent) -> str:
+    style = EVENT_STYLES.get(event.kind, "white")
+    return f"[{style}]{event.message}[/{style}]"
+
+# Active statuses with their stack counts, for the battle sheet and status screen
+def status_names(unit) -> str:
+    return ", ".join(f"{s.id} x{s.stacks}" if s.stacks > 1 else s.id for s in unit.statuses)
 
 # Battle class
 class Battle(Menu):
-    def __init__(self, player: Character, enemy: Enemy, console: Console):
+    def __init__(self, player: Character, enemy: Enemy, console: Console, rng: random.Random = None):
         self.player = player
         self.enemy = enemy
         self.console = console
+        self.battle_log = CombatLog(writer=event_writer)
+        self.engine = BattleEngine(player, enemy, rng=rng, log=self.battle_log)
+        self.scheduler = RenderScheduler()
         self.options = {"Attack": "attack", "Use Item": "use item", "Run": "run"}
         self.selected_index = 0
-        self.battle_log = []
+        self.view = ViewCache()
         self.choice_made = False
         self.excute_inventory = Inventory(player, console)
+        self.tally = BattleTally()
+
+    # Queue this battle's totals for the stats database once it is over
+    def record_stats(self, writer: StatsWriter):
+        if writer is not None and self.engine.is_over():
+            writer.record(self.tally.record(self.player, self.enemy, self.engine.result))
 
     # Create a character sheet
     def make_sheet(self, player: Character):
         sheet = Text()
         sheet.append(Text(f"{player.name}\n", style="bold"))
-        sheet.append(Text("  HP:                 " + str(player.hp) + '/' + str(player.max_hp)))
-        sheet.append(Text("\nATK:                " + str(player.attack)))
-        sheet.append(Text("\nDEF:                " + str(player.defense)))
+        sheet.append(Text("  HP:                 " + str(player.hp) + '/' + str(player.effective_max_hp)))
+        sheet.append(Text("\nATK:                " + str(player.effective_attack)))
+        sheet.append(Text("\nDEF:                " + str(player.effective_defense)))
+        if player.statuses:
+            sheet.append(Text("\n" + status_names(player), style="magenta"))
         return sheet
 
-    # Add message to battle log
-    def add_log(self, message: str):
-        self.battle_log.append(message)
-
-    # Clear input buffer
-    def clear_input_buffer(self):
-        clear_input_buffer()
-
-    # Create battle display
-    def make_battle_display(self):
-        # Battle title panel
-        title = Panel(
+    # Battle title panel
+    def make_title(self):
+        return Panel(
             Text("Battle", justify="center", style="bold white"),
             box=HEAVY,
             border_style="grey37",
@@ -106,7 +176,8 @@ class Battle(Menu):
             height=3
         )
 
-        # Player and enemy panels
+    # Player and enemy panels side by side
+    def make_chars(self):
         player_panel = Panel(
             self.make_sheet(self.player),
             title=self.player.name,
@@ -119,211 +190,175 @@ class Battle(Menu):
             box=HEAVY,
             width=31
         )
-
-        # Character stats table
         chars = Table.grid(expand=False, padding=2)
         chars.add_column(justify="center")
         chars.add_column(justify="center")
         chars.add_row(player_panel, enemy_panel)
+        return chars
 
-        # Battle log panel
-        battle_log_panel = Panel(
-            "\n".join(self.battle_log[-6:]) if self.battle_log else "Battle Started!",
+    # Battle log panel
+    def make_log_panel(self):
+        return Panel(
+            "\n".join(format_event(e) for e in self.battle_log.recent(6)) if self.battle_log else "Battle Started!",
             title="Battle Log",
             box=HEAVY,
             height=10,
             width=64
         )
 
-        # Action menu panel
+    # Action menu panel
+    def make_menu_panel(self):
         menu_lines = []
         for k, option in enumerate(self.options):
             if k == self.selected_index:
                 menu_lines.append(f"> [bold yellow]{option}[/bold yellow] <")
             else:
                 menu_lines.append(f"  {option}")
-        menu_panel = Panel(
+        return Align.center(Panel(
             Align.center("\n".join(menu_lines)),
             title="Menu",
             border_style="grey37",
             box=HEAVY,
             width=36
-        )
+        ))
 
-        # All together centered
-        content = Group(
-            title,
-            chars,
-            battle_log_panel,
-            Align.center(menu_panel)
-        )
+    # Create battle display, rebuilding only the parts whose state changed
+    def make_battle_display(self):
+        view = self.view
+        view.begin_frame()
+        chars_key = (stats_key(self.player), stats_key(self.enemy))
+        log_key = self.battle_log.version
+        menu_key = self.selected_index
 
-        return Align.center(content)
+        # All together centered
+        display = view.get("display", (chars_key, log_key, menu_key), lambda: Align.center(Group(
+            view.get("title", None, self.make_title),
+            view.get("chars", chars_key, self.make_chars),
+            view.get("log", log_key, self.make_log_panel),
+            view.get("menu", menu_key, self.make_menu_panel)
+        )))
+        view.end_frame()
+        return with_overlay(display)
+
+    def build(self):
+        return self.make_battle_display()
 
     # Handle menu navigation
     def on_press(self, key):
-        if key == keyboard.Key.up:
+        if self.choice_made:
+            return False
+        if key == UP:
             if self.selected_index > 0:
                 self.selected_index -= 1
-        elif key == keyboard.Key.down:
+                self.scheduler.mark_dirty()
+        elif key == DOWN:
             if self.selected_index < len(self.options) - 1:
                 self.selected_index += 1
-        elif key == keyboard.Key.enter:
+                self.scheduler.mark_dirty()
+        elif key == ENTER:
             self.choice = list(self.options.values())[self.selected_index]
             self.choice_made = True
-            return False
+            self.scheduler.mark_dirty()
+        elif key == OVERLAY_KEY and metrics.enabled:
+            metrics.overlay = not metrics.overlay
+            self.scheduler.mark_dirty()
         
-    # Get player choice
-    def get_player_choice(self, live: Live):
-        self.action_choice = None
-        self.choice_made = False
-
-        self.clear_input_buffer()
-
-        self.listener = keyboard.Listener(on_press=self.on_press)
-        self.listener.start()
-
-        while not self.choice_made:
-            live.update(self.make_battle_display())
-            time.sleep(0.05)
-
-        if self.listener:
-            self.listener.stop()
-            self.listener.join()
-
-        self.clear_input_buffer()
-
-        return list(self.options.values())[self.selected_index]
-
-    # Battle loop
-    def battle_loop(self):
-        # Live display for battle updates
-        live = Live(self.make_battle_display(), console=self.console, refresh_per_second=20)
-        live.start()
-
-        try:
-            while self.player.is_alive() and self.enemy.is_alive():
-                choice = self.get_player_choice(live)
-                self.add_log(f"[bold green]Player's Turn:[/bold green]")
-
-                # Player's turn
-                if choice == 'attack':
-                    damage = self.enemy.take_damage(self.player.attack)
-                    self.add_log(f"[green]You dealt {damage} damage to {self.enemy.name}![/green]")
-                    live.update(self.make_battle_display())
-                    time.sleep(0.1)
-                elif choice == 'use item':
-                    self.add_log(f"[bold magenta]Using Item[/bold magenta]")
-                    live.stop()
-                    self.console.clear()
-                    self.excute_inventory.use_from_inventory()
-                    live.start()
-                    time.sleep(0.1)
-                elif choice == 'run':
-                    if random.randint(0, 10) > 5:
-                        self.add_log(f"[yellow]You successfully ran away![/yellow]")
-                        live.update(self.make_battle_display())
-                        pause()
-                        return True
-                    else:
-                        self.add_log(f"[bold red]Failed to run away![/bold red]")
-                        live.update(self.make_battle_display())
-                        time.sleep(0.1)
-
-                # Check if enemy is defeated
-                if not self.enemy.is_alive():
-                    self.add_log(f"[green]You defeated the {self.enemy.name}! Gained {self.enemy.xp_reward} XP.[/green]")
-                    leveled = self.player.gain_exp(self.enemy.xp_reward)
-
-                    # Check for level up
-                    if leveled:
-                        self.add_log(f"[bold]Level UP! {self.player.level - 1} -> level {self.player.level}[/bold]")
-                    live.update(self.make_battle_display())
-                    time.sleep(0.1)
-                    break
-
-                # Enemy's turn
-                self.add_log(f"[bold red]Enemy's Turn:[/bold red]")
-                enemy_damage = self.player.take_damage(self.enemy.attack)
-                self.add_log(f"[red]{self.enemy.name} dealt {enemy_damage} damage to you![/red]")
-                live.update(self.make_battle_display())
-                time.sleep(0.1)
-
-                # Check if player is defeated
-                if not self.player.is_alive():
-                    self.add_log(f"[red]You have been defeated...[/red]")
-                    live.update(self.make_battle_display())
-                    time.sleep(0.1)
-                    break
-        finally:
-            live.stop()
-            if self.listener:
-                self.listener.stop()
-            self.clear_input_buffer()
-
-        pause()
-        # Return whether the player is still alive
-        return self.player.is_alive()
-
 # Inventory class
 class Inventory(Menu):
+    # Most rows shown per page of the item list
+    PAGE_SIZE = 8
+    # Frame rows besides the item rows: title, table and menu borders, use log, overlay line
+    CHROME_ROWS = 20
+
     def __init__(self, player: Character, console: Console):
         self.player = player
         self.console = console
-        self.options = player.show_inventory()
-        self.options["Cancel"] = "cancel"
+        self.entries = []
+        self.entries_size = -1
         self.action_choice = None
         self.choice_made = False
         self.selected_index = 0
-        self.use_log = []
-
-    # Clear input buffer
-    def clear_input_buffer(self):
-        clear_input_buffer()
-
-    # Add message to use log
-    def add_log(self, message: str):
-        self.use_log.append(message)
+        self.use_log = CombatLog(writer=event_writer)
+        # Items actually consumed, for the battle's stats
+        self.used = []
+        self.view = ViewCache()
+        self.scheduler = RenderScheduler()
+
+    # Rows per page; each item takes a table row and a menu row, so fit both in the terminal
+    def page_size(self) -> int:
+        return max(1, min(self.PAGE_SIZE, (self.console.height - self.CHROME_ROWS) // 2))
+
+    # Item names in inventory order, rebuilt when the item count changes or an item is used
+    def items(self):
+        inventory = self.player.inventory
+        if len(inventory) != self.entries_size:
+            self.entries = list(inventory)
+            self.entries_size = len(inventory)
+        return self.entries
+
+    # Items plus the trailing Cancel option
+    def option_count(self) -> int:
+        return len(self.items()) + 1
+
+    def option_value(self, index: int):
+        items = self.items()
+        return items[index] if index < len(items) else "Cancel"
+
+    # First option index of the page holding the selection
+    def page_start(self) -> int:
+        return self.selected_index - self.selected_index % self.page_size()
+
+    # Options visible on the current page
+    def visible(self):
+        start = self.page_start()
+        end = min(start + self.page_size(), self.option_count())
+        return start, [self.option_value(k) for k in range(start, end)]
+
+    # Add an event to the use log
+    def add_log(self, kind: str, message: str):
+        self.use_log.append(BattleEvent(0, kind, self.player.name, message, hp_after=self.player.hp))
+
+    # Use an item and log the result, remembering it when one was consumed
+    def consume(self, item: str) -> str:
+        before = self.player.inventory.get(item, 0)
+        msg = self.player.use_item(item)
+        # An item may run out and another take its place without the count changing
+        self.entries_size = -1
+        if self.player.inventory.get(item, 0) < before:
+            self.used.append(item)
+        self.add_log("item", msg)
+        return msg
+
+    # Move the selection, clamped to the option list
+    def select(self, index: int):
+        index = max(0, min(index, self.option_count() - 1))
+        if index != self.selected_index:
+            self.selected_index = index
+            self.scheduler.mark_dirty()
 
     # Handle menu navigation
     def on_press(self, key):
-        if key == keyboard.Key.up:
-            if self.selected_index > 0:
-                self.selected_index -= 1
-        elif key == keyboard.Key.down:
-            if self.selected_index < len(self.options) - 1:
-                self.selected_index += 1
-        elif key == keyboard.Key.enter:
-            self.choice = list(self.options.values())[self.selected_index]
-            self.choice_made = True
+        if self.choice_made:
             return False
-
-    # Get player choice
-    def get_player_choice(self, live: Live):
-        self.action_choice = None
-        self.choice_made = False
-
-        self.clear_input_buffer()
-
-        self.listener = keyboard.Listener(on_press=self.on_press)
-        self.listener.start()
-
-        # Wait for choice
-        while not self.choice_made:
-            live.update(self.inventory_display())
-            time.sleep(0.05)
-
-        if self.listener:
-            self.listener.stop()
-            self.listener.join()
-
-        self.clear_input_buffer()
-
-        return list(self.options.keys())[self.selected_index]
-
-    # Inventory display
-    def inventory_display(self):
-        title = Panel(
+        if key == UP:
+            self.select(self.selected_index - 1)
+        elif key == DOWN:
+            self.select(self.selected_index + 1)
+        elif key == LEFT:
+            self.select(self.page_start() - self.page_size())
+        elif key == RIGHT:
+            self.select(self.page_start() + self.page_size())
+        elif key == ENTER:
+            self.choice = self.option_value(self.selected_index)
+            self.choice_made = True
+            self.scheduler.mark_dirty()
+        elif key == OVERLAY_KEY and metrics.enabled:
+            metrics.overlay = not metrics.overlay
+            self.scheduler.mark_dirty()
+
+    # Inventory title panel
+    def make_title(self):
+        return Panel(
             Text("Inventory", justify="center", style="bold white"),
             box=HEAVY,
             border_style="magenta",
@@ -331,94 +366,170 @@ class Inventory(Menu):
             height=3
         )
 
+    # Item table for the visible page only
+    def make_table(self, start: int, rows):
         t = Table(box=HEAVY, border_style="magenta")
         t.add_column("#", justify="right", width=3, style="dim")
         t.add_column("Item", justify="center", style="bold")
         t.add_column("Quantity", justify="center")
 
-        items = [(k, v) for k, v in self.player.inventory.items()]
-        if not items:
+        if not self.items():
             t.add_row("-", "Your inventory is empty.", "-")
         else:
-            for i, (item, qty) in enumerate(items[:-1], 1):
+            for i, (item, qty) in enumerate(rows, start + 1):
                 t.add_row(str(i), item, str(qty))
+        return Align.center(t)
 
-        # Use log panel
-        use_log_panel = Panel(
-            "\n".join(self.use_log[-6:]) if self.use_log else "Select an item to use.",
+    # Use log panel
+    def make_log_panel(self):
+        return Panel(
+            "\n".join(format_event(e) for e in self.use_log.recent(6)) if self.use_log else "Select an item to use.",
             title="Use Log",
             box=HEAVY,
             height=10,
             width=64
         )
 
-        # Action menu panel
+    # Action menu panel for the visible page
+    def make_menu_panel(self, start: int, options):
         menu_lines = []
-        for k, option in enumerate(self.options):
+        for k, option in enumerate(options, start):
             if k == self.selected_index:
                 menu_lines.append(f"> [bold yellow]{option}[/bold yellow] <")
             else:
                 menu_lines.append(f"  {option}")
-        menu_panel = Panel(
+        size = self.page_size()
+        pages = -(-self.option_count() // size)
+        subtitle = f"Page {start // size + 1}/{pages}" if pages > 1 else None
+        return Align.center(Panel(
             Align.center("\n".join(menu_lines)),
             title="Use Item",
+            subtitle=subtitle,
             border_style="magenta",
             box=HEAVY,
             width=36
-        )
+        ))
 
-        content = Group(
-            title,
-            Align.center(t),
-            use_log_panel,
-            Align.center(menu_panel)
-        )
-
-        return Align.center(content)
+    # Inventory display, rebuilding only the parts whose state changed
+    def inventory_display(self):
+        view = self.view
+        view.begin_frame()
+        # Keys cover only the visible page, so frame cost does not grow with the inventory
+        start, options = self.visible()
+        inventory = self.player.inventory
+        rows = tuple((item, inventory[item]) for item in options if item in inventory)
+        items_key = (start, rows)
+        log_key = self.use_log.version
+        menu_key = (self.selected_index, start, tuple(options), self.option_count())
+
+        display = view.get("display", (items_key, log_key, menu_key), lambda: Align.center(Group(
+            view.get("title", None, self.make_title),
+            view.get("table", items_key, lambda: self.make_table(start, rows)),
+            view.get("log", log_key, self.make_log_panel),
+            view.get("menu", menu_key, lambda: self.make_menu_panel(start, options))
+        )))
+        view.end_frame()
+        return with_overlay(display)
+
+    def build(self):
+        return self.inventory_display()
+
+# Map tile styles
+TILE_STYLES = {TREE: "green", MOUNTAIN: "grey50", WATER: "blue", CHEST: "bold yellow", "@": "bold white"}
+
+# Hint under the map
+WALK_HINT = "Use the arrow keys to walk, Enter to return to town."
+
+# Explore class
+class Explore:
+    def __init__(self, player: Character, world: World, console: Console):
+        self.player = player
+        self.world = world
+        self.console = console
+        self.key = None
+        self.message = WALK_HINT
+        self.scheduler = RenderScheduler()
+
+    # Colored map viewport around the player
+    def make_map(self):
+        text = Text()
+        for k, row in enumerate(self.world.viewport(60, 13)):
+            if k:
+                text.append("\n")
+            for tile in row:
+                text.append(tile, style=TILE_STYLES.get(tile, "dim"))
+        return text
+
+    # Explore display
+    def make_explore_display(self):
+        zone = self.world.zone_at(self.world.x, self.world.y)
+        title = f"{zone.biome.title()} (tier {zone.tier}) at {self.world.x},{self.world.y}"
+        map_panel = Panel(self.make_map(), title=title, box=HEAVY, width=64)
+        status = f"HP {self.player.hp}/{self.player.max_hp}  Potions {self.player.inventory.get('Potion', 0)}"
+        return with_overlay(Align.center(Group(
+            map_panel,
+            Panel(f"{status}\n{self.message}", box=HEAVY, border_style="grey37", width=64)
+        )))
+
+    # Handle movement keys
+    def on_press(self, key):
+        if self.key is not None:
+            return False
+        if key in (UP, DOWN, LEFT, RIGHT) or key in LEAVE_MAP:
+            self.key = key
+            self.scheduler.mark_dirty()
+        elif key == OVERLAY_KEY and metrics.enabled:
+            metrics.overlay = not metrics.overlay
+            self.scheduler.mark_dirty()
 
-    # Use item from inventory
-    def use_from_inventory(self):
-        live = Live(self.inventory_display(), console=self.console, refresh_per_second=20)
-        live.start()
+    def build(self):
+        return self.make_explore_display()
 
-        try:
-            while True:
-                choice = self.get_player_choice(live)
+    # Wait for the next movement key
+    def begin_choice(self):
+        self.key = None
 
-                if choice == "Cancel":
-                    break
+    def done(self) -> bool:
+        return self.key is not None
 
-                # Use the selected item
-                item_name = choice
-                self.add_log(f"[magenta]Using item {item_name}...[/magenta]")
-                live.update(self.inventory_display())
-                msg = self.player.use_item(item_name)
-                self.add_log(f"[green]{msg}[/green]")
-                live.update(self.inventory_display())
-        finally:
-            live.stop()
-            if self.listener:
-                self.listener.stop()
-            self.clear_input_buffer()
+    def value(self):
+        return self.key
 
 # === Utility Helpers === #
 # Pause function
 def pause(msg: str = "Press Enter to continue..."):
-    console.input(msg)
+    if pacing.current.auto_continue:
+        return
+    if input_service is None or not input_service.running:
+        console.input(msg)
+        return
+    console.print(msg)
+    input_service.wait_for(ENTER)
+
+# Ask a question, or take the default when running non-interactively
+def ask(question: str, **kwargs) -> str:
+    if not pacing.current.interactive:
+        return kwargs.get("default", "")
+    return Prompt.ask(question, **kwargs)
 
 # Clear input buffer
 def clear_input_buffer():
-    time.sleep(0.1)
-    if sys.platform == "win32":
-        import msvcrt
-        while msvcrt.kbhit():
-            msvcrt.getch()
+    # Scripted runs keep their typed-ahead keys
+    if not pacing.current.interactive:
+        return
+    if input_service is not None:
+        input_service.flush()
     else:
-        import termios
-        termios.tcflush(sys.stdin, termios.TCIFLUSH)
+        flush_terminal()
 # ======================= #
 
 # === UI Utilities === #
+# Add the metrics overlay under a screen when it is switched on
+def with_overlay(renderable):
+    if not metrics.overlay:
+        return renderable
+    return Group(renderable, Align.center(Text(metrics.overlay_text(), style="dim")))
+
 # Header panel
 def header(title: str) -> Panel:
     return Panel(
@@ -433,79 +544,309 @@ def render_status(player: Character) -> Panel:
     t.add_column(justify="left")
     t.add_column(justify="right")
     t.add_row(f"[bold]Name: [/bold][bold yellow]{player.name}[/bold yellow]", f"[bold]Level: {player.level}[/bold]")
-    t.add_row(f"[bold]HP: [/bold]{player.hp}/{player.max_hp}")
-    t.add_row(f"[bold]Attack: [/bold]{player.attack}")
-    t.add_row(f"[bold]Defense: [/bold]{player.defense}")
+    t.add_row(f"[bold]HP: [/bold]{player.hp}/{player.effective_max_hp}")
+    t.add_row(f"[bold]Attack: [/bold]{player.effective_attack}")
+    t.add_row(f"[bold]Defense: [/bold]{player.effective_defense}")
     t.add_row(f"[bold]EXP: [/bold]{player.exp}/{player.exp_to_next_level()}")
+    if player.statuses:
+        t.add_row(f"[bold]Status: [/bold][magenta]{status_names(player)}[/magenta]")
     return Panel(t, title="Status", border_style="green", box=HEAVY)
 
-# Rest in town to restore full HP
-def rest_in_town(player: Character):
-    if hasattr(player, 'heal'):
-        gained_hp = player.heal(player.max_hp)
-        console.print(Panel(f"[green]{player.name} rested and restored {gained_hp} HP![/green]", border_style="green", box=HEAVY), justify="center")
-    else:
-        console.print("[red]This character cannot rest.[/red]")
-    pause()
-
 # ====================== #
 
-# === Game Functions === #
-# Show status screen
-def show_status_screen(player: Character):
-    console.clear()
-    console.print(header("Character Status"))
-    console.print(render_status(player))
-    pause()
-# ====================== #
+# === Game Flow === #
+# Main menu values
+MAIN_MENU = {"Explore": EXPLORE, "Rest in Town": REST, "Show Inventory": SHOW_INVENTORY, "Show Status": SHOW_STATUS, "Quit Game": QUIT}
 
+# Frontend for this terminal: one live view at a time, keys from the shared input service
+# Its coroutines block while waiting for keys, which is fine with a single game per process
+class Terminal:
+    def __init__(self, console: Console):
+        self.console = console
+        self.screen = None
+        self.live = None
+
+    # Make a screen the live view, clearing whatever was shown before
+    def open(self, screen):
+        if self.screen is screen:
+            return
+        self.close()
+        self.console.clear()
+        self.live = live_screen(screen.build(), self.console)
+        self.live.start()
+        self.screen = screen
+
+    def close(self):
+        if self.live is not None:
+            self.live.stop()
+            self.live = None
+            self.screen = None
+
+    # Wait for the player to make a choice on a screen, redrawing only when a keypress changes the view
+    # Raises InputClosed if input ends first, so the game loop unwinds between steps
+    def read(self, screen):
+        self.open(screen)
+        screen.begin_choice()
+        clear_input_buffer()
+        scheduler = screen.scheduler
+
+        def on_press(key):
+            if key == EOF:
+                scheduler.mark_dirty()
+                return
+            return screen.on_press(key)
+
+        scheduler.mark_dirty()
+        with input_service.subscribed(on_press):
+            scheduler.drive(self.live, screen.build, lambda: input_service.closed or screen.done())
+        if input_service.closed:
+            raise InputClosed("Input stream closed.")
+        clear_input_buffer()
+        return screen.value()
 
-# Main game loop
-def main():
-    console.clear()
-    console.print(header("Welcome to the RPG Game!"), justify="center")
-    name = Prompt.ask("Enter your character's name", default="Hero")
-    player = Character(name=name, inventory={"Potion": 2})
-
-    while True:
-        console.clear()
-        menu = Menu(
-            options={"Explore": "1", "Rest in Town": "2", "Show Inventory": "3", "Show Status": "4", "Quit Game": "Q"},
-            console=console
-        )
-        choice = menu.choose()
-
-        if choice == '1':
-            console.clear()
-            fight = Battle(player, Enemy.random_enemy(), console)
-            if not fight.battle_loop():
-                console.clear()
-                console.print("[bold red]Game Over! You have been defeated.[/bold red]", justify="center")
-                pause()
-                break
+    async def choose(self, screen):
+        return self.read(screen)
 
-        elif choice == '2':
-            console.clear()
-            console.print(header("Rest in Town"))
-            rest_in_town(player)
+    # Show a screen's latest state
+    async def draw(self, screen):
+        self.open(screen)
+        self.live.update(screen.build(), refresh=True)
 
-        elif choice == '3':
-            console.clear()
-            execute_inventory = Inventory(player, console)
-            execute_inventory.use_from_inventory()
+    # Replace the view with static renderables
+    async def show(self, *renderables):
+        self.close()
+        self.console.clear()
+        for renderable in renderables:
+            self.console.print(renderable, justify="center")
 
-        elif choice == '4':
-            console.clear()
-            show_status_screen(player)
+    async def pause(self, *renderables):
+        await self.show(*renderables)
+        pause()
 
-        elif choice.upper() == 'Q':
-            console.print("[bold yellow]Thank you for playing! Goodbye![/bold yellow]")
-            break
+    async def ask_name(self, limit: int) -> str:
+        name = ask("Enter your character's name", default="Hero")
+        while len(name) > limit:
+            self.console.print(f"[red]Names can be at most {limit} characters.[/red]")
+            name = ask("Enter your character's name", default="Hero")
+        return name
+
+    async def confirm(self, question: str) -> bool:
+        return ask(question, choices=["y", "n"], default="y") == "y"
+
+    async def action_delay(self):
+        pacing.action_delay()
+
+# Load a saved character that is still alive if the player wants to continue it, else start a new one
+# Returns (player, world, save slot or None)
+async def load_game(ui, name: str, save_dir: str, session: Session, prefetch: bool = True):
+    save_game = None
+    player = None
+    world = None
+    if save_dir:
+        save_game = SaveGame(save_path(save_dir, name))
+        saved = save_game.load() if save_game.exists() else None
+        if saved is not None and saved.is_alive() and await ui.confirm(f"Continue saved game for {name}?"):
+            player = saved
+    world_dir = os.path.splitext(save_game.snapshot_path)[0] + "_world" if save_game is not None else None
+    if player is not None:
+        world = World.load(world_dir, prefetch=prefetch)
+    if player is None:
+        player = Character(name=name, inventory={"Potion": 2})
+    if world is None:
+        world = World.create(session.seed, world_dir, prefetch=prefetch)
+    if save_game is not None:
+        save_game.start(player)
+    session.begin(player, world)
+    return player, world, save_game
+
+# The game itself: main menu, exploring, battles, items and autosaves, shared by this terminal and
+# telnet sessions. Every screen goes through the frontend `ui`, every choice through the session
+# so it can be recorded and replayed
+class GameLoop:
+    def __init__(self, player: Character, world: World, session: Session, ui, save_game: SaveGame = None,
+                 stats: StatsWriter = None):
+        self.player = player
+        self.world = world
+        self.session = session
+        self.ui = ui
+        self.console = ui.console
+        self.save_game = save_game
+        self.stats = stats
+
+    # Record the character's latest changes in the autosave journal
+    def autosave(self):
+        if self.save_game is not None:
+            self.save_game.record(self.player)
+
+    # Choice on a screen, recorded for replays
+    async def decide(self, kind: str, screen):
+        return await self.session.decide_async(kind, lambda: self.ui.choose(screen))
+
+    # Menu loop until the player quits or is defeated
+    async def play(self):
+        ui = self.ui
+        while True:
+            choice = await self.decide(MENU, Menu(dict(MAIN_MENU), self.console))
+            if choice == EXPLORE:
+                if not await self.explore():
+                    await ui.pause("[bold red]Game Over! You have been defeated.[/bold red]")
+                    break
+            elif choice == REST:
+                await self.rest()
+            elif choice == SHOW_INVENTORY:
+                await self.use_items(Inventory(self.player, self.console))
+            elif choice == SHOW_STATUS:
+                await ui.pause(header("Character Status"), render_status(self.player))
+            elif choice.upper() == QUIT:
+                break
+        await ui.show(header("Game Over"), "[bold red]You have exited the game.[/bold red]")
+
+    # Rest in town to restore full HP
+    async def rest(self):
+        gained_hp = self.player.heal(self.player.max_hp)
+        self.autosave()
+        await self.ui.pause(header("Rest in Town"), Panel(f"[green]{self.player.name} rested and restored {gained_hp} HP![/green]",
+                                                         border_style="green", box=HEAVY))
+
+    # Walk the map until the player leaves or is defeated
+    async def explore(self) -> bool:
+        screen = Explore(self.player, self.world, self.console)
+        while True:
+            key = await self.decide(MAP, screen)
+            if key in LEAVE_MAP:
+                return True
+            result = self.world.walk(self.player, key, self.session.rng("encounter"))
+            if result.item:
+                screen.message = f"[bold yellow]Found a {result.item}![/bold yellow]"
+                self.autosave()
+            elif result.moved:
+                screen.message = WALK_HINT
+            if result.enemy is not None:
+                if not await self.battle(result.enemy):
+                    return False
+                screen.message = WALK_HINT
+
+    # Fight one battle; returns whether the player is still alive
+    async def battle(self, enemy: Enemy) -> bool:
+        fight = Battle(self.player, enemy, self.console, rng=self.session.rng("combat"))
+        while not fight.engine.is_over():
+            choice = await self.decide(BATTLE, fight)
+            # Items are picked on the inventory screen before the turn resolves
+            if choice == USE_ITEM:
+                await self.use_items(fight.excute_inventory)
+                fight.tally.add_items(fight.excute_inventory.used)
+                fight.excute_inventory.used.clear()
+            fight.tally.add(fight.engine.step(Action(choice)))
+            self.autosave()
+            await self.ui.draw(fight)
+            await self.ui.action_delay()
+        fight.record_stats(self.stats)
+        await self.ui.pause(fight.build())
+        return self.player.is_alive()
 
-    console.clear()
-    console.print(header("Game Over"), justify="center")
-    console.print("[bold red]You have exited the game.[/bold red]", justify="center")
+    # Use items picked on the inventory screen until "Cancel"
+    async def use_items(self, inventory: Inventory):
+        while True:
+            choice = await self.decide(INVENTORY, inventory)
+            if choice == "Cancel":
+                return
+            inventory.add_log("using", f"Using item {choice}...")
+            await self.ui.draw(inventory)
+            inventory.consume(choice)
+            self.autosave()
+
+    # Compact the save and store the world's changes
+    def close(self):
+        if self.save_game is not None:
+            self.save_game.compact(self.player)
+            self.save_game.close()
+        self.world.save()
+        self.world.close()
+# ====================== #
+
+
+# Instrumented hot paths (wrapped only while metrics are enabled)
+metrics.register(Live, "update", "live.update", kind="frame")
+metrics.register(Screen, "update", "live.update", kind="frame")
+metrics.register(Battle, "make_battle_display", "render.battle")
+metrics.register(Inventory, "inventory_display", "render.inventory")
+metrics.register(Terminal, "read", "input.choice")
+metrics.register(InputService, "dispatch", "input.dispatch", kind="input")
+metrics.register(sys.modules[__name__], "clear_input_buffer", "input.clear_buffer")
+metrics.register(BattleEngine, "step", "combat.step")
 
+# Main game loop
+def main(input_backend: str = "auto", event_log: str = None, save_dir: str = "saves", metrics_path: str = None,
+         seed: int = None, record_path: str = None, stats_path: str = None):
+    import asyncio
+    global input_service, event_writer, session, stats_writer
+    session = Session(seed)
+    ui = Terminal(console)
+    console.clear()
+    console.print(header("Welcome to the RPG Game!"), justify="center")
+    name = asyncio.run(ui.ask_name(MAX_NAME_LENGTH))
+    player, world, save_game = asyncio.run(load_game(ui, name, save_dir, session))
+
+    if event_log:
+        event_writer = JsonlWriter(event_log)
+    # Stats live next to the saves unless a path is given; an empty path turns them off
+    if stats_path is None:
+        stats_path = os.path.join(save_dir, "stats.db") if save_dir else ""
+    if stats_path:
+        stats_writer = StatsWriter(stats_path)
+    game = GameLoop(player, world, session, ui, save_game, stats_writer)
+    input_service = InputService(make_backend(input_backend))
+    try:
+        input_service.start()
+        asyncio.run(game.play())
+    except InputClosed:
+        ui.close()
+        console.print("[bold yellow]Input closed, leaving the game.[/bold yellow]")
+    except KeyboardInterrupt:
+        ui.close()
+        console.print("[bold yellow]Leaving the game.[/bold yellow]")
+    finally:
+        ui.close()
+        input_service.stop()
+        if event_writer is not None:
+            event_writer.close()
+        if stats_writer is not None:
+            stats_writer.close()
+        game.close()
+        if metrics_path:
+            metrics.export(metrics_path)
+        if record_path:
+            session.save(record_path, player)
+
+# Command line for the interactive game
+def cli(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Terminal RPG Game")
+    parser.add_argument("--input", choices=["auto", "pynput", "stdin"], default="auto", help="Keyboard input backend")
+    parser.add_argument("--event-log", default=None, help="Stream combat events to this JSONL file")
+    parser.add_argument("--save-dir", default="saves", help="Directory for save files (empty to disable saving)")
+    parser.add_argument("--stats", default=None, help="Lifetime stats database (default: stats.db in the save directory, empty to disable)")
+    parser.add_argument("--metrics", default=None, help="Enable instrumentation and write a metrics summary to this JSON file")
+    parser.add_argument("--overlay", action="store_true", help="Show the metrics overlay (toggle with 'p')")
+    parser.add_argument("--output", choices=["diff", "full"], default="diff", help="Send only changed cells (diff) or repaint whole frames (full)")
+    parser.add_argument("--pace", choices=list(pacing.PRESETS), default="normal", help="Delay policy: normal, fast, turbo (no pauses) or auto (no prompts either)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for encounters and combat rolls")
+    parser.add_argument("--record", default=None, help="Record this session's decisions to a JSON file")
+    parser.add_argument("--replay", nargs="+", default=None, help="Replay recorded sessions headlessly and verify their final state")
+    args = parser.parse_args(argv)
+    if args.replay:
+        passed, failed, elapsed = replay_files(args.replay)
+        print(f"{passed} passed, {failed} failed in {elapsed:.3f}s")
+        sys.exit(1 if failed else 0)
+    global output_mode
+    output_mode = args.output
+    pacing.set_pacing(args.pace)
+    if not pacing.current.interactive and args.input == "auto":
+        args.input = "stdin"
+    if args.metrics or args.overlay:
+        metrics.enable()
+        metrics.overlay = args.overlay
+    main(args.input, args.event_log, args.save_dir, args.metrics, args.seed, args.record, args.stats)
 
 if __name__ == "__main__":
-    main()
+    cli()
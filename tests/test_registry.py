@@ -0,0 +1,94 @@
+# Weighted spawn tables and tier/level filtering, from JSON and from a compiled pack
+import json, os, random, tempfile, unittest
+from collections import Counter
+
+from Characters.registry import AliasTable, EnemyRegistry, compile_enemies
+
+ENEMIES = {
+    "rat": {"name": "Rat", "hp": 10, "attack": 3, "defense": 1, "xp_reward": 5, "tier": 1, "min_level": 1, "weight": 1},
+    "wolf": {"name": "Wolf", "hp": 25, "attack": 7, "defense": 2, "xp_reward": 15, "tier": 1, "min_level": 1,
+             "weight": 3},
+    "bandit": {"name": "Bandit", "hp": 30, "attack": 8, "defense": 3, "xp_reward": 25, "tier": 1, "min_level": 3,
+               "max_level": 6, "weight": 2},
+    "troll": {"name": "Troll", "hp": 60, "attack": 12, "defense": 5, "xp_reward": 60, "tier": 2, "min_level": 5,
+              "weight": 1},
+    "ghost": {"name": "Ghost", "hp": 40, "attack": 10, "defense": 0, "xp_reward": 40, "tier": 2, "min_level": 1,
+              "weight": 0}
+}
+
+class AliasTableTest(unittest.TestCase):
+    def test_seeded_draws_follow_weights(self):
+        table = AliasTable(["a", "b", "c", "d"], [1, 3, 0, 4])
+        draws = [table.sample(random.Random(11)) for _ in range(3)]
+        self.assertEqual(len(set(draws)), 1)
+
+        rng = random.Random(7)
+        counts = Counter(table.sample(rng) for _ in range(16_000))
+        self.assertNotIn("c", counts)
+        self.assertAlmostEqual(counts["a"] / 16_000, 1 / 8, delta=0.02)
+        self.assertAlmostEqual(counts["b"] / 16_000, 3 / 8, delta=0.02)
+        self.assertAlmostEqual(counts["d"] / 16_000, 4 / 8, delta=0.02)
+
+    def test_rejects_empty_tables(self):
+        with self.assertRaises(ValueError):
+            AliasTable([], [])
+        with self.assertRaises(ValueError):
+            AliasTable(["a"], [0])
+
+class EnemyRegistryTest(unittest.TestCase):
+    use_pack = False
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "enemies.json")
+        with open(self.path, 'w') as file:
+            json.dump(ENEMIES, file)
+        if self.use_pack:
+            compile_enemies(self.path)
+        self.registry = EnemyRegistry(self.path, use_pack=self.use_pack)
+
+    def tearDown(self):
+        if self.registry.pack is not None:
+            self.registry.pack.close()
+        self.dir.cleanup()
+
+    def ids(self, templates) -> list:
+        return sorted(t.id for t in templates)
+
+    def test_source(self):
+        self.assertEqual(self.registry.pack is not None, self.use_pack)
+
+    def test_tier_and_level_filtering(self):
+        self.assertEqual(self.registry.tiers(), [1, 2])
+        self.assertEqual(self.ids(self.registry.select(tier=1)), ["bandit", "rat", "wolf"])
+        self.assertEqual(self.ids(self.registry.select(level=1)), ["ghost", "rat", "wolf"])
+        self.assertEqual(self.ids(self.registry.select(level=4, tier=1)), ["bandit", "rat", "wolf"])
+        self.assertEqual(self.ids(self.registry.select(level=7, tier=1)), ["rat", "wolf"])
+        self.assertEqual(self.ids(self.registry.select(level=5, tier=2)), ["ghost", "troll"])
+        self.assertEqual(self.registry.select(level=2, tier=3), [])
+        with self.assertRaises(ValueError):
+            self.registry.spawn_table(level=2, tier=3)
+
+    def test_seeded_spawns_respect_filters(self):
+        rng = random.Random(3)
+        names = Counter(self.registry.random_enemy(level=4, tier=1, rng=rng).name for _ in range(6_000))
+        self.assertEqual(set(names), {"Rat", "Wolf", "Bandit"})
+        self.assertAlmostEqual(names["Wolf"] / 6_000, 3 / 6, delta=0.03)
+        self.assertAlmostEqual(names["Bandit"] / 6_000, 2 / 6, delta=0.03)
+
+        # A zero-weight enemy in the pool never spawns
+        rng = random.Random(3)
+        self.assertEqual({self.registry.random_enemy(level=5, tier=2, rng=rng).name for _ in range(500)}, {"Troll"})
+
+    def test_same_seed_same_spawns(self):
+        runs = []
+        for _ in range(2):
+            rng = random.Random(9)
+            runs.append([self.registry.random_enemy(level=3, rng=rng).name for _ in range(50)])
+        self.assertEqual(runs[0], runs[1])
+
+class PackedEnemyRegistryTest(EnemyRegistryTest):
+    use_pack = True
+
+if __name__ == "__main__":
+    unittest.main()
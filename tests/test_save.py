@@ -0,0 +1,106 @@
+# Save snapshots and the autosave journal
+import os, tempfile, unittest
+from unittest import mock
+
+from Characters.character import Character
+from Game import save
+from Game.save import SaveGame
+
+class SaveGameTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "hero.sav")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def state(self, player: Character) -> dict:
+        return save.character_state(player)
+
+    # Play a few turns, journaling each one
+    def play(self, game: SaveGame, player: Character):
+        for _ in range(3):
+            player.hp -= 4
+            player.exp += 5
+            player.inventory["Potion"] -= 1
+            game.record(player)
+
+    def test_journal_round_trip(self):
+        player = Character("Hero", inventory={"Potion": 5})
+        game = SaveGame(self.path)
+        game.start(player)
+        self.play(game, player)
+        game.close()
+
+        loaded = SaveGame(self.path)
+        self.assertEqual(self.state(loaded.load()), self.state(player))
+        self.assertGreater(loaded.records, 0)
+
+    def test_compact_then_load(self):
+        player = Character("Hero", inventory={"Potion": 5})
+        game = SaveGame(self.path)
+        game.start(player)
+        self.play(game, player)
+        game.compact(player)
+        player.hp -= 1
+        game.record(player)
+        game.close()
+
+        loaded = SaveGame(self.path)
+        self.assertEqual(self.state(loaded.load()), self.state(player))
+        self.assertEqual(loaded.records, 1)
+
+    # A crash after the new snapshot is swapped in but before its journal is started
+    # must not replay the old journal on top of it
+    def test_crash_during_compact_skips_stale_journal(self):
+        player = Character("Hero", inventory={"Potion": 5})
+        game = SaveGame(self.path)
+        game.start(player)
+        self.play(game, player)
+
+        real_replace = os.replace
+
+        def crash(src, dst):
+            real_replace(src, dst)
+            raise KeyboardInterrupt
+
+        with mock.patch("Game.save.os.replace", crash):
+            with self.assertRaises(KeyboardInterrupt):
+                game.compact(player)
+        game.close()
+
+        loaded = SaveGame(self.path)
+        self.assertEqual(self.state(loaded.load()), self.state(player))
+        self.assertEqual(loaded.records, 0)
+
+    # Generations keep counting from the snapshot on disk when a new game reuses the slot
+    def test_new_game_over_old_slot(self):
+        old = Character("Hero", inventory={"Potion": 5})
+        game = SaveGame(self.path)
+        game.start(old)
+        self.play(game, old)
+        game.close()
+
+        fresh = Character("Hero", inventory={"Potion": 2})
+        game = SaveGame(self.path)
+        game.start(fresh)
+        game.close()
+        self.assertEqual(self.state(SaveGame(self.path).load()), self.state(fresh))
+
+    def test_version_1_snapshot_and_journal(self):
+        snapshot = (save.HEADER.pack(save.MAGIC, 1) + bytes([2]) + b"Al" + save.STATS.pack(30, 30, 7, 4, 1, 0)
+                    + save.COUNT.pack(1) + bytes([6]) + b"Potion" + save.QTY.pack(2))
+        journal = bytes([save.OP_ITEM, 6]) + b"Potion" + save.QTY.pack(-1)
+        with open(self.path, "wb") as file:
+            file.write(snapshot)
+        with open(self.path + ".journal", "wb") as file:
+            file.write(journal)
+        player = SaveGame(self.path).load()
+        self.assertEqual((player.name, player.inventory), ("Al", {"Potion": 1}))
+
+    def test_long_names(self):
+        player = Character("x" * 300, inventory={"Potion": 2})
+        self.assertEqual(save.load_binary(save.dump_binary(player)).name, player.name)
+
+if __name__ == "__main__":
+    unittest.main()